@@ -0,0 +1,56 @@
+"""
+Peak memory and time of copying a model_config with large time series
+(deepcopy of the whole config vs copy_config used by ModelDataBase)
+
+usage: python benchmarks/config_copy.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hysut.preprocess.database import ModelDataBase
+from hysut.utils.tools import copy_config
+
+
+def make_config(years=50, regions=10):
+    hours = 8760
+    return {
+        "time_horizon": {"run": [f"range(2020,{2020 + years})"]},
+        "time_slices": {"slices": f"range(1,{hours + 1})"},
+        "settings": {"log_path": "logs"},
+        "data": {
+            "demand": np.random.rand(years, hours, regions),
+            "capacity_factor": np.random.rand(years, hours, regions),
+        },
+    }
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    config = make_config()
+    data_size = sum(array.nbytes for array in config["data"].values())
+    print(f"size of the input arrays: {data_size / 2 ** 20:.1f} MiB")
+
+    for name, function in [
+        ("deepcopy", deepcopy),
+        ("copy_config", lambda config: copy_config(config, ModelDataBase.MUTABLE_SECTIONS)),
+    ]:
+        elapsed, peak = measure(function, config)
+        print(f"{name:<12} time: {elapsed * 1000:9.3f} ms   peak memory: {peak / 2 ** 20:9.3f} MiB")
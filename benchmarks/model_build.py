@@ -0,0 +1,119 @@
+"""
+Build and canonicalization time of the vectorized cvxpy model (CvxpyModel)
+vs the same model written with one scalar variable per index, and the build
+time of the matrix-direct model (SparseModel, no canonicalization needed)
+
+usage: python benchmarks/model_build.py
+"""
+
+import os
+import sys
+import time
+
+import cvxpy as cp
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hysut.mathematical_model.cvxpy.model import CvxpyModel
+from hysut.mathematical_model.sparse.model import SparseModel
+from hysut.mathematical_model.utils.data import ModelData
+from hysut.preprocess.technologies import check_commodities, check_technologies
+
+
+def make_data(years, slices, regions, technologies=4):
+    rng = np.random.default_rng(0)
+    commodities = check_commodities(
+        {"electricity": {"demand": rng.random((years, slices, regions))}}
+    )["commodities"]
+    technologies = check_technologies(
+        {
+            f"tech_{number}": {
+                "output": "electricity",
+                "capacity_factor": rng.random((years, slices, regions)),
+                "investment_cost": float(rng.random()),
+                "variable_cost": float(rng.random()),
+                "lifetime": 10,
+            }
+            for number in range(technologies)
+        },
+        commodities,
+    )["technologies"]
+
+    return ModelData(
+        np.arange(2020, 2020 + years),
+        list(range(slices)),
+        [f"region_{number}" for number in range(regions)],
+        commodities,
+        technologies,
+    )
+
+
+def scalar_problem(data):
+    """Same model as CvxpyModel written element by element"""
+    years, slices, regions = data.shape
+    weights = data.row_weights().reshape(years, slices)
+    constraints = []
+    cost = 0
+    production = {}
+
+    for technology in data.technologies:
+        new_capacity = {
+            (y, r): cp.Variable(nonneg=True) for y in range(years) for r in range(regions)
+        }
+        active = data.active_capacity(technology)
+        parameters = {item: values[technology] for item, values in data.parameters.items()}
+
+        for y in range(years):
+            for r in range(regions):
+                capacity = parameters["existing_capacity"][y, r] + sum(
+                    new_capacity[b, r] for b in range(years) if active[y, b]
+                )
+                cost += parameters["investment_cost"][y, r] * new_capacity[y, r]
+
+                for s in range(slices):
+                    variable = production[technology, y, s, r] = cp.Variable(nonneg=True)
+                    constraints.append(
+                        variable <= parameters["capacity_factor"][y, s, r] * capacity
+                    )
+                    cost += parameters["variable_cost"][y, r] * weights[y, s] * variable
+
+    for y in range(years):
+        for s in range(slices):
+            for r in range(regions):
+                constraints.append(
+                    sum(production[technology, y, s, r] for technology in data.technologies)
+                    >= data.demand["electricity"][y, s, r]
+                )
+
+    return cp.Problem(cp.Minimize(cost), constraints)
+
+
+def measure(data, build):
+    start = time.perf_counter()
+    problem = build(data)
+    built = time.perf_counter()
+    problem.get_problem_data(cp.SCS)
+    canonicalized = time.perf_counter()
+
+    return built - start, canonicalized - built
+
+
+if __name__ == "__main__":
+    builders = [
+        ("vectorized", lambda data: CvxpyModel(data).problem),
+        ("scalar", scalar_problem),
+    ]
+
+    for years, slices, regions in [(2, 4, 2), (5, 12, 3), (10, 24, 4)]:
+        data = make_data(years, slices, regions)
+        print(f"years: {years}, time slices: {slices}, regions: {regions}")
+        for name, build in builders:
+            build_time, canonicalization_time = measure(data, build)
+            print(
+                f"    {name:<12} build: {build_time * 1000:10.1f} ms   canonicalization: {canonicalization_time * 1000:10.1f} ms"
+            )
+
+        start = time.perf_counter()
+        SparseModel(data)
+        print(f"    {'sparse':<12} build: {(time.perf_counter() - start) * 1000:10.1f} ms")
@@ -0,0 +1,44 @@
+"""
+Time of solving a sweep of scenarios by building the model for every scenario
+vs updating the parameters of one model (ScenarioRunner)
+
+usage: python benchmarks/scenarios.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from model_build import make_data
+
+from hysut.mathematical_model.cvxpy.model import CvxpyModel
+from hysut.mathematical_model.cvxpy.scenarios import ScenarioRunner
+
+
+def rebuild(data, scenarios):
+    for changes in scenarios.values():
+        CvxpyModel(data.updated(changes)).solve(solver=solver)
+
+
+def reuse(data, scenarios):
+    for _ in ScenarioRunner(data, solver=solver).run(scenarios):
+        pass
+
+
+if __name__ == "__main__":
+    data = make_data(years=10, slices=24, regions=4)
+    solver = ScenarioRunner(data).solver
+    scenarios = {
+        f"scenario_{number}": {"variable_cost": {"tech_0": cost}}
+        for number, cost in enumerate(np.linspace(0.1, 2, 20))
+    }
+
+    print(f"{len(scenarios)} scenarios solved with {solver}")
+    for name, function in [("rebuild", rebuild), ("ScenarioRunner", reuse)]:
+        start = time.perf_counter()
+        function(data, scenarios)
+        print(f"{name:<16} time: {time.perf_counter() - start:8.3f} s")
@@ -0,0 +1,248 @@
+"""
+Time and peak memory of the preprocessing and model building stages on
+synthetic model_configs of different scales
+
+Results are written as json, so runs of different commits can be compared.
+
+usage:
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --scales small medium --compare baseline.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hysut.preprocess.clusters import check_years_clusters
+from hysut.preprocess.database import ModelDataBase
+from hysut.preprocess.time import (
+    check_time_horizon,
+    check_time_period_overlaps,
+    check_time_slices,
+    read_time_data,
+    read_time_slice_data,
+)
+from hysut.utils.enums import (
+    ALL_PERIOD,
+    CLUSTERS,
+    COMMODITIES,
+    COOL_PERIOD,
+    RUN_PERIOD,
+    SETTINGS,
+    T_SLICE,
+    TECHNOLOGIES,
+    TIME_HORIZON,
+    TIME_SLICES,
+    WARM_PERIOD,
+)
+from hysut.utils.tools import parse_range
+
+# years, time slices, clusters, regions, technologies and if the model is built
+SCALES = {
+    "small": {"years": 10, "slices": 24, "clusters": 5, "regions": 2, "technologies": 3, "model": True},
+    "medium": {"years": 50, "slices": 672, "clusters": 50, "regions": 5, "technologies": 5, "model": True},
+    # 500 clusters of two years need a horizon of 1000 years, too large for building the model
+    "huge": {"years": 1000, "slices": 8760, "clusters": 500, "regions": 10, "technologies": 10, "model": False},
+}
+
+
+def make_config(years, slices, clusters, regions, technologies, log_path, **kwargs):
+    """Synthetic model_config with all the ways of defining years and clusters"""
+    start = 2000
+    warm = max(years // 10, 1)
+    cool = max(years // 10, 1)
+    run = years - warm - cool
+    run_start = start + warm
+    half = run // 2
+
+    cluster_size = years // clusters
+    cluster_definitions = {}
+    for number in range(clusters):
+        first = start + number * cluster_size
+        cluster_definitions[f"cluster_{number}"] = (
+            f"range({first},{first + cluster_size})"
+            if number % 2
+            else list(range(first, first + cluster_size))
+        )
+
+    technology_definitions = {"gas_supply": {"output": "gas", "variable_cost": 0.5}}
+    for number in range(technologies - 1):
+        technology_definitions[f"technology_{number}"] = {
+            "output": "electricity",
+            "input": "gas" if number % 2 else None,
+            "capacity_factor": 0.5,
+            "investment_cost": 1.0 + number,
+            "variable_cost": 0.1 * number,
+            "lifetime": 20,
+        }
+
+    return {
+        TIME_HORIZON: {
+            WARM_PERIOD: [list(range(start, run_start))],
+            RUN_PERIOD: [f"range({run_start},{run_start + half})", list(range(run_start + half, run_start + run))],
+            COOL_PERIOD: [f"range({run_start + run},{start + years})"],
+        },
+        TIME_SLICES: {T_SLICE: f"range(1,{slices + 1})"},
+        CLUSTERS: cluster_definitions,
+        SETTINGS: {"log_path": log_path},
+        "regions": [f"region_{number}" for number in range(regions)],
+        COMMODITIES: {"electricity": {"demand": 1.0}, "gas": {}},
+        TECHNOLOGIES: technology_definitions,
+    }
+
+
+def stages(config, build_model):
+    """Benchmarked stages as (name, function) in the order they depend on each other"""
+    horizon = check_time_horizon(config[TIME_HORIZON])["time_horizon"]
+    periods = {period: years for period, years in horizon.items() if period != ALL_PERIOD}
+    database = ModelDataBase(config)
+
+    def validate():
+        ModelDataBase(config).validate()
+
+    def validate_cached():
+        # time_horizon, time_slices and clusters come from the section cache
+        ModelDataBase(config).validate()
+
+    def model_data():
+        from hysut.mathematical_model.utils.data import ModelData
+
+        return ModelData.from_database(database)
+
+    def model_build():
+        from hysut.mathematical_model.cvxpy.model import CvxpyModel
+        from hysut.mathematical_model.utils.data import ModelData
+
+        CvxpyModel(ModelData.from_database(database))
+
+    yield "read_time_data", lambda: read_time_data(config[TIME_HORIZON][RUN_PERIOD], RUN_PERIOD)
+    yield "read_time_slice_data", lambda: read_time_slice_data(config[TIME_SLICES][T_SLICE])
+    yield "check_time_period_overlaps", lambda: check_time_period_overlaps(periods)
+    yield "check_time_horizon", lambda: check_time_horizon(config[TIME_HORIZON])
+    yield "check_time_slices", lambda: check_time_slices(dict(config[TIME_SLICES]))
+    yield "check_years_clusters", lambda: check_years_clusters(config[CLUSTERS], horizon[ALL_PERIOD])
+    yield "validate", validate
+    yield "validate_cached", validate_cached
+
+    if build_model:
+        database.validate()
+        yield "model_data", model_data
+        yield "model_build", model_build
+
+
+def clear_caches():
+    parse_range.cache_clear()
+    ModelDataBase.section_cache.clear()
+
+
+def measure(function, repeat, cached=False):
+    """Best time of the repeats and peak traced memory of one run
+
+    The caches of the range parser and of the validated sections are cleared
+    before every run (unless cached), so parsing and validation are measured
+    as well.
+    """
+    # warm up (lazy imports and solver discovery)
+    function()
+
+    times = []
+    for _ in range(repeat):
+        if not cached:
+            clear_caches()
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    if not cached:
+        clear_caches()
+    gc.collect()
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return min(times), peak
+
+
+def commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales, repeat):
+    results = []
+    with tempfile.TemporaryDirectory() as log_path:
+        for scale in scales:
+            parameters = SCALES[scale]
+            config = make_config(log_path=log_path, **parameters)
+            for stage, function in stages(config, parameters["model"]):
+                elapsed, peak = measure(function, repeat, cached=stage.endswith("_cached"))
+                results.append({"scale": scale, "stage": stage, "time": elapsed, "peak_memory": peak})
+                print(
+                    f"{scale:<8}{stage:<28} time: {elapsed * 1000:11.3f} ms   peak memory: {peak / 2 ** 20:9.3f} MiB",
+                    file=sys.stderr,
+                )
+
+    return {
+        "meta": {
+            "commit": commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline):
+    """Ratios of time and peak memory (current / baseline) of the common stages"""
+    previous = {(item["scale"], item["stage"]): item for item in baseline["results"]}
+    for item in current["results"]:
+        old = previous.get((item["scale"], item["stage"]))
+        if old is None:
+            continue
+        print(
+            f"{item['scale']:<8}{item['stage']:<28} time: {item['time'] / old['time']:7.2f}x"
+            f"   peak memory: {item['peak_memory'] / max(old['peak_memory'], 1):7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs of every stage")
+    parser.add_argument("--output", help="json file of the results (printed to stdout if not given)")
+    parser.add_argument("--compare", help="json results of a previous run to compare with")
+    arguments = parser.parse_args()
+
+    results = run(arguments.scales, arguments.repeat)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            compare(results, json.load(file))
@@ -5,3 +5,19 @@ class EssentialSetMissing(Exception):
 
 class TimeHorizonError(Exception):
     """Raises when there are errors in the definition of time_horizon"""
+
+
+class ConfigValidationError(Exception):
+    """Raises when there are errors in the definition of model_config"""
+
+
+class SolverNotFound(Exception):
+    """Raises when no installed solver can solve the problem"""
+
+
+class InputDataError(Exception):
+    """Raises when there are errors in the input data files"""
+
+
+class ServiceBusy(Exception):
+    """Raises when the job queue of the model service is full"""
@@ -0,0 +1,172 @@
+"""
+Streaming the errors and warnings to a log file while they are produced
+"""
+
+import json
+import threading
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+
+ERROR = "error"
+WARNING = "warning"
+
+
+class LogSink:
+    """Collects errors and warnings and streams them to a JSON lines file
+
+    Every record is appended to the file (and flushed) as soon as it is logged,
+    so nothing is lost if the process stops in the middle of the validation.
+    Only the last ``buffer_size`` records are kept in memory, while the counts
+    of every level and category are always complete. Records carry the id of
+    the sink, so several sinks can share the same file.
+
+    Parameters
+    ----------
+    path : str, optional
+        JSON lines file to append the records to, by default None (memory only)
+    buffer_size : int, optional
+        number of records kept in memory, by default 1000
+    """
+
+    def __init__(self, path=None, buffer_size=1000):
+        self.path = path
+        self.id = uuid.uuid4().hex
+        self.buffer = deque(maxlen=buffer_size)
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._file = None
+        self._start = 0
+
+        if path is not None:
+            self._file = open(path, "a", encoding="utf-8")
+            self._start = self._file.tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Closes the log file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def extend(self, level, messages, category=None):
+        """Logs a group of messages with the same level and category
+
+        Parameters
+        ----------
+        level : str
+            'error' or 'warning'
+        messages : iterable
+            messages to log
+        category : str, optional
+            the item that messages belong to (e.g. time_horizon), by default None
+        """
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            for message in messages:
+                record = {
+                    "time": timestamp,
+                    "sink": self.id,
+                    "level": level,
+                    "category": category,
+                    "message": str(message),
+                }
+                self._counts[(level, category)] += 1
+                self.buffer.append(record)
+                if self._file is not None:
+                    self._file.write(json.dumps(record) + "\n")
+
+            if self._file is not None:
+                self._file.flush()
+
+    def error(self, message, category=None):
+        self.extend(ERROR, [message], category)
+
+    def warning(self, message, category=None):
+        self.extend(WARNING, [message], category)
+
+    def counts(self):
+        """Returns the number of logged records per level and category
+
+        Returns
+        -------
+        dict
+            e.g. {"error": {"time_horizon": 2}, "warning": {"settings": 1}}
+        """
+        counts = {}
+        with self._lock:
+            for (level, category), count in self._counts.items():
+                counts.setdefault(level, {})[category] = count
+
+        return counts
+
+    def records(self, level=None):
+        """Iterates over the records logged by this sink
+
+        Records are read back from the file if a path is given, otherwise only
+        the records in the memory buffer are available.
+
+        Parameters
+        ----------
+        level : str, optional
+            only records of this level, by default None (all records)
+
+        Yields
+        ------
+        dict
+        """
+        if self.path is None:
+            records = list(self.buffer)
+        else:
+            if self._file is not None:
+                self._file.flush()
+            records = self._read_file()
+
+        for record in records:
+            if level is None or record["level"] == level:
+                yield record
+
+    def _read_file(self):
+        with open(self.path, encoding="utf-8") as file:
+            file.seek(self._start)
+            for line in file:
+                record = json.loads(line)
+                # records of other sinks appending to the same file
+                if record.get("sink") == self.id:
+                    yield record
+
+    def table(self, level=None, save_file=None):
+        """Renders the records as a pretty table
+
+        Parameters
+        ----------
+        level : str, optional
+            only records of this level, by default None (all records)
+        save_file : str, optional
+            if it is not None,should contain the directory to save the file , by default None
+
+        Returns
+        -------
+        str
+            tablulated log
+        """
+        from tabulate import tabulate
+
+        table = [
+            [number, record["category"], record["message"]]
+            for number, record in enumerate(self.records(level), start=1)
+        ]
+        table = tabulate(
+            table, headers=["Number", "Item", "Error/Warning"], tablefmt="pretty"
+        )
+
+        if save_file:
+            with open(save_file, "w") as file:
+                file.write(table)
+
+        return table
@@ -0,0 +1,299 @@
+"""
+Solving independent scenarios in parallel processes
+"""
+
+import copy
+import multiprocessing
+import os
+import time
+from multiprocessing import connection
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from hysut.mathematical_model.utils.data import ModelData
+from hysut.utils.enums import DEMAND
+
+# status of the scenarios that are not solved
+TIMEOUT = "timeout"
+FAILED = "error"
+
+# alignment of the arrays in the shared memory block (bytes)
+ALIGNMENT = 64
+
+
+def _compact(array):
+    """Drops the broadcast (zero-stride) axes of an array, keeping them with size 1"""
+    index = tuple(slice(0, 1) if stride == 0 else slice(None) for stride in array.strides)
+    return np.ascontiguousarray(array[index])
+
+
+class SharedArrays:
+    """Numpy arrays stored in one shared memory block
+
+    Parameters
+    ----------
+    arrays : dict
+        {key: numpy.ndarray}
+    """
+
+    def __init__(self, arrays):
+        self.layout = {}
+        size = 0
+        for key, array in arrays.items():
+            self.layout[key] = (size, array.shape, array.dtype.str)
+            size += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+        self.memory = SharedMemory(create=True, size=max(size, 1))
+        for key, array in arrays.items():
+            self.view(self.memory, self.layout, key)[...] = array
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    @staticmethod
+    def view(memory, layout, key):
+        """Array of the key as a view of the shared memory (no copy)"""
+        offset, shape, dtype = layout[key]
+        return np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+
+    def close(self):
+        """Releases and removes the shared memory block"""
+        self.memory.close()
+        self.memory.unlink()
+
+
+def split_model_data(data):
+    """Separates the arrays of the model data from the rest
+
+    Parameters
+    ----------
+    data : ModelData
+
+    Returns
+    -------
+    tuple
+        (ModelData without the parameter arrays, {key: compact numpy.ndarray})
+    """
+    arrays = {(DEMAND, commodity): _compact(data.demand[commodity]) for commodity in data.commodities}
+    for item, values in data.parameters.items():
+        for technology in data.technologies:
+            arrays[item, technology] = _compact(values[technology])
+
+    skeleton = copy.copy(data)
+    skeleton.demand = {}
+    skeleton.parameters = {item: {} for item in data.parameters}
+
+    return skeleton, arrays
+
+
+def join_model_data(skeleton, arrays):
+    """Inverse of split_model_data
+
+    Parameters
+    ----------
+    skeleton : ModelData
+        ModelData without the parameter arrays
+    arrays : dict
+        {key: numpy.ndarray} (e.g. views of a shared memory block)
+
+    Returns
+    -------
+    ModelData
+    """
+    data = copy.copy(skeleton)
+    data.demand = {}
+    data.parameters = {item: {} for item in skeleton.parameters}
+    for (item, name), array in arrays.items():
+        target = data.demand if item == DEMAND else data.parameters[item]
+        target[name] = data._broadcast(array, array.ndim == 3)
+
+    return data
+
+
+def _worker(pipe, memory_name, layout, skeleton, solver):
+    """Solves the scenarios received from the pipe until None is received"""
+    from hysut.mathematical_model.cvxpy.scenarios import ScenarioRunner
+
+    memory = SharedMemory(name=memory_name)
+    arrays = {key: SharedArrays.view(memory, layout, key) for key in layout}
+    runner = ScenarioRunner(join_model_data(skeleton, arrays), solver=solver)
+    pipe.send(None)
+
+    while True:
+        task = pipe.recv()
+        if task is None:
+            break
+
+        name, changes = task
+        try:
+            result = runner.solve(changes)
+        except Exception as error:
+            result = {"status": FAILED, "objective": None, "variables": None, "error": repr(error)}
+        pipe.send((name, result))
+
+
+class _Worker:
+    def __init__(self, context, memory_name, layout, skeleton, solver):
+        self.pipe, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker,
+            args=(child, memory_name, layout, skeleton, solver),
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.task = None
+        self.started = None
+
+    def assign(self, task):
+        self.task = task
+        self.started = time.monotonic()
+        self.pipe.send(task)
+
+    def stop(self, timeout=1):
+        try:
+            self.pipe.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.pipe.close()
+
+
+class ScenarioExecutor:
+    """Solves scenarios of a model in a pool of processes
+
+    The parameter arrays of the base model are copied once into a shared memory
+    block that every worker maps without copying, so only the (small) changes
+    of every scenario and the results are sent between the processes. Every
+    worker builds the parametrized problem once and solves its scenarios with a
+    ScenarioRunner. A worker exceeding the timeout of a scenario is terminated
+    and replaced.
+
+    Parameters
+    ----------
+    database : ModelDataBase
+        validated database of the base scenario
+    max_workers : int, optional
+        number of processes, by default None (number of CPUs)
+    timeout : float, optional
+        maximum solution time of every scenario in seconds, by default None (no limit)
+    solver : str, optional
+        name of the solver, by default None (solver of the model settings)
+    slice_hours : array-like, optional
+        hours of the year every time slice stands for, by default None
+    context : str or multiprocessing context, optional
+        start method or context of the worker processes, by default 'spawn'
+        (forking a threaded process could copy locks held by its threads)
+    """
+
+    def __init__(
+        self,
+        database,
+        max_workers=None,
+        timeout=None,
+        solver=None,
+        slice_hours=None,
+        context="spawn",
+    ):
+        self.data = ModelData.from_database(database, slice_hours=slice_hours)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.solver = solver
+        if isinstance(context, str):
+            context = multiprocessing.get_context(context)
+        self.context = context
+
+    def run(self, scenarios):
+        """Solves the scenarios and yields the results as soon as they are ready
+
+        Parameters
+        ----------
+        scenarios : dict, list
+            {name: changes} or list of changes to the base data (see ModelData.updated),
+            scenarios of a list are named by their position
+
+        Yields
+        ------
+        tuple
+            (name, result) with the result of ScenarioRunner.solve. Scenarios that
+            are not solved have the status 'timeout' or 'error' (with the 'error' message).
+        """
+        if not isinstance(scenarios, dict):
+            scenarios = dict(enumerate(scenarios))
+        tasks = list(scenarios.items())[::-1]
+        if not tasks:
+            return
+
+        skeleton, arrays = split_model_data(self.data)
+        shared = SharedArrays(arrays)
+        workers = []
+
+        def start_worker():
+            workers.append(_Worker(self.context, shared.name, shared.layout, skeleton, self.solver))
+
+        def unsolved(status, message):
+            return {"status": status, "objective": None, "variables": None, "error": message}
+
+        try:
+            for _ in range(min(self.max_workers, len(tasks))):
+                start_worker()
+
+            remaining = len(tasks)
+            while remaining:
+                deadlines = [
+                    worker.started + self.timeout
+                    for worker in workers
+                    if worker.task is not None and self.timeout is not None
+                ]
+                wait = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+
+                for pipe in connection.wait([worker.pipe for worker in workers], wait):
+                    worker = next(worker for worker in workers if worker.pipe is pipe)
+                    try:
+                        message = pipe.recv()
+                    except (EOFError, OSError):
+                        # the worker died
+                        workers.remove(worker)
+                        worker.stop()
+                        if worker.task is None:
+                            raise RuntimeError("scenario worker failed to start.")
+                        remaining -= 1
+                        yield worker.task[0], unsolved(FAILED, "worker process stopped unexpectedly.")
+                        start_worker()
+                        continue
+
+                    if message is None:
+                        worker.ready = True
+                    else:
+                        remaining -= 1
+                        worker.task = None
+                        yield message
+
+                    if tasks:
+                        worker.assign(tasks.pop())
+
+                if self.timeout is not None:
+                    now = time.monotonic()
+                    for worker in [
+                        worker
+                        for worker in workers
+                        if worker.task is not None and now - worker.started >= self.timeout
+                    ]:
+                        workers.remove(worker)
+                        worker.process.terminate()
+                        worker.stop()
+                        remaining -= 1
+                        yield worker.task[0], unsolved(
+                            TIMEOUT, f"scenario is not solved in {self.timeout} seconds."
+                        )
+                        if tasks:
+                            start_worker()
+        finally:
+            for worker in workers:
+                worker.stop()
+            shared.close()
@@ -0,0 +1,484 @@
+"""
+Asynchronous service running models as jobs
+
+A submitted model_config is validated right away (on a thread, without blocking
+the event loop) and, if valid, queued for building and solving on a bounded
+pool of workers. Every job is built and solved in its own process, so running
+jobs can be cancelled as well as queued ones.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from hysut.exceptions_logging.exceptions import (
+    ConfigValidationError,
+    EssentialSetMissing,
+    InputDataError,
+    ServiceBusy,
+    SolverNotFound,
+    TimeHorizonError,
+)
+from hysut.interface.executor import FAILED
+from hysut.mathematical_model.backends import create_model
+from hysut.mathematical_model.utils.data import ModelData
+from hysut.preprocess.database import ModelDataBase
+from hysut.utils.enums import SETTINGS
+
+# status of the jobs
+INVALID = "invalid"
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+
+FINISHED = [INVALID, DONE, FAILED, CANCELLED]
+
+# steps of a job reported as progress
+MODEL_DATA = "model_data"
+BUILD = "build"
+SOLVE = "solve"
+PROGRESS_STEPS = [QUEUED, MODEL_DATA, BUILD, SOLVE, DONE]
+
+# finished jobs kept by the service by default
+MAX_FINISHED = 1000
+
+
+def _validate(model_config, input_data):
+    """Validates a model_config (and reads its input data)
+
+    Returns
+    -------
+    tuple
+        (ModelDataBase, list of errors)
+    """
+    database = ModelDataBase(model_config)
+    try:
+        database.validate()
+        if input_data is not None:
+            database.read_input_data(input_data)
+    except (ConfigValidationError, InputDataError) as error:
+        # input data errors are only listed in the error_log file
+        return database, list(database.errors) or [str(error)]
+    except (EssentialSetMissing, TimeHorizonError, SolverNotFound) as error:
+        return database, [str(error)]
+    except TypeError as error:
+        # items of unexpected types in the model_config
+        return database, [f"model_config cannot be validated: {error}"]
+    except (ValueError, OSError) as error:
+        # unsupported or missing input data files
+        return database, [f"input data cannot be read: {error}"]
+
+    return database, []
+
+
+def _run_job(pipe, data, backend):
+    """Builds and solves the model in the job process, reporting every step"""
+    try:
+        pipe.send((BUILD, None))
+        model = create_model(data, backend)
+        pipe.send((SOLVE, None))
+        objective = model.solve()
+        pipe.send(
+            (DONE, {"status": model.status, "objective": objective, "variables": model.values()})
+        )
+    except Exception as error:
+        pipe.send((FAILED, repr(error)))
+    finally:
+        pipe.close()
+
+
+def _receive(pipe, process, progress):
+    """Forwards the progress of a job process and returns its last message"""
+    try:
+        while True:
+            try:
+                step, value = pipe.recv()
+            except (EOFError, OSError):
+                return FAILED, "job process stopped unexpectedly."
+
+            if step in (DONE, FAILED):
+                return step, value
+            progress(step)
+    finally:
+        process.join()
+        pipe.close()
+
+
+class Job:
+    """State of a submitted model_config
+
+    Parameters
+    ----------
+    name : str
+        id of the job
+    database : ModelDataBase
+        validated database of the model_config
+    errors : list
+        validation errors (the job is invalid if any)
+    """
+
+    def __init__(self, name, database, errors):
+        self.name = name
+        self.database = database
+        self.errors = errors
+        self.warnings = list(database.warnings)
+        self.status = QUEUED
+        self.step = QUEUED
+        self.result = None
+        self.error = None
+        self.process = None
+        self.finished = asyncio.Event()
+
+    def finish(self, status, result=None, error=None):
+        self.status = status
+        self.result = result
+        self.error = error
+        if status == DONE:
+            self.step = DONE
+        self.finished.set()
+
+    def info(self, result=False):
+        """Status of the job as a dict
+
+        Parameters
+        ----------
+        result : bool, optional
+            include the result of the job, by default False
+
+        Returns
+        -------
+        dict
+            {
+                "job" : id of the job,
+                "status" : 'invalid', 'queued', 'running', 'done', 'error' or 'cancelled',
+                "progress" : {"step": last step reached, "fraction": float},
+                "errors" : validation errors,
+                "warnings" : validation warnings,
+                "error" : message of a failed job,
+                "result" : (if asked) {"status", "objective", "variables"} of a done job,
+            }
+        """
+        info = {
+            "job": self.name,
+            "status": self.status,
+            "progress": {
+                "step": self.step,
+                "fraction": PROGRESS_STEPS.index(self.step) / (len(PROGRESS_STEPS) - 1),
+            },
+            "errors": list(self.errors),
+            "warnings": list(self.warnings),
+            "error": self.error,
+        }
+        if result:
+            info["result"] = self.result
+
+        return info
+
+
+class ModelService:
+    """Runs model_configs as jobs on a bounded pool of workers
+
+    Use it as an async context manager (or call start and close) inside a
+    running event loop.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        number of jobs built and solved at the same time, by default 1
+    max_queued : int, optional
+        number of valid jobs waiting for a worker. Submissions beyond it raise
+        ServiceBusy (or wait for a free place), by default None (max_workers)
+    context : multiprocessing context, optional
+        context of the job processes, by default None ('spawn', forking the
+        threads of the service could copy locks held by them)
+    max_finished : int, optional
+        number of finished jobs kept, the oldest ones are forgotten when new
+        jobs are submitted, by default MAX_FINISHED (None keeps all of them)
+    """
+
+    def __init__(self, max_workers=1, max_queued=None, context=None, max_finished=MAX_FINISHED):
+        if max_workers < 1 or (max_queued is not None and max_queued < 1):
+            raise ValueError("max_workers and max_queued should be at least 1.")
+        if max_finished is not None and max_finished < 0:
+            raise ValueError("max_finished should not be negative.")
+
+        self.max_workers = max_workers
+        self.max_queued = max_workers if max_queued is None else max_queued
+        self.max_finished = max_finished
+        self.context = context or multiprocessing.get_context("spawn")
+        self.jobs = {}
+        self._queue = None
+        self._workers = []
+        self._threads = None
+
+    async def start(self):
+        """Starts the workers"""
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        # one thread per worker waits for its job process
+        self._threads = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.max_workers)]
+
+    async def close(self):
+        """Cancels the unfinished jobs and stops the workers"""
+        for job in self.jobs.values():
+            self._cancel(job)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._threads.shutdown(wait=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def submit(self, model_config, input_data=None, wait=False):
+        """Validates a model_config and queues it for building and solving
+
+        Parameters
+        ----------
+        model_config : dict
+            definition of the model (see ModelDataBase)
+        input_data : str, optional
+            path of the input data tables (see ModelDataBase.read_input_data), by default None
+        wait : bool, optional
+            wait for a free place if the queue is full, by default False (raise ServiceBusy)
+
+        Returns
+        -------
+        dict
+            status of the job (see Job.info). Jobs with validation errors are
+            'invalid' and never queued.
+
+        Raises
+        ------
+        ServiceBusy
+            if the queue is full and wait is False
+        RuntimeError
+            if the service is not started
+        """
+        if self._queue is None:
+            raise RuntimeError("the service is not running, start it before submitting jobs.")
+
+        if not wait and self._queue.full():
+            raise ServiceBusy(f"{self.max_queued} jobs are already waiting for a worker.")
+
+        loop = asyncio.get_running_loop()
+        database, errors = await loop.run_in_executor(None, _validate, model_config, input_data)
+        job = Job(uuid.uuid4().hex, database, errors)
+        self._forget_finished()
+        # registered before queueing, so it can be polled/cancelled as soon as a worker takes it
+        self.jobs[job.name] = job
+
+        if errors:
+            job.finish(INVALID)
+        elif wait:
+            try:
+                await self._queue.put(job)
+            except asyncio.CancelledError:
+                job.finish(CANCELLED)
+                raise
+        else:
+            try:
+                self._queue.put_nowait(job)
+            except asyncio.QueueFull:
+                del self.jobs[job.name]
+                raise ServiceBusy(
+                    f"{self.max_queued} jobs are already waiting for a worker."
+                ) from None
+
+        return job.info()
+
+    async def status(self, name):
+        """Returns the status of a job (see Job.info)"""
+        return self._job(name).info()
+
+    async def result(self, name, timeout=None):
+        """Waits for a job to finish and returns its status with the result
+
+        Parameters
+        ----------
+        name : str
+            id of the job
+        timeout : float, optional
+            maximum waiting time in seconds, by default None
+
+        Returns
+        -------
+        dict
+            see Job.info (with the result)
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            if the job is not finished in time
+        """
+        job = self._job(name)
+        await asyncio.wait_for(job.finished.wait(), timeout)
+
+        return job.info(result=True)
+
+    async def cancel(self, name):
+        """Cancels a queued or running job
+
+        Returns
+        -------
+        bool
+            False if the job is already finished
+        """
+        return self._cancel(self._job(name))
+
+    async def forget(self, name):
+        """Removes a finished job from the service
+
+        Raises
+        ------
+        ValueError
+            if the job is not finished (cancel it first)
+        """
+        if self._job(name).status not in FINISHED:
+            raise ValueError(f"job '{name}' is not finished.")
+
+        del self.jobs[name]
+
+    def _forget_finished(self):
+        if self.max_finished is None:
+            return
+
+        # jobs are kept in the order of submission
+        finished = [name for name, job in self.jobs.items() if job.status in FINISHED]
+        for name in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self.jobs[name]
+
+    def _job(self, name):
+        if name not in self.jobs:
+            raise KeyError(f"job '{name}' does not exist.")
+
+        return self.jobs[name]
+
+    def _cancel(self, job):
+        if job.status in FINISHED:
+            return False
+
+        if job.process is not None and job.process.is_alive():
+            job.process.terminate()
+        job.finish(CANCELLED)
+        return True
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                # cancelled jobs are dropped when they reach a worker
+                if job.status == QUEUED:
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job):
+        loop = asyncio.get_running_loop()
+        job.status = RUNNING
+        job.step = MODEL_DATA
+
+        try:
+            data = await loop.run_in_executor(
+                self._threads, ModelData.from_database, job.database
+            )
+        except Exception as error:
+            job.finish(FAILED, error=repr(error))
+            return
+
+        if job.status == CANCELLED:
+            return
+
+        def progress(step):
+            loop.call_soon_threadsafe(setattr, job, "step", step)
+
+        reader, writer = self.context.Pipe(duplex=False)
+        job.process = self.context.Process(
+            target=_run_job,
+            args=(writer, data, job.database.model_config[SETTINGS]["backend"]),
+            daemon=True,
+        )
+        job.process.start()
+        writer.close()
+
+        try:
+            step, value = await loop.run_in_executor(
+                self._threads, _receive, reader, job.process, progress
+            )
+        except asyncio.CancelledError:
+            # the service is closed
+            job.process.terminate()
+            raise
+
+        if job.status == CANCELLED:
+            return
+
+        if step == DONE:
+            job.finish(DONE, result=value)
+        else:
+            job.finish(FAILED, error=value)
+
+
+class LocalClient:
+    """Synchronous client of a ModelService running in the same process
+
+    The event loop of the service runs in a background thread, so the service
+    can be used (and tested) from synchronous code.
+
+    Parameters
+    ----------
+    **kwargs
+        passed to ModelService
+    """
+
+    def __init__(self, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self.service = ModelService(**kwargs)
+        self._call(self.service.start())
+
+    def _call(self, coroutine, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def submit(self, model_config, input_data=None, wait=False):
+        """See ModelService.submit"""
+        return self._call(self.service.submit(model_config, input_data, wait))
+
+    def status(self, name):
+        """See ModelService.status"""
+        return self._call(self.service.status(name))
+
+    def result(self, name, timeout=None):
+        """See ModelService.result"""
+        return self._call(self.service.result(name, timeout))
+
+    def cancel(self, name):
+        """See ModelService.cancel"""
+        return self._call(self.service.cancel(name))
+
+    def forget(self, name):
+        """See ModelService.forget"""
+        return self._call(self.service.forget(name))
+
+    def close(self):
+        """Closes the service and stops its event loop"""
+        self._call(self.service.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
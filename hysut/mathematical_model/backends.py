@@ -0,0 +1,32 @@
+"""
+Selecting the formulation of the model (the backend setting)
+"""
+
+from hysut.utils.enums import CVXPY, SPARSE
+
+
+def create_model(data, backend=CVXPY):
+    """Builds the model with the given backend
+
+    Parameters
+    ----------
+    data : ModelData
+        numeric data of the model
+    backend : str, optional
+        'cvxpy' (CvxpyModel) or 'sparse' (SparseModel), by default 'cvxpy'
+
+    Returns
+    -------
+    CvxpyModel, SparseModel
+    """
+    if backend == CVXPY:
+        from hysut.mathematical_model.cvxpy.model import CvxpyModel
+
+        return CvxpyModel(data)
+
+    if backend == SPARSE:
+        from hysut.mathematical_model.sparse.model import SparseModel
+
+        return SparseModel(data)
+
+    raise ValueError(f"{backend} is not a valid backend. Valid backends are {[CVXPY, SPARSE]}.")
@@ -0,0 +1,198 @@
+"""
+Vectorized cvxpy formulation of the model
+"""
+
+import cvxpy as cp
+from hysut.exceptions_logging.exceptions import InputDataError
+from hysut.mathematical_model.equations.constraints import (
+    balance_constraints,
+    capacity_constraints,
+)
+from hysut.mathematical_model.equations.objective import total_cost
+from hysut.utils.enums import CAPACITY, EXISTING_CAPACITY, NEW_CAPACITY, PRODUCTION
+from hysut.utils.instrumentation import active_profiler, section, timed
+
+
+class CvxpyModel:
+    """Builds the model with one matrix variable per technology
+
+    Every technology has a production variable of shape (years*time_slices,
+    regions) and a new capacity variable of shape (years, regions). Constraints
+    and the objective are built with array operations over these variables, so
+    the number of cvxpy expressions grows with the number of technologies and
+    commodities, not with the number of years, time slices or regions.
+
+    Parameters
+    ----------
+    data : ModelData
+        numeric data of the model
+    parametrize : bool, optional
+        build the numeric inputs as cvxpy Parameters so that they can be changed
+        with :meth:`update` without building the problem again, by default False
+    """
+
+    @timed("model.build")
+    def __init__(self, data, parametrize=False):
+        self.data = data
+        years, slices, regions = data.shape
+
+        coefficients = data.coefficients()
+        if parametrize:
+            self.parameters = {
+                key: cp.Parameter(value.shape, value=value, name="_".join(key))
+                for key, value in coefficients.items()
+            }
+            coefficients = self.parameters
+        else:
+            self.parameters = {}
+
+        self.variables = {
+            PRODUCTION: {
+                technology: cp.Variable(
+                    (years * slices, regions), nonneg=True, name=f"{PRODUCTION}_{technology}"
+                )
+                for technology in data.technologies
+            },
+            NEW_CAPACITY: {
+                technology: cp.Variable(
+                    (years, regions), nonneg=True, name=f"{NEW_CAPACITY}_{technology}"
+                )
+                for technology in data.technologies
+            },
+        }
+
+        self.expressions = {
+            CAPACITY: {
+                technology: coefficients[EXISTING_CAPACITY, technology]
+                + data.active_capacity(technology) @ self.variables[NEW_CAPACITY][technology]
+                for technology in data.technologies
+            }
+        }
+
+        production = self.variables[PRODUCTION]
+        new_capacity = self.variables[NEW_CAPACITY]
+        self.constraints = capacity_constraints(
+            data, coefficients, production, new_capacity
+        ) + balance_constraints(data, coefficients, production)
+        self.objective = cp.Minimize(
+            total_cost(data, coefficients, production, new_capacity)
+        )
+        self.problem = cp.Problem(self.objective, self.constraints)
+
+    def update(self, data):
+        """Sets the values of the parameters from new model data
+
+        Only the numeric inputs can change, the sets, the technology structure
+        (inputs, outputs, efficiencies and lifetimes) and the weights of the
+        years and time slices should be the same as the data of the model.
+
+        Parameters
+        ----------
+        data : ModelData
+
+        Raises
+        ------
+        InputDataError
+            if the model is not parametrized or the data does not match the model
+        """
+        if not self.parameters:
+            raise InputDataError("only parametrized models can be updated.")
+
+        if (
+            data.shape != self.data.shape
+            or data.technologies != self.data.technologies
+            or data.commodities != self.data.commodities
+        ):
+            raise InputDataError("sets of the new data do not match the sets of the model.")
+
+        for key, value in data.coefficients().items():
+            self.parameters[key].value = value
+
+        self.data = data
+
+    @property
+    def status(self):
+        """Status of the last solution (None if not solved)"""
+        return self.problem.status
+
+    def size(self):
+        """Returns the number of scalar variables and constraints of the problem
+
+        Returns
+        -------
+        dict
+            {"variables": int, "constraints": int}
+        """
+        return {
+            "variables": sum(variable.size for variable in self.problem.variables()),
+            "constraints": sum(constraint.size for constraint in self.problem.constraints),
+        }
+
+    def values(self):
+        """Values of the variables after solving
+
+        Returns
+        -------
+        dict
+            {variable: {technology: numpy.ndarray}}
+        """
+        return {
+            name: {technology: variable.value for technology, variable in variables.items()}
+            for name, variables in self.variables.items()
+        }
+
+    def solve(self, solver=None, **kwargs):
+        """Solves the model
+
+        Parameters
+        ----------
+        solver : str, optional
+            name of the solver, by default None (solver of the model data)
+        **kwargs
+            passed to cvxpy.Problem.solve
+
+        Returns
+        -------
+        float
+            optimal value of the objective
+        """
+        with section("model.solve"):
+            value = self.problem.solve(solver=solver or self.data.solver, **kwargs)
+
+        profiler = active_profiler()
+        if profiler is not None:
+            # split of the solve time reported by cvxpy and the solver
+            compilation_time = getattr(self.problem, "compilation_time", None)
+            solve_time = getattr(self.problem.solver_stats, "solve_time", None)
+            if compilation_time is not None:
+                profiler.record("model.canonicalization", compilation_time)
+            if solve_time is not None:
+                profiler.record("model.solver", solve_time)
+
+        return value
+
+
+def clustering_report(data, blocks):
+    """Compares the size of the model with one decision block per year and per cluster
+
+    Parameters
+    ----------
+    data : ModelData
+        data of the model (not clustered)
+    blocks : list
+        arrays of years of every block (see ClusterIndex.blocks)
+
+    Returns
+    -------
+    dict
+        {
+            "years": {"blocks": int, "variables": int, "constraints": int},
+            "clusters": {"blocks": int, "variables": int, "constraints": int},
+        }
+    """
+    clustered = data.clustered(blocks)
+
+    return {
+        "years": {"blocks": len(data.years), **CvxpyModel(data).size()},
+        "clusters": {"blocks": len(clustered.years), **CvxpyModel(clustered).size()},
+    }
@@ -0,0 +1,195 @@
+"""
+Rolling-horizon (myopic) solution of the model as a series of smaller problems
+"""
+
+import numpy as np
+from hysut.mathematical_model.cvxpy.model import CvxpyModel
+from hysut.mathematical_model.utils.data import ModelData
+from hysut.utils.enums import (
+    COOL_PERIOD,
+    EXISTING_CAPACITY,
+    INVESTMENT_COST,
+    NEW_CAPACITY,
+    PRODUCTION,
+    RUN_PERIOD,
+    VARIABLE_COST,
+    WARM_PERIOD,
+)
+from hysut.utils.sets import TimeSet
+
+
+def horizon_windows(years, cluster_index, foresight=1):
+    """Splits the time horizon into the windows of a rolling-horizon solution
+
+    Every cluster of the run period (or every unclustered year) is the decision
+    block of one window. The warm_up years are decided with the first window and
+    the cool_down years are only used as look-ahead. Every window looks ahead
+    over the next ``foresight`` blocks.
+
+    Parameters
+    ----------
+    years : dict
+        validated time_horizon (see check_time_horizon)
+    cluster_index : ClusterIndex
+        index of the clusters over all the years
+    foresight : int, optional
+        number of blocks after the decision block included in every window, by default 1
+
+    Returns
+    -------
+    list
+        [{"decision": numpy.ndarray of years, "look_ahead": numpy.ndarray of years}]
+    """
+    def period(name):
+        return TimeSet.from_iterable(years.get(name, [])).to_array()
+
+    decisions = cluster_index.blocks(period(RUN_PERIOD))
+    if decisions and len(period(WARM_PERIOD)):
+        decisions[0] = np.union1d(period(WARM_PERIOD), decisions[0])
+
+    blocks = decisions + cluster_index.blocks(period(COOL_PERIOD))
+
+    return [
+        {
+            "decision": decision,
+            "look_ahead": np.concatenate(
+                [np.array([], dtype=decision.dtype), *blocks[number + 1 : number + 1 + foresight]]
+            ),
+        }
+        for number, decision in enumerate(decisions)
+    ]
+
+
+class RollingHorizon:
+    """Solves the model window by window with myopic foresight
+
+    Windows are solved in order. Decisions of the decision years of every window
+    are fixed, and the capacity built in them is carried forward as existing
+    capacity of the next windows (according to the lifetime of the
+    technologies). Only the data of one window is built into a problem at a
+    time, so the memory is bounded by the size of the largest window.
+
+    Parameters
+    ----------
+    data : ModelData
+        data of the whole horizon
+    windows : list
+        windows of the solution (see horizon_windows)
+    """
+
+    def __init__(self, data, windows):
+        self.data = data
+        self.windows = windows
+
+    @classmethod
+    def from_database(cls, database, foresight=1, slice_hours=None):
+        """Creates the rolling-horizon solution of a validated ModelDataBase
+
+        Parameters
+        ----------
+        database : ModelDataBase
+        foresight : int, optional
+            number of blocks (clusters or years) to look ahead, by default 1
+        slice_hours : array-like, optional
+            hours of the year every time slice stands for, by default None
+
+        Returns
+        -------
+        RollingHorizon
+        """
+        return cls(
+            ModelData.from_database(database, slice_hours=slice_hours),
+            horizon_windows(database.years, database.cluster_index, foresight),
+        )
+
+    def solve(self, solver=None, **kwargs):
+        """Solves all the windows
+
+        Parameters
+        ----------
+        solver : str, optional
+            name of the solver, by default None (solver of the model data)
+        **kwargs
+            passed to cvxpy.Problem.solve
+
+        Returns
+        -------
+        dict
+            {
+                "status" : list of the status of every window,
+                "objective" : total cost of the decision years,
+                "variables" : {variable: {technology: numpy.ndarray}} over the
+                    whole horizon (NaN for the years that are only look-ahead),
+            }
+        """
+        data = self.data
+        years, slices, regions = data.shape
+        variables = {
+            PRODUCTION: {
+                technology: np.full((years, slices, regions), np.nan)
+                for technology in data.technologies
+            },
+            NEW_CAPACITY: {
+                technology: np.full((years, regions), np.nan)
+                for technology in data.technologies
+            },
+        }
+        active = {technology: data.active_capacity(technology) for technology in data.technologies}
+        fixed = np.zeros(years, dtype=bool)
+        status = []
+
+        for window in self.windows:
+            positions = np.searchsorted(data.years, np.union1d(window["decision"], window["look_ahead"]))
+            decided = np.isin(data.years[positions], window["decision"])
+
+            # capacity built in the previous windows
+            existing = {
+                technology: data.parameters[EXISTING_CAPACITY][technology][positions]
+                + active[technology][np.ix_(positions, fixed)]
+                @ variables[NEW_CAPACITY][technology][fixed]
+                for technology in data.technologies
+            }
+            window_data = data.subset(positions).updated({EXISTING_CAPACITY: existing})
+
+            model = CvxpyModel(window_data)
+            model.solve(solver=solver, **kwargs)
+            status.append(model.problem.status)
+            if model.problem.status not in ("optimal", "optimal_inaccurate"):
+                break
+
+            for technology in data.technologies:
+                production = model.variables[PRODUCTION][technology].value.reshape(
+                    len(positions), slices, regions
+                )
+                variables[PRODUCTION][technology][positions[decided]] = production[decided]
+                variables[NEW_CAPACITY][technology][positions[decided]] = model.variables[
+                    NEW_CAPACITY
+                ][technology].value[decided]
+            fixed[positions[decided]] = True
+
+        variables[PRODUCTION] = {
+            technology: values.reshape(years * slices, regions)
+            for technology, values in variables[PRODUCTION].items()
+        }
+
+        return {
+            "status": status,
+            "objective": self._cost(variables, fixed),
+            "variables": variables,
+        }
+
+    def _cost(self, variables, fixed):
+        """Total cost of the fixed years"""
+        data = self.data
+        rows = np.repeat(fixed, data.shape[1])
+        weights = data.row_weights()[rows]
+        cost = 0.0
+        for technology in data.technologies:
+            variable_cost = data.year_rows(data.parameters[VARIABLE_COST][technology][fixed])
+            cost += np.sum(variable_cost * weights * variables[PRODUCTION][technology][rows])
+            cost += np.sum(
+                data.parameters[INVESTMENT_COST][technology][fixed]
+                * variables[NEW_CAPACITY][technology][fixed]
+            )
+
+        return float(cost)
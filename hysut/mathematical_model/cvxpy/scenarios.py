@@ -0,0 +1,85 @@
+"""
+Solving many scenarios of the same model by changing the parameter values
+"""
+
+from hysut.mathematical_model.cvxpy.model import CvxpyModel
+from hysut.utils.defaults import ModelSettings
+from hysut.utils.solvers import SOLVER_REGISTRY
+
+
+class ScenarioRunner:
+    """Solves scenarios that differ only in numeric inputs (costs, demands, ...)
+
+    The problem is built once with cvxpy Parameters for the numeric inputs. As
+    the problem is DPP, cvxpy caches its canonicalization on the first solve and
+    every next scenario only updates the parameter values before solving. The
+    previous solution is used as the starting point if the solver supports warm
+    start.
+
+    Parameters
+    ----------
+    data : ModelData
+        data of the base scenario
+    solver : str, optional
+        name of the solver, by default None (solver of the data or the default
+        solver of ModelSettings)
+    """
+
+    def __init__(self, data, solver=None):
+        self.base = data
+        self.model = CvxpyModel(data, parametrize=True)
+        self.solver = solver or data.solver or ModelSettings().solver
+        self.warm_start = SOLVER_REGISTRY.warm_start(self.solver)
+
+    def solve(self, changes=None, **kwargs):
+        """Solves one scenario
+
+        Parameters
+        ----------
+        changes : dict, optional
+            changes to the base data (see ModelData.updated), by default None (base scenario)
+        **kwargs
+            passed to cvxpy.Problem.solve
+
+        Returns
+        -------
+        dict
+            {
+                "status" : status of the problem,
+                "objective" : optimal value of the objective,
+                "variables" : {variable: {technology: numpy.ndarray}},
+            }
+        """
+        self.model.update(self.base.updated(changes or {}))
+        kwargs.setdefault("warm_start", self.warm_start)
+        objective = self.model.solve(solver=self.solver, **kwargs)
+
+        return {
+            "status": self.model.problem.status,
+            "objective": objective,
+            "variables": {
+                name: {
+                    technology: None if variable.value is None else variable.value.copy()
+                    for technology, variable in variables.items()
+                }
+                for name, variables in self.model.variables.items()
+            },
+        }
+
+    def run(self, scenarios, **kwargs):
+        """Solves the scenarios one after the other
+
+        Parameters
+        ----------
+        scenarios : dict
+            {name: changes to the base data (see ModelData.updated)}
+        **kwargs
+            passed to cvxpy.Problem.solve
+
+        Yields
+        ------
+        tuple
+            (name, result of ScenarioRunner.solve)
+        """
+        for name, changes in scenarios.items():
+            yield name, self.solve(changes, **kwargs)
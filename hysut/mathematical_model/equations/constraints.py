@@ -0,0 +1,133 @@
+"""
+Vectorized constraints of the model
+
+Production variables have one row per (year, time slice) and one column per
+region, capacities have one row per year. Every function returns the list of
+cvxpy constraints for all the technologies/commodities at once.
+"""
+
+import cvxpy as cp
+import numpy as np
+import scipy.sparse as sp
+from hysut.exceptions_logging.exceptions import InputDataError
+from hysut.mathematical_model.utils.data import EXISTING_PRODUCTION
+from hysut.utils.enums import CAPACITY_FACTOR, DEMAND
+
+
+def year_expansion(data):
+    """Sparse (years*time_slices, years) matrix repeating yearly rows for every time slice"""
+    years, slices, _ = data.shape
+    return sp.kron(sp.eye(years), np.ones((slices, 1)), format="csr")
+
+
+def check_supply(data):
+    """Checks that every commodity with a demand is produced by a technology
+
+    Parameters
+    ----------
+    data : ModelData
+
+    Raises
+    ------
+    InputDataError
+        if a commodity has a nonzero demand but no technology produces it
+    """
+    produced = set(data.output.values())
+    unsupplied = [
+        commodity
+        for commodity in data.commodities
+        if commodity not in produced and np.any(data.demand[commodity] != 0)
+    ]
+    if unsupplied:
+        raise InputDataError(
+            f"commodities {unsupplied} have a demand but no technology produces them."
+        )
+
+
+def capacity_constraints(data, coefficients, production, new_capacity):
+    """Production of every technology is limited by its available capacity
+
+    production[y*s, r] <= capacity_factor[y*s, r] * (active new capacity[y, r])
+                          + existing_production[y*s, r]
+
+    Production is the average rate in the time slice (in units of capacity).
+    Coefficients only multiply variables, so the constraints are DPP when they
+    are cvxpy Parameters.
+
+    Parameters
+    ----------
+    data : ModelData
+    coefficients : dict
+        arrays or cvxpy Parameters of ModelData.coefficients
+    production : dict
+        {technology: cvxpy.Variable (years*time_slices, regions)}
+    new_capacity : dict
+        {technology: cvxpy.Variable (years, regions)}
+
+    Returns
+    -------
+    list
+        cvxpy constraints
+    """
+    expansion = year_expansion(data)
+    constraints = []
+    for technology in data.technologies:
+        # new capacity of every year active in every (year, time slice)
+        active = sp.csr_matrix(expansion @ data.active_capacity(technology))
+        constraints.append(
+            production[technology]
+            <= cp.multiply(
+                coefficients[CAPACITY_FACTOR, technology],
+                active @ new_capacity[technology],
+            )
+            + coefficients[EXISTING_PRODUCTION, technology]
+        )
+
+    return constraints
+
+
+def balance_constraints(data, coefficients, production):
+    """Supply of every commodity covers its demand and the consumption of other technologies
+
+    sum(production[output == c]) - sum(production[input == c] / efficiency) >= demand[c]
+
+    Commodities that are not produced or consumed by any technology (and have
+    no demand) are skipped.
+
+    Parameters
+    ----------
+    data : ModelData
+    coefficients : dict
+        arrays or cvxpy Parameters of ModelData.coefficients
+    production : dict
+        {technology: cvxpy.Variable (years*time_slices, regions)}
+
+    Returns
+    -------
+    list
+        cvxpy constraints
+
+    Raises
+    ------
+    InputDataError
+        if a commodity has a nonzero demand but no technology produces it
+    """
+    check_supply(data)
+
+    constraints = []
+    for commodity in data.commodities:
+        terms = [
+            production[technology]
+            for technology in data.technologies
+            if data.output[technology] == commodity
+        ] + [
+            -production[technology] / data.efficiency[technology]
+            for technology in data.technologies
+            if data.input[technology] == commodity
+        ]
+        if not terms:
+            continue
+
+        constraints.append(sum(terms[1:], terms[0]) >= coefficients[DEMAND, commodity])
+
+    return constraints
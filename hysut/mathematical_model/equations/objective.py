@@ -0,0 +1,43 @@
+"""
+Objective function of the model
+"""
+
+import cvxpy as cp
+from hysut.utils.enums import INVESTMENT_COST, VARIABLE_COST
+
+
+def total_cost(data, coefficients, production, new_capacity):
+    """Total variable and investment cost of all the technologies
+
+    Variable costs are weighted by the hours of every time slice and the weight
+    of every year (see ModelData.coefficients).
+
+    Parameters
+    ----------
+    data : ModelData
+    coefficients : dict
+        arrays or cvxpy Parameters of ModelData.coefficients
+    production : dict
+        {technology: cvxpy.Variable (years*time_slices, regions)}
+    new_capacity : dict
+        {technology: cvxpy.Variable (years, regions)}
+
+    Returns
+    -------
+    cvxpy.Expression
+    """
+    costs = []
+    for technology in data.technologies:
+        costs.append(
+            cp.sum(cp.multiply(coefficients[VARIABLE_COST, technology], production[technology]))
+        )
+        costs.append(
+            cp.sum(
+                cp.multiply(
+                    coefficients[INVESTMENT_COST, technology],
+                    new_capacity[technology],
+                )
+            )
+        )
+
+    return cp.sum(cp.hstack(costs)) if costs else cp.Constant(0)
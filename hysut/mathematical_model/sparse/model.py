@@ -0,0 +1,247 @@
+"""
+Matrix-direct formulation of the model with scipy.sparse
+
+The LP is assembled as
+    minimize c @ x  subject to  A @ x <= b,  x >= 0
+directly from the coefficients of the model data, without cvxpy
+canonicalization. It is the same model as CvxpyModel.
+"""
+
+import warnings
+
+import numpy as np
+import scipy.sparse as sp
+from hysut.mathematical_model.equations.constraints import check_supply, year_expansion
+from hysut.mathematical_model.utils.data import EXISTING_PRODUCTION
+from hysut.utils.enums import (
+    CAPACITY_FACTOR,
+    DEMAND,
+    HIGHS,
+    INVESTMENT_COST,
+    NEW_CAPACITY,
+    PRODUCTION,
+    VARIABLE_COST,
+)
+from hysut.utils.instrumentation import section, timed
+
+# status of the scipy.optimize.linprog results as cvxpy statuses
+LINPROG_STATUS = {
+    0: "optimal",
+    1: "user_limit",
+    2: "infeasible",
+    3: "unbounded",
+    4: "solver_error",
+}
+
+
+class SparseModel:
+    """Builds the constraint matrix of the model directly as sparse blocks
+
+    Variables are the flattened production (years*time_slices*regions) and
+    new capacity (years*regions) of every technology, in the order of the
+    technologies.
+
+    Parameters
+    ----------
+    data : ModelData
+        numeric data of the model
+
+    Raises
+    ------
+    InputDataError
+        if a commodity has a nonzero demand but no technology produces it
+    """
+
+    @timed("model.build")
+    def __init__(self, data):
+        check_supply(data)
+        self.data = data
+        years, slices, regions = data.shape
+        coefficients = data.coefficients()
+
+        # position of the variables in x
+        self.offsets = {}
+        size = 0
+        for technology in data.technologies:
+            self.offsets[PRODUCTION, technology] = size
+            size += years * slices * regions
+            self.offsets[NEW_CAPACITY, technology] = size
+            size += years * regions
+        self.variable_count = size
+
+        objective = np.zeros(size)
+        for technology in data.technologies:
+            for variable, item in [(PRODUCTION, VARIABLE_COST), (NEW_CAPACITY, INVESTMENT_COST)]:
+                values = coefficients[item, technology].ravel()
+                start = self.offsets[variable, technology]
+                objective[start : start + len(values)] = values
+        self.objective = objective
+
+        blocks = []
+        rhs = []
+        rows = years * slices * regions
+        identity = sp.identity(rows, format="csr")
+        expansion = year_expansion(data)
+
+        # production[y*s, r] - capacity_factor * active new capacity <= existing production
+        for technology in data.technologies:
+            active = sp.kron(
+                sp.csr_matrix(expansion @ data.active_capacity(technology)),
+                sp.identity(regions),
+                format="csr",
+            )
+            capacity = -sp.diags(coefficients[CAPACITY_FACTOR, technology].ravel()) @ active
+            blocks.append(
+                self._row_block(
+                    rows, [(PRODUCTION, technology, identity), (NEW_CAPACITY, technology, capacity)]
+                )
+            )
+            rhs.append(coefficients[EXISTING_PRODUCTION, technology].ravel())
+
+        # -(production of outputs - production of inputs / efficiency) <= -demand
+        for commodity in data.commodities:
+            terms = [
+                (PRODUCTION, technology, -identity)
+                for technology in data.technologies
+                if data.output[technology] == commodity
+            ] + [
+                (PRODUCTION, technology, identity / data.efficiency[technology])
+                for technology in data.technologies
+                if data.input[technology] == commodity
+            ]
+            if not terms:
+                continue
+
+            blocks.append(self._row_block(rows, terms))
+            rhs.append(-coefficients[DEMAND, commodity].ravel())
+
+        self.matrix = (
+            sp.vstack(blocks, format="csr") if blocks else sp.csr_matrix((0, size))
+        )
+        self.rhs = np.concatenate(rhs) if rhs else np.zeros(0)
+        self.solution = None
+        self.status = None
+
+    def _row_block(self, rows, terms):
+        """Sparse block of constraints with the given (variable, technology, matrix) terms"""
+        matrices = []
+        columns = []
+        for variable, technology, matrix in terms:
+            matrix = sp.coo_matrix(matrix)
+            matrices.append(matrix)
+            columns.append(matrix.col + self.offsets[variable, technology])
+
+        return sp.csr_matrix(
+            (
+                np.concatenate([matrix.data for matrix in matrices]),
+                (np.concatenate([matrix.row for matrix in matrices]), np.concatenate(columns)),
+            ),
+            shape=(rows, self.variable_count),
+        )
+
+    def size(self):
+        """Returns the number of scalar variables and constraints of the problem
+
+        Returns
+        -------
+        dict
+            {"variables": int, "constraints": int}
+        """
+        return {"variables": self.variable_count, "constraints": self.matrix.shape[0]}
+
+    def solve(self, **kwargs):
+        """Solves the model with HiGHS through scipy.optimize.linprog
+
+        A different solver of the model data is ignored with a warning.
+
+        Parameters
+        ----------
+        **kwargs
+            passed as options of linprog (e.g. time_limit, presolve)
+
+        Returns
+        -------
+        float
+            optimal value of the objective (None if not solved)
+        """
+        from scipy.optimize import linprog
+
+        solver = self.data.solver
+        if solver is not None and str(solver).upper() != HIGHS:
+            warnings.warn(
+                f"the sparse backend can only solve with {HIGHS}, {solver} is ignored.",
+                stacklevel=2,
+            )
+
+        with section("model.solve"):
+            result = linprog(
+                self.objective,
+                A_ub=self.matrix,
+                b_ub=self.rhs,
+                bounds=(0, None),
+                method="highs",
+                options=kwargs or None,
+            )
+        self.status = LINPROG_STATUS.get(result.status, "solver_error")
+        self.solution = result.x if result.status == 0 else None
+
+        return result.fun if result.status == 0 else None
+
+    def values(self):
+        """Values of the variables after solving
+
+        Returns
+        -------
+        dict
+            {variable: {technology: numpy.ndarray}} in the shapes of the cvxpy variables
+        """
+        years, slices, regions = self.data.shape
+        shapes = {PRODUCTION: (years * slices, regions), NEW_CAPACITY: (years, regions)}
+
+        values = {variable: {} for variable in shapes}
+        for (variable, technology), start in self.offsets.items():
+            shape = shapes[variable]
+            values[variable][technology] = (
+                None
+                if self.solution is None
+                else self.solution[start : start + shape[0] * shape[1]].reshape(shape)
+            )
+
+        return values
+
+    def write_mps(self, path):
+        """Writes the problem in free MPS format (readable by most LP solvers)
+
+        Variables are named x<position> and constraints c<position>.
+
+        Parameters
+        ----------
+        path : str
+            path of the file
+        """
+        matrix = self.matrix.tocsc()
+        with open(path, "w") as file:
+            file.write("NAME hysut\nROWS\n N cost\n")
+            file.writelines(f" L c{row}\n" for row in range(matrix.shape[0]))
+
+            file.write("COLUMNS\n")
+            for column in range(matrix.shape[1]):
+                start, stop = matrix.indptr[column], matrix.indptr[column + 1]
+                cost = float(self.objective[column])
+                entries = [f" x{column} cost {cost!r}\n"] if cost else []
+                entries += [
+                    f" x{column} c{row} {value!r}\n"
+                    for row, value in zip(matrix.indices[start:stop], matrix.data[start:stop].tolist())
+                ]
+                if not entries:
+                    # keep the variable in the problem
+                    entries = [f" x{column} cost 0.0\n"]
+                file.writelines(entries)
+
+            file.write("RHS\n")
+            file.writelines(
+                f" rhs c{row} {value!r}\n"
+                for row, value in enumerate(self.rhs.tolist())
+                if value
+            )
+            file.write("ENDATA\n")
@@ -0,0 +1,396 @@
+"""
+Numeric data of the model indexed by the validated sets
+"""
+
+import copy
+from numbers import Real
+
+import numpy as np
+from hysut.exceptions_logging.exceptions import InputDataError
+from hysut.preprocess.technologies import TECHNOLOGY_PARAMETERS
+from hysut.utils.enums import (
+    CAPACITY_FACTOR,
+    DEMAND,
+    EFFICIENCY,
+    EXISTING_CAPACITY,
+    INVESTMENT_COST,
+    LIFETIME,
+    REGIONS,
+    SETTINGS,
+    SLICE_NAME,
+    T_INPUT,
+    T_OUTPUT,
+    TIME_SLICES,
+    VARIABLE_COST,
+    YEAR,
+)
+from hysut.utils.instrumentation import timed
+from hysut.utils.sets import IndexSet
+
+# hours in a year, shared equally between time slices if not given
+YEAR_HOURS = 8760
+
+# parameters that are defined per time slice, the rest are per year
+SLICE_PARAMETERS = [CAPACITY_FACTOR, DEMAND]
+
+# production available from the existing capacity (capacity_factor * existing_capacity)
+EXISTING_PRODUCTION = "existing_production"
+
+
+class ModelData:
+    """Arrays of the model parameters indexed by years, time slices and regions
+
+    Parameters are stored with the shape (years, time_slices, regions) for
+    demands and capacity factors and (years, regions) for the rest. Scalars are
+    kept as broadcast (zero-copy) views.
+
+    Parameters
+    ----------
+    years : array-like
+        years of the model
+    time_slices : list
+        labels of the time slices
+    regions : list
+        name of the regions
+    commodities : dict
+        {commodity: {"demand": number or array}}
+    technologies : dict
+        {technology: {"output", "input", "efficiency", "lifetime", "capacity_factor", ...}}
+    year_weights : array-like, optional
+        number of years every year stands for, by default None (ones)
+    slice_hours : array-like, optional
+        hours of the year every time slice stands for, by default None (equal shares of a year)
+    solver : str, optional
+        solver used for solving the model, by default None (solver default of cvxpy)
+    """
+
+    def __init__(
+        self,
+        years,
+        time_slices,
+        regions,
+        commodities,
+        technologies,
+        year_weights=None,
+        slice_hours=None,
+        solver=None,
+    ):
+        self.years = np.asarray(years)
+        # years represented by every year of the model (only for clustered data)
+        self.blocks = None
+        self.time_slices = list(time_slices)
+        self.regions = list(regions)
+        self.solver = solver
+
+        self.year_weights = (
+            np.ones(len(self.years))
+            if year_weights is None
+            else np.asarray(year_weights, dtype=float)
+        )
+        self.slice_hours = (
+            np.full(len(self.time_slices), YEAR_HOURS / len(self.time_slices))
+            if slice_hours is None
+            else np.asarray(slice_hours, dtype=float)
+        )
+
+        self.commodities = list(commodities)
+        self.demand = {
+            name: self._broadcast(attributes[DEMAND], True)
+            for name, attributes in commodities.items()
+        }
+
+        self.technologies = list(technologies)
+        self.output = {name: tech[T_OUTPUT] for name, tech in technologies.items()}
+        self.input = {name: tech[T_INPUT] for name, tech in technologies.items()}
+        self.efficiency = {name: float(tech[EFFICIENCY]) for name, tech in technologies.items()}
+        self.lifetime = {name: tech[LIFETIME] for name, tech in technologies.items()}
+        self.parameters = {
+            item: {
+                name: self._broadcast(tech[item], item in SLICE_PARAMETERS)
+                for name, tech in technologies.items()
+            }
+            for item in TECHNOLOGY_PARAMETERS
+        }
+
+    @property
+    def shape(self):
+        """(years, time_slices, regions)"""
+        return len(self.years), len(self.time_slices), len(self.regions)
+
+    def _broadcast(self, value, with_slices):
+        shape = self.shape if with_slices else (self.shape[0], self.shape[2])
+        return np.broadcast_to(np.asarray(value, dtype=float), shape)
+
+    def active_capacity(self, technology):
+        """Matrix mapping the new capacity of every year to the active capacity
+
+        Parameters
+        ----------
+        technology : str
+
+        Returns
+        -------
+        numpy.ndarray
+            (years, years) matrix, element [y, b] is 1 if capacity built in year b
+            is active in year y
+        """
+        built = self.years[None, :]
+        current = self.years[:, None]
+        active = built <= current
+
+        lifetime = self.lifetime[technology]
+        if lifetime is not None:
+            active &= current < built + lifetime
+
+        return active.astype(float)
+
+    def rows(self, array):
+        """Reshapes a (years, time_slices, regions) array into (years*time_slices, regions)"""
+        years, slices, regions = self.shape
+        return np.broadcast_to(array, self.shape).reshape(years * slices, regions)
+
+    def year_rows(self, array):
+        """Repeats a (years, regions) array for every time slice as (years*time_slices, regions)"""
+        return np.repeat(np.asarray(array), self.shape[1], axis=0)
+
+    def row_weights(self):
+        """Weight of every (year, time slice) row as a (years*time_slices, 1) array"""
+        return np.outer(self.year_weights, self.slice_hours).reshape(-1, 1)
+
+    def subset(self, positions):
+        """Returns the data of some of the years
+
+        Parameters
+        ----------
+        positions : array-like
+            positions of the years in ``years``
+
+        Returns
+        -------
+        ModelData
+        """
+        positions = np.asarray(positions)
+        data = copy.copy(self)
+        data.years = self.years[positions]
+        data.year_weights = self.year_weights[positions]
+        if self.blocks is not None:
+            data.blocks = [self.blocks[position] for position in positions]
+        data.demand = {name: values[positions] for name, values in self.demand.items()}
+        data.parameters = {
+            item: {name: values[positions] for name, values in parameters.items()}
+            for item, parameters in self.parameters.items()
+        }
+
+        return data
+
+    def clustered(self, blocks):
+        """Returns the data with one year per block of years
+
+        Every block (e.g. a cluster) is represented by its first year and weighted
+        by the total weight of its years, so yearly costs are counted for every
+        year of the block while the block has only one set of decisions.
+        Parameters are averaged over the years of the block.
+
+        Parameters
+        ----------
+        blocks : list
+            arrays of years covering all the years of the model (see ClusterIndex.blocks)
+
+        Returns
+        -------
+        ModelData
+
+        Raises
+        ------
+        InputDataError
+            if the blocks do not cover every year of the model exactly once
+        """
+        positions = [np.searchsorted(self.years, block) for block in blocks]
+        covered = np.sort(np.concatenate(positions)) if positions else np.array([], dtype=int)
+        if not np.array_equal(covered, np.arange(len(self.years))) or not all(
+            np.array_equal(self.years[position], block)
+            for position, block in zip(positions, blocks)
+        ):
+            raise InputDataError("blocks should cover every year of the model exactly once.")
+
+        def average(values):
+            return np.stack(
+                [
+                    np.average(values[position], axis=0, weights=self.year_weights[position])
+                    for position in positions
+                ]
+            )
+
+        data = copy.copy(self)
+        data.years = np.array([self.years[position[0]] for position in positions])
+        data.year_weights = np.array([self.year_weights[position].sum() for position in positions])
+        data.blocks = [np.asarray(block) for block in blocks]
+        data.demand = {name: average(values) for name, values in self.demand.items()}
+        data.parameters = {
+            item: {name: average(values) for name, values in parameters.items()}
+            for item, parameters in self.parameters.items()
+        }
+
+        return data
+
+    def coefficients(self):
+        """Coefficients of the model in the layout of the variables
+
+        Returns
+        -------
+        dict
+            {(parameter, technology or commodity): 2-D numpy.ndarray} with
+            (years*time_slices, regions) arrays for demand, capacity_factor,
+            variable_cost (weighted by hours and years) and existing_production,
+            and (years, regions) arrays for investment_cost and existing_capacity
+        """
+        weights = self.row_weights()
+        coefficients = {
+            (DEMAND, commodity): self.rows(self.demand[commodity])
+            for commodity in self.commodities
+        }
+        for technology in self.technologies:
+            capacity_factor = self.rows(self.parameters[CAPACITY_FACTOR][technology])
+            existing = self.parameters[EXISTING_CAPACITY][technology]
+            coefficients[CAPACITY_FACTOR, technology] = capacity_factor
+            coefficients[EXISTING_PRODUCTION, technology] = capacity_factor * self.year_rows(existing)
+            coefficients[EXISTING_CAPACITY, technology] = existing
+            coefficients[VARIABLE_COST, technology] = (
+                self.year_rows(self.parameters[VARIABLE_COST][technology]) * weights
+            )
+            coefficients[INVESTMENT_COST, technology] = self.parameters[INVESTMENT_COST][technology]
+
+        return {key: np.ascontiguousarray(value, dtype=float) for key, value in coefficients.items()}
+
+    def updated(self, changes):
+        """Returns a copy of the data with some parameters changed
+
+        Parameters
+        ----------
+        changes : dict
+            {parameter: {technology or commodity: number or array}} e.g.
+            {"demand": {"electricity": 20}, "variable_cost": {"gas": 2}}
+
+        Returns
+        -------
+        ModelData
+
+        Raises
+        ------
+        InputDataError
+            if a parameter, technology or commodity does not exist
+        """
+        data = copy.copy(self)
+        data.demand = dict(self.demand)
+        data.parameters = {item: dict(values) for item, values in self.parameters.items()}
+
+        for parameter, values in changes.items():
+            if parameter == DEMAND:
+                target, items = data.demand, self.commodities
+            elif parameter in data.parameters:
+                target, items = data.parameters[parameter], self.technologies
+            else:
+                raise InputDataError(
+                    f"'{parameter}' is not a valid parameter. Valid parameters are {[DEMAND, *data.parameters]}."
+                )
+
+            for item, value in values.items():
+                if item not in items:
+                    raise InputDataError(f"'{item}' is not defined in the model for '{parameter}'.")
+                target[item] = self._broadcast(value, parameter in SLICE_PARAMETERS)
+
+        return data
+
+    @classmethod
+    @timed("model.data")
+    def from_database(cls, database, slice_hours=None, clustered=False):
+        """Creates the model data from a validated ModelDataBase
+
+        Parameters given as str are taken from the ``input_data`` of the database.
+
+        Parameters
+        ----------
+        database : ModelDataBase
+            validated database (with input data if parameters refer to them)
+        slice_hours : array-like, optional
+            hours of the year every time slice stands for, by default None
+        clustered : bool, optional
+            one year per cluster of the database (see ModelData.clustered), by default False
+
+        Returns
+        -------
+        ModelData
+
+        Raises
+        ------
+        InputDataError
+            if a parameter does not exist in the input data or has wrong regions/index
+        """
+        years = database.index_sets[YEAR].labels
+        slices = database.index_sets[TIME_SLICES].to_list()
+        slice_name = database.time_slices[SLICE_NAME]
+        regions = database.index_sets[REGIONS]
+        errors = []
+
+        def resolve(value, with_slices, item):
+            if isinstance(value, Real):
+                return value
+
+            if value not in database.input_data:
+                errors.append(f"input data parameter '{value}' of {item} does not exist.")
+                return 0.0
+
+            entry = database.input_data[value]
+            index = entry["index"]
+            if slice_name in index and not with_slices:
+                errors.append(f"input data parameter '{value}' of {item} cannot be given per time slice.")
+                return 0.0
+
+            data = np.asarray(entry["values"])
+            if regions != entry["regions"]:
+                positions = IndexSet(entry["regions"]).codes_of(regions.labels)
+                if len(entry["regions"]) == 1:
+                    data = data[..., :1]
+                elif len(entry["regions"]) == len(regions) and (positions >= 0).all():
+                    data = data[..., positions]
+                else:
+                    errors.append(
+                        f"input data parameter '{value}' of {item} should have one column or a column per region {regions.to_list()}."
+                    )
+                    return 0.0
+
+            # add the missing axes for broadcasting
+            shape = [len(years) if YEAR in index else 1]
+            if with_slices:
+                shape.append(len(slices) if slice_name in index else 1)
+            return data.reshape(*shape, data.shape[-1])
+
+        commodities = {
+            name: {DEMAND: resolve(attributes[DEMAND], True, f"commodity '{name}'")}
+            for name, attributes in database.commodities.items()
+        }
+        technologies = {}
+        for name, attributes in database.technologies.items():
+            technology = dict(attributes)
+            for item in TECHNOLOGY_PARAMETERS:
+                technology[item] = resolve(
+                    attributes[item],
+                    item in SLICE_PARAMETERS,
+                    f"'{item}' of technology '{name}'",
+                )
+            technologies[name] = technology
+
+        if errors:
+            raise InputDataError("\n".join(errors))
+
+        data = cls(
+            years,
+            slices,
+            regions.to_list(),
+            commodities,
+            technologies,
+            slice_hours=slice_hours,
+            solver=database.model_config.get(SETTINGS, {}).get("solver"),
+        )
+
+        return data.clustered(database.cluster_index.blocks(years)) if clustered else data
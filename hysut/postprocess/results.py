@@ -0,0 +1,216 @@
+"""
+Extracting the values of the model variables into labelled tables and writing them to files
+"""
+
+import importlib.util
+import os
+
+import numpy as np
+from hysut.utils.enums import NEW_CAPACITY, PRODUCTION, YEAR
+from hysut.utils.instrumentation import timed
+
+TECHNOLOGY = "technology"
+
+RESULT_FORMATS = ["csv", "parquet"]
+
+# optional engines of pandas for parquet files
+PARQUET_ENGINES = ["pyarrow", "fastparquet"]
+
+SUMMARY_FILE = "summary.xlsx"
+
+
+def result_frames(data, variables, slice_name="time_slice"):
+    """Converts the variable values into DataFrames indexed by the model sets
+
+    Values of all the technologies are stacked into one array per variable
+    without any per-element loop. Tables have one column per region (as the
+    input data tables) and a (technology, year, time slice) or (technology,
+    year) index.
+
+    Parameters
+    ----------
+    data : ModelData
+        data of the solved model
+    variables : dict
+        {variable: {technology: numpy.ndarray}} (values() of a solved model)
+    slice_name : str, optional
+        name of the time slice index level, by default "time_slice"
+
+    Returns
+    -------
+    dict
+        {variable: pandas.DataFrame}
+
+    Raises
+    ------
+    ValueError
+        if the values of a variable are not available (the model is not solved)
+    """
+    import pandas as pd
+
+    for name, values in variables.items():
+        missing = [technology for technology, value in values.items() if value is None]
+        if missing:
+            raise ValueError(
+                f"values of '{name}' are not available for {missing}. The model should be solved before extracting the results."
+            )
+
+    regions = len(data.regions)
+    technologies = [
+        technology for technology in data.technologies if technology in variables[PRODUCTION]
+    ]
+    levels = {
+        PRODUCTION: ([technologies, data.years, data.time_slices], [TECHNOLOGY, YEAR, slice_name]),
+        NEW_CAPACITY: ([technologies, data.years], [TECHNOLOGY, YEAR]),
+    }
+
+    frames = {}
+    for name, (sets, names) in levels.items():
+        values = (
+            np.stack(
+                [
+                    np.asarray(variables[name][technology], dtype=float).reshape(-1, regions)
+                    for technology in technologies
+                ]
+            ).reshape(-1, regions)
+            if technologies
+            else np.empty((0, regions))
+        )
+        frames[name] = pd.DataFrame(
+            values,
+            index=pd.MultiIndex.from_product(sets, names=names),
+            columns=pd.Index(data.regions, name="region"),
+        )
+
+    return frames
+
+
+def write_results(frames, path, file_format="csv"):
+    """Writes every result table into a file of the directory
+
+    Parameters
+    ----------
+    frames : dict
+        {variable: pandas.DataFrame} (see result_frames)
+    path : str
+        directory of the results (created if not exists)
+    file_format : str, optional
+        'csv' or 'parquet' (needs pyarrow or fastparquet), by default "csv"
+
+    Returns
+    -------
+    dict
+        {variable: path of the file}
+    """
+    if file_format not in RESULT_FORMATS:
+        raise ValueError(
+            f"{file_format} is not a valid format. Valid formats are {RESULT_FORMATS}."
+        )
+
+    if file_format == "parquet" and not any(
+        importlib.util.find_spec(engine) for engine in PARQUET_ENGINES
+    ):
+        raise ImportError(
+            f"writing parquet files needs one of {PARQUET_ENGINES} to be installed. Use file_format='csv' otherwise."
+        )
+
+    os.makedirs(path, exist_ok=True)
+    files = {}
+    for name, frame in frames.items():
+        files[name] = os.path.join(path, f"{name}.{file_format}")
+        if file_format == "parquet":
+            # parquet needs str column names
+            frame = frame.copy(deep=False)
+            frame.columns = frame.columns.astype(str)
+            frame.to_parquet(files[name])
+        else:
+            frame.to_csv(files[name])
+
+    return files
+
+
+def summary_frames(data, frames):
+    """Yearly totals of the results over time slices and regions
+
+    Parameters
+    ----------
+    data : ModelData
+    frames : dict
+        {variable: pandas.DataFrame} (see result_frames)
+
+    Returns
+    -------
+    dict
+        {variable: pandas.DataFrame} with technologies as index and years as columns.
+        Production is the yearly production (rate * hours of the time slices).
+    """
+    slices = len(data.time_slices)
+    production = frames[PRODUCTION]
+    hours = np.tile(data.slice_hours, len(production) // slices)
+    production = (production.sum(axis=1) * hours).groupby(level=[TECHNOLOGY, YEAR]).sum()
+
+    return {
+        PRODUCTION: production.unstack(YEAR),
+        NEW_CAPACITY: frames[NEW_CAPACITY].sum(axis=1).unstack(YEAR),
+    }
+
+
+def write_summary(summaries, path):
+    """Writes the summary tables into an Excel file
+
+    The workbook is written row by row in the constant_memory mode of
+    xlsxwriter, so only the summary (not the full results) is written to Excel.
+
+    Parameters
+    ----------
+    summaries : dict
+        {sheet: pandas.DataFrame} (see summary_frames)
+    path : str
+        path of the xlsx file
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "nan_inf_to_errors": True})
+    try:
+        for name, frame in summaries.items():
+            worksheet = workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, [frame.index.name or "", *map(str, frame.columns)])
+            for row, (label, values) in enumerate(
+                zip(frame.index, frame.to_numpy(dtype=float)), start=1
+            ):
+                worksheet.write(row, 0, str(label))
+                worksheet.write_row(row, 1, values.tolist())
+    finally:
+        workbook.close()
+
+
+@timed("results.export")
+def export_results(data, variables, path, file_format="csv", summary=False):
+    """Writes all the results of a solved model
+
+    Parameters
+    ----------
+    data : ModelData
+        data of the solved model
+    variables : dict
+        {variable: {technology: numpy.ndarray}} (values() of a solved model)
+    path : str
+        directory of the results
+    file_format : str, optional
+        'csv' or 'parquet' (needs pyarrow or fastparquet), by default "csv"
+    summary : bool, optional
+        write the yearly totals into an Excel file as well, by default False
+
+    Returns
+    -------
+    dict
+        {variable (or 'summary'): path of the file}
+    """
+    frames = result_frames(data, variables)
+    files = write_results(frames, path, file_format)
+
+    if summary:
+        files["summary"] = os.path.join(path, SUMMARY_FILE)
+        write_summary(summary_frames(data, frames), files["summary"])
+
+    return files
@@ -0,0 +1,245 @@
+"""
+Aggregation of hourly profiles into representative time slices (typical days)
+"""
+
+from numbers import Integral
+
+import numpy as np
+from hysut.utils.defaults import Time
+from hysut.utils.enums import KMEANS, KMEDOIDS
+from hysut.utils.sets import TimeSet
+
+
+def _squared_distances(points, centers):
+    """Squared euclidean distances between every point and every center
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        (n_points, n_features)
+    centers : numpy.ndarray
+        (n_centers, n_features)
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_points, n_centers)
+    """
+    distances = (
+        (points ** 2).sum(axis=1)[:, None]
+        - 2 * points @ centers.T
+        + (centers ** 2).sum(axis=1)[None, :]
+    )
+    return np.maximum(distances, 0)
+
+
+def _initial_centers(points, n_clusters, rng):
+    """k-means++ seeding returning the index of the initial centers"""
+    centers = [rng.integers(len(points))]
+    distances = _squared_distances(points, points[centers]).min(axis=1)
+
+    for _ in range(1, n_clusters):
+        total = distances.sum()
+        if total == 0:
+            # remaining points are identical to the chosen centers
+            candidates = np.setdiff1d(np.arange(len(points)), centers)
+            centers.append(candidates[0])
+        else:
+            centers.append(rng.choice(len(points), p=distances / total))
+        distances = np.minimum(
+            distances, _squared_distances(points, points[[centers[-1]]])[:, 0]
+        )
+
+    return np.array(centers)
+
+
+def _kmeans(points, n_clusters, rng, max_iterations):
+    """Lloyd iterations, returns (labels, centers)"""
+    centers = points[_initial_centers(points, n_clusters, rng)]
+
+    for _ in range(max_iterations):
+        labels = _squared_distances(points, centers).argmin(axis=1)
+
+        counts = np.bincount(labels, minlength=n_clusters)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        new_centers = np.where(
+            counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers
+        )
+
+        if np.allclose(new_centers, centers):
+            break
+        centers = new_centers
+
+    return _squared_distances(points, centers).argmin(axis=1), centers
+
+
+def _kmedoids(points, n_clusters, rng, max_iterations):
+    """Alternating (Voronoi iteration) k-medoids, returns (labels, medoids)
+
+    Pairwise distances are only computed inside each cluster, so memory grows
+    with the size of the largest cluster instead of the number of points.
+    """
+    medoids = _initial_centers(points, n_clusters, rng)
+
+    for _ in range(max_iterations):
+        labels = _squared_distances(points, points[medoids]).argmin(axis=1)
+
+        new_medoids = medoids.copy()
+        for cluster in range(n_clusters):
+            members = np.flatnonzero(labels == cluster)
+            if len(members):
+                costs = np.sqrt(
+                    _squared_distances(points[members], points[members])
+                ).sum(axis=1)
+                new_medoids[cluster] = members[costs.argmin()]
+
+        if np.array_equal(new_medoids, medoids):
+            break
+        medoids = new_medoids
+
+    return _squared_distances(points, points[medoids]).argmin(axis=1), medoids
+
+
+def aggregate_time_slices(
+    profiles,
+    n_representatives,
+    period_length=Time.PERIOD_LENGTH,
+    method=Time.AGGREGATION_METHOD,
+    seed=0,
+    max_iterations=Time.MAX_ITERATIONS,
+):
+    """Aggregates hourly profiles into representative periods (e.g. typical days)
+
+    Every period of ``period_length`` hours is clustered (using all the profiles
+    together, each scaled to [0, 1]) and the clusters are replaced by a
+    representative period. The representative periods define the new time slices,
+    numbered from 1 to ``n_representatives * period_length``.
+
+    Parameters
+    ----------
+    profiles : numpy.ndarray, pandas.DataFrame
+        hourly data with shape (hours,) or (hours, profiles) e.g. demand and capacity factors
+    n_representatives : int
+        number of representative periods
+    period_length : int, optional
+        number of hours in each period, by default Time.PERIOD_LENGTH
+    method : str, optional
+        'kmeans' (representatives are cluster means) or 'kmedoids' (representatives
+        are real periods), by default Time.AGGREGATION_METHOD
+    seed : int, optional
+        seed of the random initialization, by default 0
+    max_iterations : int, optional
+        by default Time.MAX_ITERATIONS
+
+    Returns
+    -------
+    dict
+        {
+            "errors" : list of errors,
+            "warnings" : list of warnings,
+            "time_slices" : TimeSet of the representative time slices,
+            "weights" : number of hours each representative time slice stands for,
+            "mapping" : representative time slice of every original hour,
+            "profiles" : representative profiles with shape (time_slices, profiles),
+            "error_report" : dict of the aggregation errors per profile,
+        }
+    """
+    errors = []
+    warnings = []
+
+    for name, value in [("n_representatives", n_representatives), ("period_length", period_length)]:
+        if not isinstance(value, Integral) or isinstance(value, bool) or value < 1:
+            errors.append(f"{name} should be a positive integer, {value!r} is given.")
+
+    data = np.asarray(profiles, dtype=float)
+    if data.ndim == 1:
+        data = data[:, None]
+
+    if data.ndim != 2 or not data.size:
+        errors.append("profiles should be a non-empty 1-D or 2-D array.")
+    elif not errors and len(data) % period_length:
+        errors.append(
+            f"number of hours ({len(data)}) is not a multiple of period_length ({period_length})."
+        )
+    elif np.isnan(data).any():
+        errors.append("profiles should not contain missing values.")
+
+    if method not in [KMEANS, KMEDOIDS]:
+        errors.append(
+            f"{method} is not a valid aggregation method. Valid methods are {[KMEANS, KMEDOIDS]}."
+        )
+
+    if errors:
+        return {"errors": errors, "warnings": warnings}
+
+    n_periods = len(data) // period_length
+    if n_representatives > n_periods:
+        warnings.append(
+            f"n_representatives ({n_representatives}) is more than the number of periods ({n_periods}). "
+            f"{n_periods} representatives are used."
+        )
+        n_representatives = n_periods
+
+    # scale every profile to [0,1] so that large profiles do not dominate the distances
+    minimum = data.min(axis=0)
+    scale = data.max(axis=0) - minimum
+    scale[scale == 0] = 1
+    scaled = (data - minimum) / scale
+
+    # one row per period: (n_periods, period_length * n_profiles)
+    periods = data.reshape(n_periods, period_length, -1)
+    points = scaled.reshape(n_periods, -1)
+
+    rng = np.random.default_rng(seed)
+    if method == KMEANS:
+        labels, _ = _kmeans(points, n_representatives, rng, max_iterations)
+        counts = np.bincount(labels, minlength=n_representatives)
+        sums = np.zeros((n_representatives, period_length, data.shape[1]))
+        np.add.at(sums, labels, periods)
+        representatives = sums / np.maximum(counts, 1)[:, None, None]
+    else:
+        labels, medoids = _kmedoids(points, n_representatives, rng, max_iterations)
+        counts = np.bincount(labels, minlength=n_representatives)
+        representatives = periods[medoids]
+
+    # drop empty clusters and renumber the labels
+    used = np.flatnonzero(counts)
+    labels = np.searchsorted(used, labels)
+    counts = counts[used]
+    representatives = representatives[used]
+
+    hours = np.arange(len(data))
+    mapping = labels[hours // period_length] * period_length + hours % period_length + 1
+    representative_profiles = representatives.reshape(-1, data.shape[1])
+
+    reconstructed = representative_profiles[mapping - 1]
+    difference = reconstructed - data
+    totals = data.sum(axis=0)
+    error_report = {
+        "rmse": np.sqrt((difference ** 2).mean(axis=0)),
+        "mae": np.abs(difference).mean(axis=0),
+        "max_error": np.abs(difference).max(axis=0),
+        "total_relative_error": np.divide(
+            difference.sum(axis=0),
+            totals,
+            out=np.zeros_like(totals),
+            where=totals != 0,
+        ),
+    }
+
+    columns = getattr(profiles, "columns", None)
+    if columns is not None:
+        error_report = {
+            key: dict(zip(columns, value)) for key, value in error_report.items()
+        }
+
+    return {
+        "errors": errors,
+        "warnings": warnings,
+        "time_slices": TimeSet([range(1, len(used) * period_length + 1)]),
+        "weights": np.repeat(counts, period_length),
+        "mapping": mapping,
+        "profiles": representative_profiles,
+        "error_report": error_report,
+    }
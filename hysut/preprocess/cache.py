@@ -0,0 +1,278 @@
+"""
+On-disk cache of the validated and preprocessed model data, and in-memory
+cache of the validated sections shared by the models of a process
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+from hysut.utils.sets import TimeSet
+from hysut.utils.tools import freeze
+
+CACHE_VERSION = 2
+
+# number of validated sections kept in memory
+SECTION_CACHE_SIZE = 256
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+DATA_FILE = "data.json"
+
+
+def _normalize(value):
+    """Converts a config item into a json-serializable form for hashing.
+    Arrays are replaced by the hash of their content.
+    """
+    if isinstance(value, dict):
+        return {
+            str(key): _normalize(item)
+            for key, item in sorted(value.items(), key=lambda item: str(item[0]))
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, TimeSet):
+        return encode_sets(value)
+    if hasattr(value, "to_numpy"):
+        value = value.to_numpy()
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        return {
+            "__array__": [
+                str(array.dtype),
+                list(array.shape),
+                hashlib.blake2b(array.data, digest_size=16).hexdigest(),
+            ]
+        }
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+
+    return repr(value)
+
+
+def config_hash(model_config, files=(), extra=None):
+    """Hash of the model_config and the fingerprints of the input files
+
+    Parameters
+    ----------
+    model_config : dict
+        model_config (arrays are hashed by content)
+    files : iterable, optional
+        paths of the input files (fingerprinted by size and modification time), by default ()
+    extra : optional
+        any other json-serializable item affecting the cached data, by default None
+
+    Returns
+    -------
+    str
+    """
+    fingerprints = []
+    for file in files:
+        stat = os.stat(file)
+        fingerprints.append([os.path.abspath(file), stat.st_size, stat.st_mtime_ns])
+
+    content = json.dumps(
+        [CACHE_VERSION, _normalize(model_config), fingerprints, _normalize(extra)],
+        sort_keys=True,
+    )
+    return hashlib.blake2b(content.encode(), digest_size=20).hexdigest()
+
+
+def encode_sets(value):
+    """Makes a structure of dicts, lists and TimeSets json-serializable"""
+    if isinstance(value, TimeSet):
+        return {"__timeset__": [[run.start, run.stop, run.step] for run in value.runs]}
+    if isinstance(value, dict):
+        return {key: encode_sets(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_sets(item) for item in value]
+
+    return value
+
+
+def decode_sets(value):
+    """Inverse of encode_sets"""
+    if isinstance(value, dict):
+        if "__timeset__" in value:
+            return TimeSet(range(*run) for run in value["__timeset__"])
+        return {key: decode_sets(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_sets(item) for item in value]
+
+    return value
+
+
+class PreprocessCache:
+    """Directory of cached preprocessing results
+
+    Every entry is a directory named after its key holding a json file (for the
+    sets, settings and warnings) and one ``.npy`` file per array. Arrays are
+    loaded as read-only memory maps, so loading an entry does not read the
+    arrays into memory.
+
+    Parameters
+    ----------
+    directory : str
+        directory of the cache (created if not exists)
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry(self, key, namespace):
+        return os.path.join(self.directory, f"{namespace}-{key}")
+
+    def load(self, key, namespace):
+        """Loads a cached entry
+
+        Parameters
+        ----------
+        key : str
+            hash of the inputs (see config_hash)
+        namespace : str
+            kind of the cached data (e.g. validation, input_data)
+
+        Returns
+        -------
+        tuple, None
+            (data, arrays) or None if the entry does not exist
+        """
+        entry = self._entry(key, namespace)
+        try:
+            with open(os.path.join(entry, DATA_FILE)) as file:
+                content = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if content.get("version") != CACHE_VERSION:
+            return None
+
+        arrays = {
+            name: np.load(os.path.join(entry, file), mmap_mode="r")
+            for name, file in content["arrays"].items()
+        }
+        return decode_sets(content["data"]), arrays
+
+    def save(self, key, namespace, data, arrays=None):
+        """Saves an entry
+
+        Parameters
+        ----------
+        key : str
+            hash of the inputs (see config_hash)
+        namespace : str
+            kind of the cached data (e.g. validation, input_data)
+        data : dict
+            json-serializable data (TimeSets are supported)
+        arrays : dict, optional
+            numpy arrays to save, by default None
+        """
+        entry = self._entry(key, namespace)
+        temporary = f"{entry}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(temporary)
+
+        files = {}
+        for number, (name, array) in enumerate((arrays or {}).items()):
+            files[name] = f"array_{number}.npy"
+            np.save(os.path.join(temporary, files[name]), np.asarray(array))
+
+        with open(os.path.join(temporary, DATA_FILE), "w") as file:
+            json.dump(
+                {"version": CACHE_VERSION, "data": encode_sets(data), "arrays": files},
+                file,
+            )
+
+        # entries are published atomically, an existing entry is kept
+        try:
+            os.rename(temporary, entry)
+        except OSError:
+            shutil.rmtree(temporary, ignore_errors=True)
+
+    def clear(self):
+        """Removes all the entries"""
+        for entry in os.listdir(self.directory):
+            shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
+
+
+class SectionCache:
+    """Size-bounded LRU cache of validated model_config sections
+
+    Entries are keyed by the content hash of the section (and of anything else
+    the validation depends on), so the same section of different model_configs
+    is validated only once in a process. Cached results are frozen (see
+    freeze) and shared between all the models using them.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        maximum number of entries, by default SECTION_CACHE_SIZE (0 disables caching)
+    """
+
+    def __init__(self, maxsize=SECTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, namespace, section, function, depends_on=None):
+        """Returns the cached validation of a section, validating it on a miss
+
+        Parameters
+        ----------
+        namespace : str
+            kind of the section (e.g. time_horizon)
+        section : dict
+            content of the section (hashed with config_hash)
+        function : callable
+            validation of the section, called with no arguments on a miss
+        depends_on : optional
+            any other json-serializable item the validation depends on, by default None
+
+        Returns
+        -------
+        frozen output of the function
+        """
+        key = config_hash(section, extra=[namespace, depends_on])
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        result = freeze(function())
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = result
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return result
+
+    def info(self):
+        """Hit/miss statistics of the cache
+
+        Returns
+        -------
+        CacheInfo
+            (hits, misses, maxsize, currsize)
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self):
+        """Removes all the entries and resets the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+# validated sections shared by the ModelDataBases of the process
+SECTION_CACHE = SectionCache()
@@ -2,7 +2,176 @@
 Handling the definition of clusters
 """
 
-from hysut.utils.tools import read_range_function, type_consistency_check
+import numpy as np
+from hysut.utils.sets import TimeSet
+from hysut.utils.tools import FrozenList, read_range_function
+
+
+class ClusterIndex:
+    """Year to cluster index over the model horizon
+
+    The index keeps the sorted years of the horizon as a numpy array and an
+    integer array of the same length holding the position of the cluster each
+    year belongs to (-1 for years that are not clustered).
+
+    Parameters
+    ----------
+    years : TimeSet, list
+        valid years of the model
+    """
+
+    NOT_CLUSTERED = -1
+
+    def __init__(self, years):
+        self.years = TimeSet.from_iterable(years).unique().to_array()
+        self.codes = np.full(len(self.years), self.NOT_CLUSTERED, dtype=np.int32)
+        self.names = []
+
+    @classmethod
+    def from_arrays(cls, years, codes, names):
+        """Creates the index from the arrays of a previously built index
+
+        Parameters
+        ----------
+        years : numpy.ndarray
+            sorted years of the horizon
+        codes : numpy.ndarray
+            cluster position of every year
+        names : list
+            name of the clusters
+
+        Returns
+        -------
+        ClusterIndex
+        """
+        index = cls.__new__(cls)
+        index.years = years
+        index.codes = codes
+        index.names = list(names)
+
+        return index
+
+    def read_only(self):
+        """Returns an index sharing read-only views of the arrays of this one
+
+        Returns
+        -------
+        ClusterIndex
+        """
+        years = self.years.view()
+        codes = self.codes.view()
+        years.flags.writeable = codes.flags.writeable = False
+
+        index = ClusterIndex.from_arrays(years, codes, self.names)
+        index.names = FrozenList(index.names)
+
+        return index
+
+    def locate(self, years):
+        """Finds the position of the given years in the horizon
+
+        Parameters
+        ----------
+        years : numpy.ndarray
+            array of years
+
+        Returns
+        -------
+        tuple
+            (positions, valid) where valid is a boolean mask of the years existing
+            in the horizon
+        """
+        positions = np.searchsorted(self.years, years)
+        valid = positions < len(self.years)
+        valid[valid] = self.years[positions[valid]] == years[valid]
+
+        return positions, valid
+
+    def assign(self, name, positions):
+        """Assigns the years at given positions to a new cluster
+
+        Parameters
+        ----------
+        name : str
+            name of the cluster
+        positions : numpy.ndarray
+            positions of the years in the horizon
+        """
+        self.codes[positions] = len(self.names)
+        self.names.append(name)
+
+    def cluster_of(self, year):
+        """Returns the name of the cluster that contains the year
+
+        Parameters
+        ----------
+        year : int
+
+        Returns
+        -------
+        str, None
+            name of the cluster or None if the year is not clustered
+
+        Raises
+        ------
+        KeyError
+            if the year is not in the horizon
+        """
+        position = np.searchsorted(self.years, year)
+        if position == len(self.years) or self.years[position] != year:
+            raise KeyError(f"{year} is not a valid year.")
+
+        code = self.codes[position]
+        return None if code == self.NOT_CLUSTERED else self.names[code]
+
+    def members(self, name):
+        """Returns the years of a cluster
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        TimeSet
+        """
+        return TimeSet.from_array(self.years[self.codes == self.names.index(name)])
+
+    def blocks(self, years=None):
+        """Groups the years by their cluster, every unclustered year is a block
+
+        Parameters
+        ----------
+        years : TimeSet, list, numpy.ndarray, optional
+            years to group (should be in the horizon), by default None (all the years)
+
+        Returns
+        -------
+        list
+            numpy.ndarray of the years of every block, sorted by their first year
+        """
+        years = self.years if years is None else TimeSet.from_iterable(years).unique().to_array()
+        if len(years) == 0:
+            return []
+
+        positions, _ = self.locate(years)
+        codes = self.codes[positions]
+        blocks = [
+            years[codes == code]
+            for code in np.unique(codes[codes != self.NOT_CLUSTERED])
+        ]
+        blocks += [years[[number]] for number in np.flatnonzero(codes == self.NOT_CLUSTERED)]
+
+        return sorted(blocks, key=lambda block: block[0])
+
+    def missing_years(self):
+        """Returns the years that are not covered by any cluster
+
+        Returns
+        -------
+        TimeSet
+        """
+        return TimeSet.from_array(self.years[self.codes == self.NOT_CLUSTERED])
 
 
 def check_years_clusters(clusters, years):
@@ -17,28 +186,39 @@ def check_years_clusters(clusters, years):
             'cluster_1' : [2020,2021,2022]
             "cluster_2' : 'range(2023,2030)'
         }
+    years : TimeSet, list
+        valid years of the model
     Returns
     -------
     dict
         {
             "errors" : List of errors,
-            "time_cluster" : dict of clusters (keys represent the name of cluster and values the list of years)
+            "time_cluster" : dict of clusters (keys represent the name of cluster and values the TimeSet of years)
+            "cluster_index" : ClusterIndex of the valid clusters
         }
     """
     errors = []
     time_clusters = {}
+    index = ClusterIndex(years)
 
     for cluster_name, cluster_years in clusters.items():
 
         if isinstance(cluster_years, list):
-            cluster = cluster_years
+            if not all([isinstance(year, int) for year in cluster_years]):
+                errors.append(
+                    f"cluster '{cluster_name}' can only contain integers as years."
+                )
+                continue
+            cluster = TimeSet.from_iterable(cluster_years)
 
         elif isinstance(cluster_years, str) and "range" in cluster_years:
             rng = read_range_function(
                 range_data=cluster_years, item=f"clusters: {cluster_name}"
             )
+            if rng["error"]:
+                errors.extend(rng["error"])
+                continue
             cluster = rng["data"]
-            errors.extend(rng["error"])
 
         else:
             errors.append(
@@ -47,26 +227,44 @@ def check_years_clusters(clusters, years):
             )
             continue
 
-        diff = set(cluster).difference(years)
-        if diff:
+        cluster = cluster.unique()
+        cluster_array = cluster.to_array()
+        positions, valid = index.locate(cluster_array)
+
+        if not valid.all():
             errors.append(
-                f"cluster '{cluster_name}' has years ({diff}) that are not valid years."
+                f"cluster '{cluster_name}' has years ({TimeSet.from_array(cluster_array[~valid])}) that are not valid years."
             )
-        else:
-            time_clusters[cluster_name] = sorted(set(cluster))
+            continue
+
+        # a year can be a member of only one cluster
+        owners = index.codes[positions]
+        duplicates = np.unique(owners[owners != index.NOT_CLUSTERED])
+        for owner in duplicates:
+            errors.append(
+                f"cluster '{cluster_name}' has years ({TimeSet.from_array(cluster_array[owners == owner])}) "
+                f"that are already in cluster '{index.names[owner]}'."
+            )
+        if len(duplicates):
+            continue
 
-    return {"errors": errors, "time_clusters": time_clusters}
+        index.assign(cluster_name, positions)
+        time_clusters[cluster_name] = cluster
 
+    return {"errors": errors, "time_clusters": time_clusters, "cluster_index": index}
 
-def add_missing_years_to_cluster(clusters, years):
+
+def add_missing_years_to_cluster(clusters, years, cluster_index=None):
     """Checks if for a given set of cluster, specific years are missed
 
     Parameters
     ----------
-    cluster : dict
-        _description_
-    years : list
-        _description_
+    clusters : dict
+        validated clusters (values are TimeSet or list of years)
+    years : TimeSet, list
+        valid years of the model
+    cluster_index : ClusterIndex, optional
+        index returned by check_years_clusters, built from clusters if None
 
     Returns
     -------
@@ -82,9 +280,12 @@ def add_missing_years_to_cluster(clusters, years):
 
     """
 
-    giveng_years_by_clusters = [
-        year for cluster in clusters.values() for year in cluster
-    ]
-    missing_years = list(set(years).difference(set(giveng_years_by_clusters)))
+    if cluster_index is None:
+        cluster_index = ClusterIndex(years)
+        for name, members in clusters.items():
+            positions, valid = cluster_index.locate(
+                TimeSet.from_iterable(members).unique().to_array()
+            )
+            cluster_index.assign(name, positions[valid])
 
-    return [*clusters] + sorted(missing_years)
+    return [*clusters] + cluster_index.missing_years().to_list()
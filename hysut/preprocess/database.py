@@ -1,47 +1,517 @@
-import pandas as pd
-from hysut.preprocess.time import check_time_horizon
-from hysut.utils.enums import TIME_HORIZON, SETTINGS
-from hysut.exceptions_logging.exceptions import TimeHorizonError
+import copy
+import os
+import numpy as np
+from hysut.preprocess.cache import SECTION_CACHE, PreprocessCache, config_hash
+from hysut.preprocess.clusters import ClusterIndex, check_years_clusters
+from hysut.preprocess.pipeline import ValidationPipeline
+from hysut.preprocess.reader import (
+    CHUNK_SIZE,
+    EXCEL_FORMATS,
+    TABLE_FORMATS,
+    iter_table_chunks,
+    read_parameter,
+)
+from hysut.preprocess.technologies import (
+    check_commodities,
+    check_regions,
+    check_technologies,
+)
+from hysut.preprocess.time import check_time_horizon, check_time_slices
+from hysut.utils.enums import (
+    TIME_HORIZON,
+    SETTINGS,
+    TIME_SLICES,
+    CLUSTERS,
+    ALL_PERIOD,
+    SLICE_NAME,
+    T_SLICE,
+    YEAR,
+    REGIONS,
+    COMMODITIES,
+    TECHNOLOGIES,
+    SPARSE,
+    HIGHS,
+)
+from hysut.exceptions_logging.exceptions import (
+    ConfigValidationError,
+    EssentialSetMissing,
+    InputDataError,
+    TimeHorizonError,
+)
+from hysut.utils.instrumentation import PROFILING_MODES, Profiler, section
+from hysut.utils.sets import IndexSet, TimeSet
+from hysut.exceptions_logging.logger import ERROR, WARNING, LogSink
 from hysut.utils.defaults import ModelSettings
-from hysut.utils.tools import print_log
-from copy import deepcopy
+from hysut.utils.tools import copy_config, print_log
 
 
 class ModelDataBase:
+
+    # sections of model_config that are modified by validation
+    MUTABLE_SECTIONS = [SETTINGS]
+
+    LOG_FILE = "log.jsonl"
+    ERROR_LOG_FILE = "error_log.txt"
+
+    # namespaces of the preprocessing cache
+    VALIDATION_CACHE = "validation"
+    INPUT_DATA_CACHE = "input_data"
+
+    # in-memory cache of the validated time_horizon, time_slices and clusters
+    section_cache = SECTION_CACHE
+
     def __init__(self, model_config):
         self.warnings = []
-        self.model_config = deepcopy(model_config)
+        self.errors = []
+        self.log_counts = {}
+        # results of every validation stage (reused by update)
+        self.stage_results = {}
+        # integer coded sets of the model {YEAR/TIME_SLICES/CLUSTERS/REGIONS: IndexSet}
+        self.index_sets = {}
+        self.input_data = {}
+        # timing report of the run (see the profiling setting)
+        self.profiler = Profiler(None)
+        self.model_config = copy_config(model_config, self.MUTABLE_SECTIONS)
+
+        self.pipeline = ValidationPipeline()
+        self.pipeline.register(TIME_HORIZON, self._validate_time_horizon)
+        self.pipeline.register(SETTINGS, self._validate_model_settings)
+        self.pipeline.register(TIME_SLICES, self._validate_time_slices)
+        self.pipeline.register(
+            CLUSTERS, self._validate_clusters, dependencies=[TIME_HORIZON]
+        )
+        self.pipeline.register(REGIONS, self._validate_regions)
+        self.pipeline.register(COMMODITIES, self._validate_commodities)
+        self.pipeline.register(
+            TECHNOLOGIES, self._validate_technologies, dependencies=[COMMODITIES]
+        )
+
+    def validate(self, fail_fast=False, max_workers=None):
+        """Runs all the validation stages of the model_config
+
+        Independent stages run concurrently. Errors and warnings are collected in
+        the order the stages are registered and streamed to the log file of the
+        log_path directory as soon as each stage finishes. If a cache_path is
+        given in the settings, the validated data are loaded from the cache when
+        the same model_config is already validated.
+
+        Parameters
+        ----------
+        fail_fast : bool, optional
+            stop starting new stages after the first stage with errors, by default False
+        max_workers : int, optional
+            number of threads used for validation, by default None
+
+        Raises
+        ------
+        ConfigValidationError
+            if any error exists in the model_config
+        """
+        with self._profile(), section("validation"):
+            cache = self._preprocess_cache()
+            if cache is not None:
+                key = config_hash(self.model_config)
+                cached = cache.load(key, self.VALIDATION_CACHE)
+                if cached is not None:
+                    self._load_validation(*cached)
+                    return
+
+            validation = self._run_pipeline(fail_fast=fail_fast, max_workers=max_workers)
+
+            if cache is not None:
+                self._save_validation(cache, key, validation["warnings"])
+
+    def update(self, changes, fail_fast=False, max_workers=None):
+        """Updates some sections of the model_config and validates only what they affect
+
+        Stages reading the changed sections, and the stages depending on them,
+        run again. Results, errors and warnings of the other stages are reused
+        from the previous validation.
+
+        Parameters
+        ----------
+        changes : dict
+            {section: new definition} e.g. {"clusters": {"cls1": [2020, 2021]}}
+        fail_fast : bool, optional
+            stop starting new stages after the first stage with errors, by default False
+        max_workers : int, optional
+            number of threads used for validation, by default None
+
+        Returns
+        -------
+        list
+            name of the validated stages
+
+        Raises
+        ------
+        ConfigValidationError
+            if any error exists in the model_config
+        """
+        self.model_config.update(copy_config(changes, self.MUTABLE_SECTIONS))
+        stages = self.pipeline.invalidated(changes)
+        stages += [name for name in self.pipeline.stages if name not in self.stage_results and name not in stages]
+
+        with self._profile(), section("validation"):
+            self._run_pipeline(
+                fail_fast=fail_fast,
+                max_workers=max_workers,
+                stages=stages,
+                previous=self.stage_results,
+            )
+
+        return [name for name in self.pipeline.stages if name in stages]
+
+    def _profile(self):
+        """Activates the profiler of the profiling setting
+
+        The setting is read before validation (so the validation stages are
+        timed as well); invalid values are reported by the settings stage.
+
+        Returns
+        -------
+        context manager
+            activation of ``self.profiler``
+        """
+        mode = self.model_config.get(SETTINGS, {}).get("profiling")
+        mode = mode.lower() if isinstance(mode, str) else None
+        if mode not in PROFILING_MODES:
+            mode = None
+
+        if mode != self.profiler.mode:
+            self.profiler = Profiler(mode, self._log_directory() if mode else None)
+
+        return self.profiler.activate()
+
+    def _run_pipeline(self, fail_fast=False, max_workers=None, stages=None, previous=None):
+        save_directory = self._log_directory()
+
+        def stream(name, result):
+            log.extend(ERROR, result["errors"], name)
+            log.extend(WARNING, result["warnings"], name)
+
+        with LogSink(os.path.join(save_directory, self.LOG_FILE)) as log:
+            validation = self.pipeline.run(
+                fail_fast=fail_fast,
+                max_workers=max_workers,
+                on_result=stream,
+                stages=stages,
+                previous=previous,
+            )
+            for name, reason in validation["skipped"].items():
+                log.warning(reason, name)
+
+            self.stage_results = validation["results"]
+            self.warnings = validation["warnings"]
+            self.errors = validation["errors"]
+            self.log_counts = log.counts()
+
+            if self.errors:
+                log.table(
+                    level=ERROR,
+                    save_file=os.path.join(save_directory, self.ERROR_LOG_FILE),
+                )
+                raise ConfigValidationError(
+                    f"{len(self.errors)} errors exist in the model_config. The errors are listed in the error_log file located at {save_directory}"
+                )
+
+        return validation
+
+    def _preprocess_cache(self):
+        path = self.model_config.get(SETTINGS, {}).get("cache_path")
+        if not isinstance(path, str):
+            return None
+
+        return PreprocessCache(path)
+
+    def _save_validation(self, cache, key, warnings):
+        data = {
+            "years": self.years,
+            "time_slices": self.time_slices,
+            "clusters": self.clusters,
+            "cluster_names": self.cluster_index.names,
+            "regions": self.regions,
+            "commodities": self.commodities,
+            "technologies": self.technologies,
+            "settings": self.model_config[SETTINGS],
+            "warnings": warnings,
+            # reused by update after loading the entry
+            "stage_results": {
+                name: {"errors": list(result["errors"]), "warnings": list(result["warnings"])}
+                for name, result in self.stage_results.items()
+            },
+        }
+        arrays = {
+            "cluster_years": self.cluster_index.years,
+            "cluster_codes": self.cluster_index.codes,
+        }
+        cache.save(key, self.VALIDATION_CACHE, data, arrays)
+
+    def _load_validation(self, data, arrays):
+        self.years = data["years"]
+        self.time_slices = data["time_slices"]
+        self.clusters = data["clusters"]
+        self.cluster_index = ClusterIndex.from_arrays(
+            np.array(arrays["cluster_years"]),
+            np.array(arrays["cluster_codes"]),
+            data["cluster_names"],
+        )
+        self.regions = data["regions"]
+        self.commodities = data["commodities"]
+        self.technologies = data["technologies"]
+        self._set_index_sets()
+        self.model_config[SETTINGS] = data["settings"]
+        self.stage_results = data["stage_results"]
+        self.warnings.extend(data["warnings"])
+        self.errors = []
+
+    def read_input_data(self, path, sheets=None, chunk_size=CHUNK_SIZE):
+        """Reads the input data tables into arrays indexed by the validated sets
+
+        Every sheet of a workbook (or every csv/parquet file of a directory) is
+        a parameter. Tables have a 'year' and/or a time slice column (named after
+        the time_slices name) and one column per region. The results are stored
+        in ``input_data`` as
+        {parameter: {"values": numpy.ndarray, "index": [...], "regions": [...]}}.
+
+        Parameters
+        ----------
+        path : str
+            a xlsx workbook, a csv/parquet file or a directory of csv/parquet files
+        sheets : list, optional
+            sheets of the workbook to read, by default None (all the sheets)
+        chunk_size : int, optional
+            number of rows read at once, by default CHUNK_SIZE
+
+        Raises
+        ------
+        EssentialSetMissing
+            if the model_config is not validated
+        InputDataError
+            if any error exists in the input data
+        """
+        with self._profile(), section("input_data"):
+            self._read_input_data(path, sheets, chunk_size)
+
+    def _read_input_data(self, path, sheets, chunk_size):
+        if not hasattr(self, "years") or not hasattr(self, "time_slices"):
+            raise EssentialSetMissing(
+                "model_config should be validated before reading the input data."
+            )
+
+        slice_name = self.time_slices[SLICE_NAME]
+        slices = self.time_slices[T_SLICE]
+        index_dtypes = {
+            YEAR: "int64",
+            slice_name: "int64" if isinstance(slices, TimeSet) else "str",
+        }
+
+        extension = os.path.splitext(path)[1].lower()
+        if os.path.isdir(path):
+            tables = [
+                (os.path.splitext(file)[0], os.path.join(path, file), None)
+                for file in sorted(os.listdir(path))
+                if os.path.splitext(file)[1].lower() in TABLE_FORMATS
+            ]
+        elif extension in EXCEL_FORMATS:
+            if sheets is None:
+                from openpyxl import load_workbook
+
+                workbook = load_workbook(path, read_only=True)
+                sheets = workbook.sheetnames
+                workbook.close()
+            tables = [(sheet, path, sheet) for sheet in sheets]
+        else:
+            tables = [(os.path.splitext(os.path.basename(path))[0], path, None)]
+
+        cache = self._preprocess_cache()
+        if cache is not None:
+            key = config_hash(
+                self.model_config,
+                files=[file for _, file, _ in tables],
+                extra=[[parameter, sheet] for parameter, _, sheet in tables],
+            )
+            cached = cache.load(key, self.INPUT_DATA_CACHE)
+            if cached is not None:
+                data, arrays = cached
+                for parameter, info in data.items():
+                    self.input_data[parameter] = {"values": arrays[parameter], **info}
+                return
+
+        errors = []
+        for parameter, file, sheet in tables:
+            chunks = iter_table_chunks(
+                file, sheet=sheet, index_dtypes=index_dtypes, chunk_size=chunk_size
+            )
+            with section(f"input_data.{parameter}"):
+                data = read_parameter(
+                    chunks,
+                    self.index_sets[YEAR],
+                    self.index_sets[TIME_SLICES],
+                    slice_name,
+                    parameter,
+                )
+            errors.extend(data.pop("errors"))
+            self.input_data[parameter] = data
+
+        if errors:
+            save_directory = self._log_directory()
+            with LogSink(os.path.join(save_directory, self.LOG_FILE)) as log:
+                log.extend(ERROR, errors, "input_data")
+                log.table(
+                    level=ERROR,
+                    save_file=os.path.join(save_directory, self.ERROR_LOG_FILE),
+                )
+            raise InputDataError(
+                f"{len(errors)} errors exist in the input data. The errors are listed in the error_log file located at {save_directory}"
+            )
+
+        if cache is not None:
+            parameters = [parameter for parameter, _, _ in tables]
+            cache.save(
+                key,
+                self.INPUT_DATA_CACHE,
+                {
+                    parameter: {
+                        "index": self.input_data[parameter]["index"],
+                        "regions": self.input_data[parameter]["regions"],
+                    }
+                    for parameter in parameters
+                },
+                {parameter: self.input_data[parameter]["values"] for parameter in parameters},
+            )
+
+    def _log_directory(self):
+        path = self.model_config.get(SETTINGS, {}).get("log_path")
+        if not isinstance(path, str):
+            path = ModelSettings().log_path
+
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _set_index_sets(self, *names):
+        """Interns the labels of the validated sets into IndexSets
+
+        Parameters
+        ----------
+        *names : str
+            sets to update (YEAR, TIME_SLICES, CLUSTERS, REGIONS), by default all
+        """
+        labels = {
+            YEAR: lambda: self.years[ALL_PERIOD].unique(),
+            TIME_SLICES: lambda: self.time_slices[T_SLICE],
+            CLUSTERS: lambda: self.cluster_index.names,
+            REGIONS: lambda: self.regions,
+        }
+        for name in names or labels:
+            self.index_sets[name] = IndexSet(labels[name]())
+
+    def _validate_time_horizon(self):
+        section = self.model_config.get(TIME_HORIZON, {})
+        time = self.section_cache.get(
+            TIME_HORIZON, section, lambda: check_time_horizon(section)
+        )
+        if not time["errors"]:
+            self.years = time["time_horizon"]
+            self._set_index_sets(YEAR)
+
+        return {"errors": time["errors"], "warnings": time["warnings"]}
 
     def _extract_time_horizon_data(self):
-        time = check_time_horizon(self.model_config[TIME_HORIZON])
+        time = self._validate_time_horizon()
         errors = time["errors"]
         self.warnings.extend(time["warnings"])
         if errors:
-            save_directory = self.model_config[SETTINGS]["log_path"]
+            save_directory = self._log_directory()
             print_log(logs=errors, save_file=save_directory + "/error_log.txt")
             raise TimeHorizonError(
                 f"{len(errors)} exists in the definition of {TIME_HORIZON}. The errors are listed in the error_log file located at {save_directory}"
             )
 
-        self.years = time["time_horizon"]
-
-    def _check_model_settings(self):
+    def _validate_model_settings(self):
 
+        warnings = []
         default_settings = ModelSettings()
         settings = self.model_config.setdefault(SETTINGS, {})
+        given_solver = "solver" in settings
 
         for option in default_settings.KEYS:
             item_set = settings.setdefault(option, getattr(default_settings, option))
 
             validation = getattr(default_settings, "validate_" + option)(item_set)
-            self.warnings.extend(validation["warning"])
+            warnings.extend(validation["warning"])
             settings[option] = validation["value"]
 
+        # the sparse backend solves with HiGHS only
+        if settings["backend"] == SPARSE and settings["solver"] != HIGHS:
+            if given_solver:
+                warnings.append(
+                    f"{settings['solver']} cannot be used by the {SPARSE} backend. {HIGHS} is used."
+                )
+            settings["solver"] = HIGHS
+
         # check extra keys
         differences = set(settings).difference(default_settings.KEYS)
         if differences:
-            self.warnings.append(
+            warnings.append(
                 f"Following keys in the model {SETTINGS} are not valid and are ignored: \n{differences}"
             )
 
         self.model_config[SETTINGS] = settings
+
+        return {"errors": [], "warnings": warnings}
+
+    def _check_model_settings(self):
+        self.warnings.extend(self._validate_model_settings()["warnings"])
+
+    def _validate_time_slices(self):
+        section = self.model_config.setdefault(TIME_SLICES, {})
+        # check_time_slices reforms the section in place
+        slices = self.section_cache.get(
+            TIME_SLICES, section, lambda: check_time_slices(copy.deepcopy(section))
+        )
+        # the frozen result is shared, model_config keeps the given section
+        self.time_slices = slices["time_slices"]
+        if not slices["errors"]:
+            self._set_index_sets(TIME_SLICES)
+
+        return {"errors": slices["errors"], "warnings": slices["warnings"]}
+
+    def _validate_clusters(self):
+        section = self.model_config.get(CLUSTERS, {})
+        clusters = self.section_cache.get(
+            CLUSTERS,
+            section,
+            lambda: check_years_clusters(section, self.years[ALL_PERIOD]),
+            depends_on=self.years[ALL_PERIOD],
+        )
+        self.clusters = clusters["time_clusters"]
+        self.cluster_index = clusters["cluster_index"]
+        if not clusters["errors"]:
+            self._set_index_sets(CLUSTERS)
+
+        return {"errors": clusters["errors"], "warnings": []}
+
+    def _validate_regions(self):
+        regions = check_regions(self.model_config.get(REGIONS))
+        self.regions = regions["regions"]
+        if not regions["errors"]:
+            self._set_index_sets(REGIONS)
+
+        return {"errors": regions["errors"], "warnings": regions["warnings"]}
+
+    def _validate_commodities(self):
+        commodities = check_commodities(self.model_config.get(COMMODITIES, {}))
+        self.commodities = commodities["commodities"]
+
+        return {"errors": commodities["errors"], "warnings": commodities["warnings"]}
+
+    def _validate_technologies(self):
+        technologies = check_technologies(
+            self.model_config.get(TECHNOLOGIES, {}), self.commodities
+        )
+        self.technologies = technologies["technologies"]
+
+        return {
+            "errors": technologies["errors"],
+            "warnings": technologies["warnings"],
+        }
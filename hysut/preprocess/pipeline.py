@@ -0,0 +1,192 @@
+"""
+Running independent validation checks concurrently
+"""
+
+import contextvars
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from hysut.utils.instrumentation import section
+
+Stage = namedtuple("Stage", ["function", "dependencies", "sections"])
+
+
+def _run_stage(name, function):
+    with section(f"validation.{name}"):
+        return function()
+
+
+class ValidationPipeline:
+    """Collection of validation stages with declared dependencies
+
+    Every stage is a callable with no arguments returning a dict with (at least)
+    "errors" and "warnings" lists. Stages run on a thread pool as soon as all
+    their dependencies finished without errors, and the errors/warnings are
+    aggregated in the registration order of the stages, independently from the
+    order they finish in.
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    def register(self, name, function, dependencies=(), sections=None):
+        """Registers a validation stage
+
+        Parameters
+        ----------
+        name : str
+            name of the stage
+        function : callable
+            function returning {"errors": [...], "warnings": [...], ...}
+        dependencies : iterable, optional
+            name of the stages that should finish before this stage, by default ()
+        sections : iterable, optional
+            sections of the model_config read by the stage, by default None (the name of the stage)
+        """
+        self.stages[name] = Stage(
+            function, tuple(dependencies), (name,) if sections is None else tuple(sections)
+        )
+
+    def invalidated(self, sections):
+        """Finds the stages affected by changes in some sections of the model_config
+
+        Parameters
+        ----------
+        sections : iterable
+            changed sections
+
+        Returns
+        -------
+        list
+            stages reading the sections and all the stages depending on them
+            (in registration order)
+        """
+        sections = set(sections)
+        invalid = {
+            name for name, stage in self.stages.items() if sections.intersection(stage.sections)
+        }
+
+        changed = True
+        while changed:
+            changed = False
+            for name, stage in self.stages.items():
+                if name not in invalid and invalid.intersection(stage.dependencies):
+                    invalid.add(name)
+                    changed = True
+
+        return [name for name in self.stages if name in invalid]
+
+    def _check_dependencies(self):
+        for name, stage in self.stages.items():
+            unknown = set(stage.dependencies).difference(self.stages)
+            if unknown:
+                raise ValueError(f"stage '{name}' depends on unknown stages {unknown}.")
+
+    def run(self, fail_fast=False, max_workers=None, on_result=None, stages=None, previous=None):
+        """Runs all the stages or only some of them reusing the previous results
+
+        Parameters
+        ----------
+        fail_fast : bool, optional
+            if True, no new stage is started after a stage reports errors, by default False
+        max_workers : int, optional
+            number of threads, by default None (same default of ThreadPoolExecutor)
+        on_result : callable, optional
+            called with (name, result) as soon as each stage finishes, by default None
+        stages : iterable, optional
+            stages to run, by default None (all the stages). Stages without a
+            previous result run as well.
+        previous : dict, optional
+            results of a previous run ("results" of the output) used for the
+            stages that do not run, by default None
+
+        Returns
+        -------
+        dict
+            {
+                "errors" : list of errors,
+                "warnings" : list of warnings,
+                "results" : dict of the outputs of the executed (and reused) stages,
+                "skipped" : dict of the stages that did not run and the reason,
+            }
+        """
+        self._check_dependencies()
+
+        # stages are submitted only when a worker is free, so fail_fast does not
+        # leave queued stages behind
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+        previous = previous or {}
+        if stages is None:
+            stages = self.stages
+        stages = set(stages).union(name for name in self.stages if name not in previous)
+
+        results = {name: previous[name] for name in self.stages if name not in stages}
+        failed = {name for name, result in results.items() if result["errors"]}
+        skipped = {}
+        pending = {name: stage for name, stage in self.stages.items() if name in stages}
+        running = {}
+        stop = False
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                changed = not stop
+                while changed:
+                    changed = False
+                    for name, stage in list(pending.items()):
+                        if len(running) == max_workers:
+                            break
+                        blocked = failed.union(skipped).intersection(stage.dependencies)
+                        if blocked:
+                            skipped[name] = (
+                                f"validation of '{name}' is skipped due to errors in {sorted(blocked)}."
+                            )
+                        elif all(dependency in results for dependency in stage.dependencies):
+                            # stages run in a copy of the caller's context (e.g. its active profiler)
+                            context = contextvars.copy_context()
+                            running[
+                                executor.submit(context.run, _run_stage, name, stage.function)
+                            ] = name
+                        else:
+                            continue
+                        del pending[name]
+                        changed = True
+
+                if not running:
+                    if stop:
+                        for name in pending:
+                            skipped[name] = (
+                                f"validation of '{name}' is skipped (fail_fast)."
+                            )
+                        break
+                    raise ValueError(
+                        f"stages {sorted(pending)} have circular dependencies."
+                    )
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    if on_result is not None:
+                        on_result(name, results[name])
+                    if results[name]["errors"]:
+                        failed.add(name)
+                        stop = stop or fail_fast
+
+        errors = []
+        warnings = []
+        for name in self.stages:
+            if name in results:
+                errors.extend(results[name]["errors"])
+                warnings.extend(results[name]["warnings"])
+            else:
+                warnings.append(skipped[name])
+
+        return {
+            "errors": errors,
+            "warnings": warnings,
+            "results": results,
+            "skipped": {name: skipped[name] for name in self.stages if name in skipped},
+        }
@@ -0,0 +1,189 @@
+"""
+Reading the input data tables (xlsx, csv, parquet) into arrays indexed by the model sets
+"""
+
+import os
+from itertools import islice
+
+import numpy as np
+from hysut.utils.enums import YEAR
+from hysut.utils.sets import IndexSet, TimeSet
+
+CHUNK_SIZE = 100000
+
+EXCEL_FORMATS = [".xlsx", ".xlsm"]
+TABLE_FORMATS = [".csv", ".parquet"]
+
+
+def _table_dtypes(header, index_dtypes):
+    """Explicit dtypes: given types for index columns, float for the rest"""
+    return {
+        column: index_dtypes.get(column, np.float64)
+        for column in header
+        if column is not None
+    }
+
+
+def iter_table_chunks(path, sheet=None, index_dtypes=None, chunk_size=CHUNK_SIZE):
+    """Reads a table in chunks of rows with explicit dtypes
+
+    Excel files are read with openpyxl in read-only (streaming) mode, csv files
+    with the chunked reader of pandas.
+
+    Parameters
+    ----------
+    path : str
+        path of a xlsx, csv or parquet file
+    sheet : str, optional
+        name of the sheet for excel files, by default None (active sheet)
+    index_dtypes : dict, optional
+        dtype of the index columns, all other columns are read as float, by default None
+    chunk_size : int, optional
+        number of rows in every chunk, by default CHUNK_SIZE
+
+    Yields
+    ------
+    pandas.DataFrame
+    """
+    import pandas as pd
+
+    index_dtypes = index_dtypes or {}
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in EXCEL_FORMATS:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet is not None else workbook.active
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, ())
+            dtypes = _table_dtypes(header, index_dtypes)
+
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                chunk = pd.DataFrame.from_records(chunk, columns=header)
+                yield chunk[[*dtypes]].dropna(how="all").astype(dtypes)
+        finally:
+            workbook.close()
+
+    elif extension == ".csv":
+        header = pd.read_csv(path, nrows=0).columns
+        yield from pd.read_csv(
+            path, dtype=_table_dtypes(header, index_dtypes), chunksize=chunk_size
+        )
+
+    elif extension == ".parquet":
+        table = pd.read_parquet(path)
+        yield table.astype(_table_dtypes(table.columns, index_dtypes))
+
+    else:
+        raise ValueError(
+            f"{extension} files are not supported. Supported formats are {EXCEL_FORMATS + TABLE_FORMATS}."
+        )
+
+
+def read_parameter(chunks, years, time_slices, slice_name, parameter):
+    """Converts the chunks of a parameter table into an array indexed by the model sets
+
+    The table can have a 'year' column and a column named after the time slices
+    (e.g. 'time_slice'). All other columns are the regions (or a single value
+    column). The output array has one axis per index column (in the order of
+    years, time_slices) followed by the regions axis.
+
+    Parameters
+    ----------
+    chunks : iterable
+        DataFrames of the table (see iter_table_chunks)
+    years : TimeSet, IndexSet, list
+        valid years of the model
+    time_slices : TimeSet, IndexSet, list
+        valid time slices of the model
+    slice_name : str
+        name of the time slice column
+    parameter : str
+        name of the parameter (for better error definition)
+
+    Returns
+    -------
+    dict
+        {
+            "errors" : list of errors,
+            "values" : numpy.ndarray of the parameter (NaN for missing entries),
+            "index" : list of the index columns,
+            "regions" : list of the region columns,
+        }
+    """
+    errors = []
+    sets = {
+        YEAR: years if isinstance(years, IndexSet) else IndexSet(TimeSet.from_iterable(years)),
+        slice_name: IndexSet(time_slices),
+    }
+
+    values = filled = None
+    index_columns = regions = []
+    invalid = {}
+    duplicates = 0
+
+    for chunk in chunks:
+        if values is None:
+            index_columns = [column for column in sets if column in chunk.columns]
+            regions = [column for column in chunk.columns if column not in sets]
+            shape = [len(sets[column]) for column in index_columns] + [len(regions)]
+            values = np.full(shape, np.nan)
+            filled = np.zeros(shape[:-1], dtype=bool)
+
+        positions = []
+        valid = np.ones(len(chunk), dtype=bool)
+        for column in index_columns:
+            position = sets[column].codes_of(chunk[column].to_numpy())
+            missing = position == -1
+            if missing.any():
+                invalid.setdefault(column, set()).update(
+                    chunk[column].to_numpy()[missing].tolist()
+                )
+            valid &= ~missing
+            positions.append(position)
+
+        data = chunk[regions].to_numpy(dtype=np.float64)[valid]
+        if not index_columns:
+            # a single row of values per region
+            duplicates += len(data) - 1 + int(filled) if len(data) else 0
+            filled |= bool(len(data))
+            values[:] = data[-1] if len(data) else values
+            continue
+
+        positions = tuple(position[valid] for position in positions)
+        flat = np.ravel_multi_index(positions, filled.shape)
+        duplicates += int(filled.flat[flat].sum()) + len(flat) - len(np.unique(flat))
+        filled.flat[flat] = True
+        values[positions] = data
+
+    if values is None:
+        return {
+            "errors": [f"'{parameter}' has no data."],
+            "values": None,
+            "index": [],
+            "regions": [],
+        }
+
+    for column, items in invalid.items():
+        errors.append(
+            f"'{parameter}' has {column} values ({sorted(items, key=str)}) that are not defined in the model."
+        )
+
+    if duplicates:
+        errors.append(f"'{parameter}' has {duplicates} duplicated rows.")
+
+    missing = int(np.isnan(values).sum())
+    if missing:
+        errors.append(f"'{parameter}' has {missing} missing values.")
+
+    return {
+        "errors": errors,
+        "values": values,
+        "index": index_columns,
+        "regions": regions,
+    }
@@ -0,0 +1,216 @@
+"""
+Handling the definition of regions, commodities and technologies
+"""
+
+from numbers import Real
+
+from hysut.utils.defaults import Commodity, Regions, Technology
+from hysut.utils.enums import (
+    CAPACITY_FACTOR,
+    DEMAND,
+    EFFICIENCY,
+    EXISTING_CAPACITY,
+    INVESTMENT_COST,
+    LIFETIME,
+    T_INPUT,
+    T_OUTPUT,
+    VARIABLE_COST,
+)
+
+# attributes that can be a number or the name of an input data parameter
+TECHNOLOGY_PARAMETERS = {
+    CAPACITY_FACTOR: Technology.CAPACITY_FACTOR,
+    INVESTMENT_COST: Technology.INVESTMENT_COST,
+    VARIABLE_COST: Technology.VARIABLE_COST,
+    EXISTING_CAPACITY: Technology.EXISTING_CAPACITY,
+}
+
+
+def _is_parameter(value):
+    return isinstance(value, str) or (
+        isinstance(value, Real) and not isinstance(value, bool)
+    )
+
+
+def check_regions(regions):
+    """Checks/reforms the definition of regions
+
+    Parameters
+    ----------
+    regions : list, None
+        name of the regions e.g. ['north', 'south'], None for a single region model
+
+    Returns
+    -------
+    dict
+        {
+            "errors" : List of errors,
+            "warnings": List of warnings,
+            "regions" : list of regions,
+        }
+    """
+    errors = []
+
+    if regions is None:
+        regions = list(Regions.NAMES)
+
+    elif not isinstance(regions, list) or not all(
+        isinstance(region, str) for region in regions
+    ):
+        errors.append("'regions' should be a list of str.")
+        regions = []
+
+    elif len(set(regions)) != len(regions):
+        errors.append("duplicate values are not allowed in 'regions'.")
+
+    elif not regions:
+        errors.append("at least one region should be defined in 'regions'.")
+
+    return {"errors": errors, "warnings": [], "regions": regions}
+
+
+def check_commodities(commodities):
+    """Checks/reforms the definition of commodities
+
+    Parameters
+    ----------
+    commodities : dict, list
+        {name: {"demand": number or name of the input data parameter}} or list of names
+
+    Returns
+    -------
+    dict
+        {
+            "errors" : List of errors,
+            "warnings": List of warnings,
+            "commodities" : dict of commodities with default values
+        }
+    """
+    errors = []
+    warnings = []
+    output = {}
+
+    if isinstance(commodities, list):
+        commodities = {name: {} for name in commodities}
+
+    if not isinstance(commodities, dict):
+        return {
+            "errors": ["'commodities' should be a dict or a list of names."],
+            "warnings": warnings,
+            "commodities": output,
+        }
+
+    for name, attributes in commodities.items():
+        if attributes is None:
+            attributes = {}
+
+        if not isinstance(attributes, dict):
+            errors.append(f"definition of commodity '{name}' should be a dict.")
+            continue
+
+        demand = attributes.get(DEMAND, Commodity.DEMAND)
+        if not _is_parameter(demand):
+            errors.append(
+                f"'{DEMAND}' of commodity '{name}' should be a number or the name of an input data parameter."
+            )
+
+        extra_items = set(attributes).difference([DEMAND])
+        if extra_items:
+            warnings.append(
+                f"{extra_items} is not a valid argument for commodity '{name}' and is ignored."
+            )
+
+        output[name] = {DEMAND: demand}
+
+    return {"errors": errors, "warnings": warnings, "commodities": output}
+
+
+def check_technologies(technologies, commodities):
+    """Checks/reforms the definition of technologies
+
+    Parameters
+    ----------
+    technologies : dict
+        {
+            "name" : {
+                "output" : commodity produced by the technology,
+                "input" : commodity consumed by the technology (optional),
+                "efficiency" : output/input ratio (optional),
+                "lifetime" : years of operation of new capacity (optional),
+                "capacity_factor", "investment_cost", "variable_cost", "existing_capacity" :
+                    number or name of the input data parameter (optional),
+            }
+        }
+    commodities : dict
+        valid commodities
+
+    Returns
+    -------
+    dict
+        {
+            "errors" : List of errors,
+            "warnings": List of warnings,
+            "technologies" : dict of technologies with default values
+        }
+    """
+    errors = []
+    warnings = []
+    output = {}
+
+    if not isinstance(technologies, dict):
+        return {
+            "errors": ["'technologies' should be a dict."],
+            "warnings": warnings,
+            "technologies": output,
+        }
+
+    valid_items = [T_INPUT, T_OUTPUT, EFFICIENCY, LIFETIME, *TECHNOLOGY_PARAMETERS]
+
+    for name, attributes in technologies.items():
+        if not isinstance(attributes, dict):
+            errors.append(f"definition of technology '{name}' should be a dict.")
+            continue
+
+        technology = {
+            T_OUTPUT: attributes.get(T_OUTPUT),
+            T_INPUT: attributes.get(T_INPUT, Technology.INPUT),
+            EFFICIENCY: attributes.get(EFFICIENCY, Technology.EFFICIENCY),
+            LIFETIME: attributes.get(LIFETIME, Technology.LIFETIME),
+        }
+
+        if technology[T_OUTPUT] not in commodities:
+            errors.append(
+                f"'{T_OUTPUT}' of technology '{name}' should be one of the commodities {[*commodities]}."
+            )
+
+        if technology[T_INPUT] is not None and technology[T_INPUT] not in commodities:
+            errors.append(
+                f"'{T_INPUT}' of technology '{name}' should be one of the commodities {[*commodities]}."
+            )
+
+        efficiency = technology[EFFICIENCY]
+        if not isinstance(efficiency, Real) or isinstance(efficiency, bool) or efficiency <= 0:
+            errors.append(f"'{EFFICIENCY}' of technology '{name}' should be a positive number.")
+
+        lifetime = technology[LIFETIME]
+        if lifetime is not None and (
+            not isinstance(lifetime, int) or isinstance(lifetime, bool) or lifetime <= 0
+        ):
+            errors.append(f"'{LIFETIME}' of technology '{name}' should be a positive integer.")
+
+        for item, default in TECHNOLOGY_PARAMETERS.items():
+            technology[item] = attributes.get(item, default)
+            if not _is_parameter(technology[item]):
+                errors.append(
+                    f"'{item}' of technology '{name}' should be a number or the name of an input data parameter."
+                )
+
+        extra_items = set(attributes).difference(valid_items)
+        if extra_items:
+            warnings.append(
+                f"{extra_items} is not a valid argument for technology '{name}' and is ignored."
+            )
+
+        output[name] = technology
+
+    return {"errors": errors, "warnings": warnings, "technologies": output}
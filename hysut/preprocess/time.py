@@ -5,9 +5,13 @@ from hysut.utils.enums import (
     COOL_PERIOD,
     T_SLICE,
     SLICE_NAME,
+    TIME_HORIZON,
+    TIME_SLICES,
 )
 from hysut.exceptions_logging.exceptions import EssentialSetMissing
+from hysut.exceptions_logging.logger import ERROR, WARNING
 from hysut.utils.defaults import Time
+from hysut.utils.sets import TimeSet
 from hysut.utils.tools import read_range_function, type_consistency_check
 
 
@@ -27,7 +31,7 @@ def read_time_data(time_data, item):
         collection of the errors and final time definitions.
         e.g.
         {
-            "time": [2020,2022,2023],
+            "time": TimeSet of [2020,2022,2023],
             "error": ["time definition through lists can only contain integers for 'run'."]
         }
     """
@@ -41,7 +45,7 @@ def read_time_data(time_data, item):
     for time in time_data:
 
         if isinstance(time, int):
-            time_collection.append(time)
+            time_collection.append(range(time, time + 1))
 
         elif isinstance(time, list):
             if not all([isinstance(i, int) for i in time]):
@@ -49,11 +53,11 @@ def read_time_data(time_data, item):
                     f"time definition through lists can only contain integers for '{item}'."
                 )
             else:
-                time_collection.extend(time)
+                time_collection.append(TimeSet.from_iterable(time))
 
         elif isinstance(time, str) and "range" in time:
             rng_data = read_range_function(time, item)
-            time_collection.extend(rng_data["data"])
+            time_collection.append(rng_data["data"])
             errors.extend(rng_data["error"])
 
         else:
@@ -61,12 +65,33 @@ def read_time_data(time_data, item):
                 f"time definition can be a range (e.g. range(start,end,step)),an integer or a list of integers for '{item}'"
             )
 
-    return {"time": time_collection, "error": errors}
+    return {"time": TimeSet(time_collection), "error": errors}
+
+
+def _span_intersection(first, second):
+    """Returns the overlap of two inclusive (start, end) spans
+
+    Parameters
+    ----------
+    first : tuple
+        (start, end) of the first span
+    second : tuple
+        (start, end) of the second span
+
+    Returns
+    -------
+    TimeSet
+        the overlapping years (empty if spans do not overlap)
+    """
+    return TimeSet([range(max(first[0], second[0]), min(first[1], second[1]) + 1)])
 
 
 def check_time_period_overlaps(periods):
     """Checks if any overlap in the periods exist
 
+    Each period is treated as the span between its first and last year, so the
+    check only compares span bounds and never expands the periods.
+
     Parameters
     ----------
     periods : dict
@@ -75,18 +100,18 @@ def check_time_period_overlaps(periods):
     Returns
     -------
     list
-        a list of errors
+        a list of errors (overlaps are reported as ranges)
     """
 
     errors = []
     periods = {
-        period: list(range(sorted_list[0], sorted_list[-1] + 1))
+        period: (sorted_list[0], sorted_list[-1])
         for period, sorted_list in periods.items()
     }
     # Checking if duplicate values exist in different periods with run
     for period in [WARM_PERIOD, COOL_PERIOD]:
         if period in periods:
-            intersects = set(periods[RUN_PERIOD]).intersection(periods[period])
+            intersects = _span_intersection(periods[RUN_PERIOD], periods[period])
             if intersects:
                 errors.append(
                     f"time_horizon for 'run' and '{period}' have following intersections."
@@ -95,7 +120,7 @@ def check_time_period_overlaps(periods):
 
     # checking if warm and cool period have intersects
     if all([period in periods for period in [WARM_PERIOD, COOL_PERIOD]]):
-        intersects = set(periods[WARM_PERIOD]).intersection(periods[COOL_PERIOD])
+        intersects = _span_intersection(periods[WARM_PERIOD], periods[COOL_PERIOD])
 
         if intersects:
             errors.append(
@@ -106,13 +131,15 @@ def check_time_period_overlaps(periods):
     return errors
 
 
-def check_time_horizon(time_horizon):
+def check_time_horizon(time_horizon, log=None):
     """Checks/reform the time horzon definition and collects all errors/warnings through multiple functions
 
     Parameters
     ----------
     time_horizon : dict
         main dict of time_horizon (from yaml file)
+    log : LogSink, optional
+        if given, errors and warnings are streamed to it, by default None
 
     Returns
     -------
@@ -141,7 +168,7 @@ def check_time_horizon(time_horizon):
 
             else:
                 # avoid deuplicate values and sort the years
-                time_data[period] = sorted(set(data.get("time")))
+                time_data[period] = data.get("time").unique()
 
     if RUN_PERIOD not in time_data:
 
@@ -164,9 +191,12 @@ def check_time_horizon(time_horizon):
     errors.extend(check_time_period_overlaps(time_data))
 
     # set all_years
-    time_data[ALL_PERIOD] = sorted(
-        [year for period in time_data.values() for year in period]
-    )
+    time_data[ALL_PERIOD] = TimeSet().union(*time_data.values())
+
+    if log is not None:
+        log.extend(ERROR, errors, TIME_HORIZON)
+        log.extend(WARNING, warnings, TIME_HORIZON)
+
     return {"errors": errors, "warnings": warnings, "time_horizon": time_data}
 
 
@@ -175,13 +205,13 @@ def read_time_slice_data(slices):
 
     Parameters
     ----------
-    slices : list,int,str
+    slices : list,int,str,TimeSet,range
 
     Returns
     -------
     dict
         {
-            'time_slices' : List of time_slices
+            'time_slices' : TimeSet if all slices are integers, otherwise list of time_slices
             'errors: errors found in reading the data
         }
     """
@@ -191,25 +221,33 @@ def read_time_slice_data(slices):
     if isinstance(slices, str):
         if "range" in slices:
             rng_data = read_range_function(slices, "time_slices")
-            time_slices.extend(rng_data["data"])
+            time_slices.append(rng_data["data"])
             errors.extend(rng_data["error"])
         else:
-            time_slices.append(slices)
+            time_slices.append([slices])
 
     elif isinstance(slices, int):
-        time_slices.append(slices)
+        time_slices.append(range(slices, slices + 1))
+
+    # already read integer slices (e.g. a validated time_slices section)
+    elif isinstance(slices, (TimeSet, range)):
+        time_slices.append(TimeSet.from_iterable(slices))
 
     # if a list is passed
-    elif isinstance(slices, list):
+    elif isinstance(slices, (list, tuple)):
+        slices = list(slices)
         # if all data in the list have the same data type
         if type_consistency_check(slices) == []:
-            time_slices.extend(slices)
+            if slices and isinstance(slices[0], int):
+                time_slices.append(TimeSet.from_iterable(slices))
+            else:
+                time_slices.append(slices)
 
         # otherwise make a recursive process to flatten the list
         else:
             for i in slices:
                 data = read_time_slice_data(i)
-                time_slices.extend(data["time_slices"])
+                time_slices.append(data["time_slices"])
                 errors.extend(data["errors"])
 
     else:
@@ -217,10 +255,16 @@ def read_time_slice_data(slices):
             "'time_slices accept only int, str (or range function) or a list of mentioned items."
         )
 
+    # integer slices are kept compact, labels are flattened into a list
+    if all(not isinstance(part, list) for part in time_slices):
+        time_slices = TimeSet(time_slices)
+    else:
+        time_slices = [label for part in time_slices for label in part]
+
     return {"time_slices": time_slices, "errors": errors}
 
 
-def check_time_slices(time_slices):
+def check_time_slices(time_slices, log=None):
     """Checks/reforms time_slices definition and collect all the errors and warnings
 
     Parameters
@@ -230,6 +274,8 @@ def check_time_slices(time_slices):
             "name" : 'name of the time slice e.g. Hour',
             "slices" : definition of slices can be given in different modes like: ['Day','Night'] or 'range(1,8761)'
         }
+    log : LogSink, optional
+        if given, errors and warnings are streamed to it, by default None
 
     Returns
     -------
@@ -260,11 +306,21 @@ def check_time_slices(time_slices):
             " is ignored."
         )
 
-    # check the type_consistency
-    errors.extend(type_consistency_check(slices, "time_slices"))
+    slices = time_slices[T_SLICE]
+
+    if isinstance(slices, TimeSet):
+        duplicates = not slices.is_unique()
+    else:
+        # check the type_consistency
+        errors.extend(type_consistency_check(slices, "time_slices"))
+        duplicates = len(set(slices)) != len(slices)
 
     # check if duplicate values exist
-    if len(set(slices)) != len(slices):
+    if duplicates:
         errors.append("duplicate values are not allowed in 'time_slices'.")
 
+    if log is not None:
+        log.extend(ERROR, errors, TIME_SLICES)
+        log.extend(WARNING, warnings, TIME_SLICES)
+
     return {"errors": errors, "warnings": warnings, "time_slices": time_slices}
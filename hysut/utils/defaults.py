@@ -1,6 +1,9 @@
 from functools import cached_property
 import os
-import cvxpy as cp
+from hysut.utils.enums import CVXPY, KMEDOIDS, LP, MILP, QP, SPARSE
+from hysut.utils.instrumentation import PROFILING_MODES
+from hysut.utils.solvers import SOLVER_REGISTRY
+from hysut.exceptions_logging.exceptions import SolverNotFound
 
 
 class Time:
@@ -8,31 +11,103 @@ class Time:
     SLICE_NAME = "time_slice"
     T_SLICE = [1]
 
+    # representative time slice aggregation
+    PERIOD_LENGTH = 24
+    AGGREGATION_METHOD = KMEDOIDS
+    MAX_ITERATIONS = 100
+
+
+class Regions:
+
+    NAMES = ["region"]
+
+
+class Commodity:
+
+    DEMAND = 0.0
+
+
+class Technology:
+
+    INPUT = None
+    EFFICIENCY = 1.0
+    # None means the capacity never retires
+    LIFETIME = None
+    CAPACITY_FACTOR = 1.0
+    INVESTMENT_COST = 0.0
+    VARIABLE_COST = 0.0
+    EXISTING_CAPACITY = 0.0
+
 
 class ModelSettings:
     """Defines the default values for model settings in model_config along with validation methods
     """
 
-    KEYS = ["solver", "log_path"]
+    KEYS = ["problem_class", "solver", "log_path", "cache_path", "backend", "profiling"]
+    PROBLEM_CLASSES = [LP, MILP, QP]
+    BACKENDS = [CVXPY, SPARSE]
+
+    def __init__(self, problem_class=LP):
+        self.problem_class = problem_class
 
     @cached_property
     def solver(self):
-        free_solvers = ["CVXOPT", "ECOS", "ECOS_BB", "GLPK", "OSQP", "SCIPY"]
-
-        for solver in free_solvers:
-            if solver in cp.installed_solvers():
-                return solver
+        solver = SOLVER_REGISTRY.best(self.problem_class)
+        if solver is None:
+            raise SolverNotFound(
+                f"No solver capable of solving {self.problem_class} problems is installed."
+                f" Installed solvers are {SOLVER_REGISTRY.installed()}."
+            )
 
-        raise
+        return solver
 
     @cached_property
     def log_path(self):
         return r"{}/logs".format(os.getcwd())
 
+    @cached_property
+    def cache_path(self):
+        # preprocessing cache is disabled by default
+        return None
+
+    @cached_property
+    def backend(self):
+        return CVXPY
+
+    @cached_property
+    def profiling(self):
+        # instrumentation is disabled by default
+        return None
+
+    def validate_problem_class(self, problem_class):
+        warning = []
+        if isinstance(problem_class, str) and problem_class.upper() in self.PROBLEM_CLASSES:
+            problem_class = problem_class.upper()
+
+        else:
+            warning.append(
+                f"{problem_class} is not a valid problem_class. Default problem_class ({LP}) is used."
+            )
+            problem_class = LP
+
+        # the default solver depends on the problem class
+        if problem_class != self.problem_class:
+            self.problem_class = problem_class
+            self.__dict__.pop("solver", None)
+
+        return {"warning": warning, "value": problem_class}
+
     def validate_solver(self, solver):
         warning = []
-        if solver.upper() in cp.installed_solvers():
-            solver = solver.upper()
+        name = solver.upper() if isinstance(solver, str) else solver
+        if SOLVER_REGISTRY.supports(name, self.problem_class):
+            solver = name
+
+        elif name in SOLVER_REGISTRY.solvers:
+            warning.append(
+                f"{solver} cannot solve {self.problem_class} problems. Default solver ({self.solver}) is used."
+            )
+            solver = self.solver
 
         else:
 
@@ -51,3 +126,39 @@ class ModelSettings:
             )
 
         return {"warning": warning, "value": path}
+
+    def validate_cache_path(self, path):
+        warning = []
+        if path is not None and not isinstance(path, str):
+            path = self.cache_path
+            warning.append(
+                f"cache_path should be str. Default cache_path ({path}) is used."
+            )
+
+        return {"warning": warning, "value": path}
+
+    def validate_backend(self, backend):
+        warning = []
+        if isinstance(backend, str) and backend.lower() in self.BACKENDS:
+            backend = backend.lower()
+
+        else:
+            warning.append(
+                f"{backend} is not a valid backend. Valid backends are {self.BACKENDS}. Default backend ({self.backend}) is used."
+            )
+            backend = self.backend
+
+        return {"warning": warning, "value": backend}
+
+    def validate_profiling(self, mode):
+        warning = []
+        if isinstance(mode, str) and mode.lower() in PROFILING_MODES:
+            mode = mode.lower()
+
+        elif mode is not None:
+            warning.append(
+                f"{mode} is not a valid profiling mode. Valid modes are {PROFILING_MODES} or None. Profiling is disabled."
+            )
+            mode = self.profiling
+
+        return {"warning": warning, "value": mode}
@@ -9,3 +9,47 @@ T_SLICE = "slices"
 SLICE_NAME = "name"
 
 SETTINGS = "settings"
+
+KMEANS = "kmeans"
+KMEDOIDS = "kmedoids"
+
+TIME_SLICES = "time_slices"
+CLUSTERS = "clusters"
+
+LP = "LP"
+MILP = "MILP"
+QP = "QP"
+
+YEAR = "year"
+
+REGIONS = "regions"
+COMMODITIES = "commodities"
+TECHNOLOGIES = "technologies"
+
+# technology and commodity attributes
+T_INPUT = "input"
+T_OUTPUT = "output"
+EFFICIENCY = "efficiency"
+LIFETIME = "lifetime"
+CAPACITY_FACTOR = "capacity_factor"
+INVESTMENT_COST = "investment_cost"
+VARIABLE_COST = "variable_cost"
+EXISTING_CAPACITY = "existing_capacity"
+DEMAND = "demand"
+
+# model variables
+PRODUCTION = "production"
+NEW_CAPACITY = "new_capacity"
+CAPACITY = "capacity"
+
+# model backends
+CVXPY = "cvxpy"
+SPARSE = "sparse"
+
+# the only solver of the sparse backend (scipy.optimize.linprog)
+HIGHS = "HIGHS"
+
+# profiling modes
+TIMERS = "timers"
+CPROFILE = "cprofile"
+TRACEMALLOC = "tracemalloc"
@@ -0,0 +1,349 @@
+"""
+Timers and memory counters of the preprocessing, model building and solve steps
+
+Instrumented code marks its steps with ``section(name)`` (or the ``timed``
+decorator). Sections are recorded only while a Profiler is active, otherwise
+they cost a context variable lookup and an empty context manager. The active
+profiler is a context variable, so activations in different threads (or
+asyncio tasks) are independent; code running sections on other threads should
+run them in a copy of the context (contextvars.copy_context).
+
+    profiler = Profiler(TIMERS)
+    with profiler.activate():
+        model = CvxpyModel(data)
+        model.solve()
+    profiler.report()
+"""
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from functools import wraps
+
+from hysut.utils.enums import CPROFILE, TIMERS, TRACEMALLOC
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+PROFILING_MODES = [TIMERS, CPROFILE, TRACEMALLOC]
+
+REPORT_FILE = "profile.json"
+CPROFILE_FILE = "profile.prof"
+TRACEMALLOC_FILE = "memory.snapshot"
+
+# profiler recording the sections (None if profiling is disabled)
+_ACTIVE = contextvars.ContextVar("hysut_profiler", default=None)
+
+
+def _max_rss():
+    """Peak resident memory of the process in bytes (0 if not available)"""
+    if resource is None:
+        return 0
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macOS
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+class _NullSection:
+    """Section used when profiling is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+NULL_SECTION = _NullSection()
+
+
+class _Section:
+    """Measures the wall time, cpu time and memory of a block of code"""
+
+    __slots__ = ("profiler", "name", "start", "cpu", "memory")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._enter_thread()
+        self.memory = self.profiler._memory()
+        self.cpu = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        elapsed = time.perf_counter() - self.start
+        cpu = time.thread_time() - self.cpu
+        self.profiler.record(
+            self.name, elapsed, cpu_time=cpu, memory=self.profiler._memory() - self.memory
+        )
+        self.profiler._exit_thread()
+        return False
+
+
+class Profiler:
+    """Collects the timing report of a run
+
+    Every section is aggregated by name into the number of calls, the total wall
+    time, the cpu time of the thread running it, and a memory counter: the
+    increase of the peak resident memory of the process, or the memory allocated
+    (and not freed) inside the section in the tracemalloc mode.
+
+    Parameters
+    ----------
+    mode : str, optional
+        'timers', 'cprofile' (timers and a cProfile of the threads running the
+        sections) or 'tracemalloc' (timers and a tracemalloc snapshot), by
+        default TIMERS. None disables profiling.
+    directory : str, optional
+        directory where the report (and the cProfile/tracemalloc dumps) are
+        written every time the profiler is deactivated, by default None (not written)
+    """
+
+    def __init__(self, mode=TIMERS, directory=None):
+        if mode is not None and mode not in PROFILING_MODES:
+            raise ValueError(
+                f"{mode} is not a valid profiling mode. Valid modes are {PROFILING_MODES}."
+            )
+
+        self.mode = mode
+        self.directory = directory
+        self.sections = {}
+        self.snapshot = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiles = []
+        self._depth = 0
+        self._started_tracing = False
+
+    @property
+    def enabled(self):
+        return self.mode is not None
+
+    def section(self, name):
+        """Context manager recording a block of code as the section ``name``"""
+        return _Section(self, name) if self.enabled else NULL_SECTION
+
+    def record(self, name, elapsed, cpu_time=0.0, memory=0):
+        """Adds a measurement to a section
+
+        Useful for times measured by other libraries (e.g. the solve time
+        reported by the solver).
+
+        Parameters
+        ----------
+        name : str
+            name of the section
+        elapsed : float
+            wall time in seconds
+        cpu_time : float, optional
+            cpu time in seconds, by default 0.0
+        memory : int, optional
+            memory counter in bytes, by default 0
+        """
+        with self._lock:
+            section = self.sections.setdefault(
+                name, {"calls": 0, "time": 0.0, "cpu_time": 0.0, "memory": 0}
+            )
+            section["calls"] += 1
+            section["time"] += elapsed
+            section["cpu_time"] += cpu_time
+            section["memory"] = max(section["memory"], memory)
+
+    def activate(self):
+        """Context manager making this profiler the one recording the sections
+
+        The activation holds for the current thread (context) only. Activations
+        can be nested and overlap in different threads; the tracemalloc
+        snapshot is taken and the files are written when the last activation ends.
+        """
+        return _Activation(self)
+
+    def report(self):
+        """Structured timing report of the recorded sections
+
+        Returns
+        -------
+        dict
+            {
+                "mode" : profiling mode,
+                "sections" : [{"name", "calls", "time", "cpu_time", "memory"}]
+                    in the order the sections are first finished,
+            }
+        """
+        with self._lock:
+            sections = [{"name": name, **values} for name, values in self.sections.items()]
+
+        return {"mode": self.mode, "sections": sections}
+
+    def dump(self, directory):
+        """Writes the report and the cProfile/tracemalloc dumps of the mode
+
+        Parameters
+        ----------
+        directory : str
+            directory of the files (created if not exists)
+
+        Returns
+        -------
+        dict
+            {"report"/"cprofile"/"tracemalloc": path of the file}
+        """
+        os.makedirs(directory, exist_ok=True)
+        files = {"report": os.path.join(directory, REPORT_FILE)}
+        with open(files["report"], "w") as file:
+            json.dump(self.report(), file, indent=2)
+
+        if self.mode == CPROFILE and self._profiles:
+            import pstats
+
+            files["cprofile"] = os.path.join(directory, CPROFILE_FILE)
+            with self._lock:
+                profiles = list(self._profiles)
+            pstats.Stats(*profiles).dump_stats(files["cprofile"])
+
+        if self.mode == TRACEMALLOC and self.snapshot is not None:
+            files["tracemalloc"] = os.path.join(directory, TRACEMALLOC_FILE)
+            self.snapshot.dump(files["tracemalloc"])
+
+        return files
+
+    def _memory(self):
+        if self.mode == TRACEMALLOC:
+            import tracemalloc
+
+            return tracemalloc.get_traced_memory()[0]
+
+        return _max_rss()
+
+    def _enter_thread(self):
+        """Starts the cProfile of the current thread at its outermost section"""
+        if self.mode != CPROFILE:
+            return
+
+        depth = getattr(self._local, "depth", 0)
+        if not depth:
+            if not hasattr(self._local, "profile"):
+                import cProfile
+
+                self._local.profile = cProfile.Profile()
+                with self._lock:
+                    self._profiles.append(self._local.profile)
+            self._local.profile.enable()
+        self._local.depth = depth + 1
+
+    def _exit_thread(self):
+        if self.mode != CPROFILE:
+            return
+
+        self._local.depth -= 1
+        if not self._local.depth:
+            self._local.profile.disable()
+
+    def _start(self):
+        token = _ACTIVE.set(self if self.enabled else None)
+        with self._lock:
+            self._depth += 1
+            if self._depth == 1 and self.mode == TRACEMALLOC:
+                import tracemalloc
+
+                self._started_tracing = not tracemalloc.is_tracing()
+                if self._started_tracing:
+                    tracemalloc.start()
+
+        return token
+
+    def _stop(self, token):
+        _ACTIVE.reset(token)
+        with self._lock:
+            self._depth -= 1
+            last = not self._depth
+
+        if last:
+            self._finish()
+
+    def _finish(self):
+        """Takes the tracemalloc snapshot and writes the files (last activation)"""
+        if self.mode == TRACEMALLOC:
+            import tracemalloc
+
+            self.snapshot = tracemalloc.take_snapshot()
+            if self._started_tracing:
+                tracemalloc.stop()
+
+        if self.enabled and self.directory is not None:
+            self.dump(self.directory)
+
+
+class _Activation:
+    __slots__ = ("profiler", "token")
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def __enter__(self):
+        self.token = self.profiler._start()
+        return self.profiler
+
+    def __exit__(self, *args):
+        self.profiler._stop(self.token)
+        return False
+
+
+def active_profiler():
+    """Returns the active Profiler of the current context (None if profiling is disabled)"""
+    return _ACTIVE.get()
+
+
+def section(name):
+    """Context manager recording a block of code in the active profiler
+
+    Parameters
+    ----------
+    name : str
+        name of the section e.g. "model.build"
+    """
+    profiler = _ACTIVE.get()
+    return NULL_SECTION if profiler is None else _Section(profiler, name)
+
+
+def record(name, elapsed, cpu_time=0.0, memory=0):
+    """Adds a measurement to the active profiler (see Profiler.record)"""
+    profiler = _ACTIVE.get()
+    if profiler is not None:
+        profiler.record(name, elapsed, cpu_time, memory)
+
+
+def timed(name=None):
+    """Decorator recording every call of a function as a section
+
+    Parameters
+    ----------
+    name : str, optional
+        name of the section, by default None (qualified name of the function)
+    """
+
+    def decorator(function):
+        label = name or function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _ACTIVE.get()
+            if profiler is None:
+                return function(*args, **kwargs)
+            with _Section(profiler, label):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
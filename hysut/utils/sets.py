@@ -0,0 +1,603 @@
+"""
+Compact containers for the sets used in the model definition
+"""
+
+from bisect import bisect_right
+from itertools import chain
+
+import numpy as np
+
+
+def _append_run(runs, run):
+    """Appends a range to a list of runs, merging it with the last run when
+    both belong to the same arithmetic progression.
+
+    Parameters
+    ----------
+    runs : list
+        list of range objects (modified in place)
+    run : range
+        the range to append
+    """
+    if not run:
+        return
+
+    if runs:
+        last = runs[-1]
+        step = run.start - last[-1]
+        if (
+            step != 0
+            and (len(last) == 1 or last.step == step)
+            and (len(run) == 1 or run.step == step)
+        ):
+            runs[-1] = range(last.start, run[-1] + step, step)
+            return
+
+    runs.append(run)
+
+
+def _is_unit(run):
+    return len(run) == 1 or run.step == 1
+
+
+class TimeSet:
+    """Ordered collection of integer time steps (years or time slices) stored
+    as a sequence of ``range`` runs instead of a materialized list.
+
+    Length is kept as cumulative offsets and membership is checked against the
+    runs, so neither requires expanding the values. The values are only
+    materialized when :meth:`to_list` or :meth:`to_array` is called.
+
+    Parameters
+    ----------
+    runs : iterable, optional
+        ranges (or TimeSets) defining the values in the given order, by default ()
+    """
+
+    __slots__ = ("_runs", "_offsets", "_starts")
+
+    def __init__(self, runs=()):
+        merged = []
+        for run in runs:
+            if isinstance(run, TimeSet):
+                for sub_run in run.runs:
+                    _append_run(merged, sub_run)
+            else:
+                _append_run(merged, run)
+
+        self._runs = tuple(merged)
+
+        offsets = [0]
+        for run in self._runs:
+            offsets.append(offsets[-1] + len(run))
+        self._offsets = tuple(offsets)
+
+        # starts are only kept if runs are ascending and disjoint, which allows
+        # binary search for membership
+        ascending = all(_is_unit(run) or run.step > 0 for run in self._runs) and all(
+            previous[-1] < current[0]
+            for previous, current in zip(self._runs, self._runs[1:])
+        )
+        self._starts = tuple(run[0] for run in self._runs) if ascending else None
+
+    @classmethod
+    def from_iterable(cls, values):
+        """Creates a TimeSet from an iterable of integers keeping the given order
+
+        Parameters
+        ----------
+        values : iterable
+            iterable of int
+
+        Returns
+        -------
+        TimeSet
+        """
+        if isinstance(values, TimeSet):
+            return values
+
+        if isinstance(values, range):
+            return cls([values])
+
+        runs = []
+        for value in values:
+            _append_run(runs, range(value, value + 1))
+
+        return cls(runs)
+
+    @property
+    def runs(self):
+        """tuple of the range objects holding the values"""
+        return self._runs
+
+    @property
+    def is_sorted(self):
+        """True if values are strictly ascending (sorted without duplicates)"""
+        return self._starts is not None
+
+    def __len__(self):
+        return self._offsets[-1]
+
+    def __iter__(self):
+        return chain.from_iterable(self._runs)
+
+    def __contains__(self, value):
+        if self._starts is not None:
+            index = bisect_right(self._starts, value) - 1
+            return index >= 0 and value in self._runs[index]
+
+        return any(value in run for run in self._runs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.to_list()[index]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TimeSet index out of range")
+
+        position = bisect_right(self._offsets, index) - 1
+        return self._runs[position][index - self._offsets[position]]
+
+    def __eq__(self, other):
+        if isinstance(other, TimeSet):
+            if self._runs == other.runs:
+                return True
+        elif not isinstance(other, (list, tuple, range)):
+            return NotImplemented
+
+        return len(self) == len(other) and all(
+            mine == theirs for mine, theirs in zip(self, other)
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"TimeSet({list(self._runs)})"
+
+    def __str__(self):
+        # compact form using the same notation of the model config
+        runs = []
+        for run in self._runs:
+            if len(run) == 1:
+                runs.append(str(run[0]))
+            elif run.step == 1:
+                runs.append(f"range({run.start}, {run.stop})")
+            else:
+                runs.append(f"range({run.start}, {run.stop}, {run.step})")
+
+        return ", ".join(runs)
+
+    def to_list(self):
+        """Materializes the values as a list
+
+        Returns
+        -------
+        list
+        """
+        return list(self)
+
+    def to_array(self, dtype=np.int64):
+        """Materializes the values as a numpy array
+
+        Parameters
+        ----------
+        dtype : numpy.dtype, optional
+            by default np.int64
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        if not self._runs:
+            return np.empty(0, dtype=dtype)
+
+        return np.concatenate(
+            [np.arange(run.start, run.stop, run.step, dtype=dtype) for run in self._runs]
+        )
+
+    @classmethod
+    def from_array(cls, array):
+        """Creates a TimeSet from a sorted array of unique integers
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            sorted 1-D array without duplicates
+
+        Returns
+        -------
+        TimeSet
+        """
+        if not len(array):
+            return cls()
+
+        breaks = np.flatnonzero(np.diff(array) != 1) + 1
+        starts = array[np.r_[0, breaks]].tolist()
+        stops = (array[np.r_[breaks - 1, len(array) - 1]] + 1).tolist()
+
+        return cls(range(start, stop) for start, stop in zip(starts, stops))
+
+    def _intervals(self):
+        """Returns the values as sorted and merged [start, stop) intervals.
+        Unit-step runs are kept as a single interval, stepped runs contribute
+        one interval per value.
+        """
+        bounds = []
+        for run in self._runs:
+            if _is_unit(run):
+                bounds.append((run[0], run[-1] + 1))
+            else:
+                bounds.extend((value, value + 1) for value in run)
+
+        intervals = []
+        for start, stop in sorted(bounds):
+            if intervals and start <= intervals[-1][1]:
+                if stop > intervals[-1][1]:
+                    intervals[-1][1] = stop
+            else:
+                intervals.append([start, stop])
+
+        return intervals
+
+    def unique(self):
+        """Returns the sorted values without duplicates
+
+        Returns
+        -------
+        TimeSet
+        """
+        if self.is_sorted:
+            return self
+
+        return TimeSet(range(start, stop) for start, stop in self._intervals())
+
+    def is_unique(self):
+        """Checks if no value is repeated
+
+        Returns
+        -------
+        bool
+        """
+        return len(self.unique()) == len(self)
+
+    def union(self, *others):
+        """Returns the sorted union of the values
+
+        Parameters
+        ----------
+        others : TimeSet or iterable of int
+
+        Returns
+        -------
+        TimeSet
+        """
+        return TimeSet(
+            [self, *[TimeSet.from_iterable(other) for other in others]]
+        ).unique()
+
+    def intersection(self, other):
+        """Returns the sorted values existing in both sets
+
+        Parameters
+        ----------
+        other : TimeSet or iterable of int
+
+        Returns
+        -------
+        TimeSet
+        """
+        mine = self._intervals()
+        theirs = TimeSet.from_iterable(other)._intervals()
+
+        runs = []
+        i = j = 0
+        while i < len(mine) and j < len(theirs):
+            start = max(mine[i][0], theirs[j][0])
+            stop = min(mine[i][1], theirs[j][1])
+            if start < stop:
+                runs.append(range(start, stop))
+            if mine[i][1] < theirs[j][1]:
+                i += 1
+            else:
+                j += 1
+
+        return TimeSet(runs)
+
+    def difference(self, other):
+        """Returns the sorted values that do not exist in other
+
+        Parameters
+        ----------
+        other : TimeSet or iterable of int
+
+        Returns
+        -------
+        TimeSet
+        """
+        mine = self._intervals()
+        theirs = TimeSet.from_iterable(other)._intervals()
+
+        runs = []
+        j = 0
+        for start, stop in mine:
+            while j < len(theirs) and theirs[j][1] <= start:
+                j += 1
+            k = j
+            while start < stop and k < len(theirs) and theirs[k][0] < stop:
+                if theirs[k][0] > start:
+                    runs.append(range(start, theirs[k][0]))
+                start = max(start, theirs[k][1])
+                k += 1
+            if start < stop:
+                runs.append(range(start, stop))
+
+        return TimeSet(runs)
+
+
+def _label_array(labels):
+    """numpy array of the labels: int or str dtype if possible, object otherwise"""
+    if isinstance(labels, TimeSet):
+        return labels.to_array()
+
+    labels = list(labels)
+    if all(isinstance(label, (int, np.integer)) and not isinstance(label, bool) for label in labels):
+        return np.array(labels, dtype=np.int64)
+    if all(isinstance(label, str) for label in labels):
+        return np.array(labels, dtype=str)
+
+    array = np.empty(len(labels), dtype=object)
+    array[:] = labels
+    return array
+
+
+class IndexSet:
+    """Labels of a set interned to contiguous integer codes
+
+    Labels (years, time slices, cluster or region names) are stored once in a
+    numpy array and the code of every label is its position. Single labels are
+    found with a dict lookup and arrays of labels with a binary search over
+    the sorted labels, so building arrays from labelled data never iterates
+    over the labels in Python.
+
+    Parameters
+    ----------
+    labels : iterable
+        unique labels in the order of their codes (TimeSet, list, numpy.ndarray)
+
+    Raises
+    ------
+    ValueError
+        if labels are not unique
+    """
+
+    __slots__ = ("labels", "_codes", "_sorter")
+
+    def __init__(self, labels=()):
+        if isinstance(labels, IndexSet):
+            labels = labels.labels
+
+        self.labels = _label_array(labels) if not isinstance(labels, np.ndarray) else labels
+        self._codes = {label: code for code, label in enumerate(self.labels.tolist())}
+        if len(self._codes) != len(self.labels):
+            raise ValueError("labels of an IndexSet should be unique.")
+
+        # binary search is only possible for labels with a total order
+        self._sorter = None if self.labels.dtype == object else np.argsort(self.labels, kind="stable")
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __iter__(self):
+        return iter(self.labels.tolist())
+
+    def __contains__(self, label):
+        try:
+            return label in self._codes
+        except TypeError:
+            return False
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.labels[index].item() if self.labels.dtype != object else self.labels[index]
+
+        return IndexSet(self.labels[index])
+
+    def __eq__(self, other):
+        if isinstance(other, IndexSet):
+            other = other.labels
+        elif isinstance(other, (list, tuple, range, TimeSet)):
+            other = _label_array(other)
+        else:
+            return NotImplemented
+
+        return len(self.labels) == len(other) and bool(np.all(self.labels == other))
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"IndexSet({self.labels.tolist()})"
+
+    @property
+    def codes(self):
+        """Codes of the labels (0, 1, ..., len - 1)"""
+        return np.arange(len(self.labels))
+
+    def to_list(self):
+        """Labels as a list"""
+        return self.labels.tolist()
+
+    def code(self, label):
+        """Returns the code of a label
+
+        Parameters
+        ----------
+        label : int, str
+
+        Returns
+        -------
+        int
+
+        Raises
+        ------
+        KeyError
+            if the label does not exist
+        """
+        try:
+            return self._codes[label]
+        except (KeyError, TypeError):
+            raise KeyError(f"{label} is not a label of the set.") from None
+
+    def codes_of(self, labels):
+        """Returns the codes of an array of labels
+
+        Parameters
+        ----------
+        labels : array-like
+
+        Returns
+        -------
+        numpy.ndarray
+            codes of the labels, -1 for labels that do not exist
+        """
+        if isinstance(labels, (list, tuple)):
+            # np.asarray would convert mixed int/str labels into str
+            labels = _label_array(labels)
+        labels = np.asarray(labels)
+        if labels.dtype == object and self._sorter is not None:
+            # e.g. str columns of pandas
+            converted = _label_array(labels.ravel().tolist()).reshape(labels.shape)
+            labels = converted if converted.dtype != object else labels
+
+        comparable = self._sorter is not None and (
+            labels.dtype.kind == self.labels.dtype.kind
+            or (labels.dtype.kind in "iu" and self.labels.dtype.kind in "iu")
+        )
+        if not comparable:
+            codes = np.fromiter(
+                (self._codes.get(label, -1) if label.__hash__ else -1 for label in labels.ravel().tolist()),
+                dtype=np.int64,
+                count=labels.size,
+            )
+            return codes.reshape(labels.shape)
+
+        if not len(self.labels):
+            return np.full(labels.shape, -1, dtype=np.int64)
+
+        sorted_labels = self.labels[self._sorter]
+        positions = np.searchsorted(sorted_labels, labels)
+        positions = np.minimum(positions, len(self.labels) - 1)
+        found = sorted_labels[positions] == labels
+
+        return np.where(found, self._sorter[positions], -1)
+
+    def take(self, codes):
+        """Returns the labels of the codes as a numpy array
+
+        Parameters
+        ----------
+        codes : array-like
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        return self.labels[np.asarray(codes)]
+
+    def product(self, *others):
+        """Cartesian product of the sets (without materializing the tuples)
+
+        Parameters
+        ----------
+        *others : IndexSet
+
+        Returns
+        -------
+        ProductIndex
+        """
+        return ProductIndex(self, *others)
+
+
+class ProductIndex:
+    """Cartesian product of IndexSets in row-major (C) order
+
+    Positions in the product are computed from the codes of every set, and the
+    labels of any position (or slice of positions) are computed on demand, so
+    the tuples of the product are never materialized.
+
+    Parameters
+    ----------
+    *sets : IndexSet
+    """
+
+    __slots__ = ("sets",)
+
+    def __init__(self, *sets):
+        self.sets = tuple(sets)
+
+    @property
+    def shape(self):
+        return tuple(len(index_set) for index_set in self.sets)
+
+    def __len__(self):
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    def position(self, *labels):
+        """Returns the position of a tuple of labels in the product
+
+        Raises
+        ------
+        KeyError
+            if a label does not exist
+        """
+        return int(
+            np.ravel_multi_index(
+                [index_set.code(label) for index_set, label in zip(self.sets, labels)],
+                self.shape,
+            )
+        )
+
+    def positions(self, *labels):
+        """Returns the positions of arrays of labels (one array per set)
+
+        Returns
+        -------
+        numpy.ndarray
+            positions in the product, -1 if any of the labels does not exist
+        """
+        codes = [index_set.codes_of(values) for index_set, values in zip(self.sets, labels)]
+        codes = np.broadcast_arrays(*codes)
+        valid = np.logical_and.reduce([code >= 0 for code in codes])
+        positions = np.full(codes[0].shape, -1, dtype=np.int64)
+        positions[valid] = np.ravel_multi_index([code[valid] for code in codes], self.shape)
+
+        return positions
+
+    def codes(self, positions=None):
+        """Codes of every set for the given positions
+
+        Parameters
+        ----------
+        positions : int, slice, array-like, optional
+            positions in the product, by default None (all the positions)
+
+        Returns
+        -------
+        tuple
+            numpy.ndarray of codes for every set
+        """
+        if positions is None:
+            positions = slice(None)
+        if isinstance(positions, slice):
+            positions = np.arange(*positions.indices(len(self)))
+
+        return np.unravel_index(np.asarray(positions), self.shape)
+
+    def __getitem__(self, positions):
+        """Labels of the given positions as a tuple (of arrays for slices/arrays)"""
+        codes = self.codes(positions)
+        if np.ndim(codes[0]) == 0:
+            return tuple(index_set[int(code)] for index_set, code in zip(self.sets, codes))
+
+        return tuple(index_set.take(code) for index_set, code in zip(self.sets, codes))
@@ -0,0 +1,205 @@
+"""
+Discovery of the installed solvers and their capabilities
+"""
+
+import threading
+from collections import namedtuple
+from importlib import metadata
+from hysut.utils.enums import LP, MILP, QP
+
+SolverInfo = namedtuple("SolverInfo", ["name", "version", "problem_classes"])
+
+# python package providing each solver (used for finding the version)
+SOLVER_PACKAGES = {
+    "CBC": "cylp",
+    "CLARABEL": "clarabel",
+    "COPT": "coptpy",
+    "CPLEX": "cplex",
+    "CVXOPT": "cvxopt",
+    "DAQP": "daqp",
+    "ECOS": "ecos",
+    "ECOS_BB": "ecos",
+    "GLPK": "cvxopt",
+    "GLPK_MI": "cvxopt",
+    "GUROBI": "gurobipy",
+    "HIGHS": "highspy",
+    "MOSEK": "Mosek",
+    "OSQP": "osqp",
+    "PIQP": "piqp",
+    "PROXQP": "proxsuite",
+    "SCIP": "PySCIPOpt",
+    "SCIPY": "scipy",
+    "SCS": "scs",
+    "XPRESS": "xpress",
+}
+
+# solvers in order of preference (fastest first) for every problem class
+SOLVER_PREFERENCE = {
+    LP: [
+        "GUROBI",
+        "CPLEX",
+        "XPRESS",
+        "MOSEK",
+        "COPT",
+        "HIGHS",
+        "CLARABEL",
+        "CBC",
+        "GLPK",
+        "SCIPY",
+        "ECOS",
+        "CVXOPT",
+        "SCS",
+        "OSQP",
+    ],
+    MILP: [
+        "GUROBI",
+        "CPLEX",
+        "XPRESS",
+        "MOSEK",
+        "COPT",
+        "HIGHS",
+        "SCIP",
+        "CBC",
+        "GLPK_MI",
+        "SCIPY",
+        "ECOS_BB",
+    ],
+    QP: [
+        "GUROBI",
+        "CPLEX",
+        "MOSEK",
+        "XPRESS",
+        "COPT",
+        "CLARABEL",
+        "OSQP",
+        "PIQP",
+        "HIGHS",
+        "ECOS",
+        "SCS",
+        "CVXOPT",
+    ],
+}
+
+# solvers that use the previous solution as the starting point of a re-solve
+WARM_START_SOLVERS = ["GUROBI", "CPLEX", "OSQP", "SCS"]
+
+
+def _solver_version(name):
+    try:
+        return metadata.version(SOLVER_PACKAGES[name])
+    except (KeyError, metadata.PackageNotFoundError):
+        return None
+
+
+class SolverRegistry:
+    """Process-wide record of the installed solvers
+
+    Solvers are probed through cvxpy only once (on first use) and the results
+    are shared by every caller until :meth:`invalidate` is called (e.g. after
+    installing a new solver).
+    """
+
+    def __init__(self):
+        self._solvers = None
+        self._lock = threading.Lock()
+
+    def _probe(self):
+        import cvxpy as cp
+        from cvxpy.reductions.solvers import defines
+
+        conic = getattr(defines, "SOLVER_MAP_CONIC", {})
+        qp_solvers = getattr(defines, "QP_SOLVERS", [])
+        mi_solvers = getattr(defines, "MI_SOLVERS", [])
+
+        solvers = {}
+        for name in cp.installed_solvers():
+            problem_classes = [LP]
+            supported = getattr(conic.get(name), "SUPPORTED_CONSTRAINTS", [])
+            if name in qp_solvers or cp.SOC in supported:
+                problem_classes.append(QP)
+            if name in mi_solvers:
+                problem_classes.append(MILP)
+
+            solvers[name] = SolverInfo(name, _solver_version(name), problem_classes)
+
+        return solvers
+
+    @property
+    def solvers(self):
+        """dict of SolverInfo for every installed solver"""
+        with self._lock:
+            if self._solvers is None:
+                self._solvers = self._probe()
+            return self._solvers
+
+    def invalidate(self):
+        """Forgets the probed solvers so that they are probed again on next use"""
+        with self._lock:
+            self._solvers = None
+
+    def installed(self):
+        """Returns the name of the installed solvers
+
+        Returns
+        -------
+        list
+        """
+        return list(self.solvers)
+
+    def supports(self, solver, problem_class):
+        """Checks if a solver is installed and can solve the problem class
+
+        Parameters
+        ----------
+        solver : str
+            name of the solver
+        problem_class : str
+            LP, MILP or QP
+
+        Returns
+        -------
+        bool
+        """
+        info = self.solvers.get(solver)
+        return info is not None and problem_class in info.problem_classes
+
+    def warm_start(self, solver):
+        """Checks if a solver is installed and supports warm start
+
+        Parameters
+        ----------
+        solver : str
+            name of the solver
+
+        Returns
+        -------
+        bool
+        """
+        return solver in WARM_START_SOLVERS and solver in self.solvers
+
+    def best(self, problem_class):
+        """Returns the fastest installed solver for the problem class
+
+        Parameters
+        ----------
+        problem_class : str
+            LP, MILP or QP
+
+        Returns
+        -------
+        str, None
+            name of the solver or None if no capable solver is installed
+        """
+        for solver in SOLVER_PREFERENCE.get(problem_class, []):
+            if self.supports(solver, problem_class):
+                return solver
+
+        # solvers that are not ranked
+        for solver in self.solvers:
+            if self.supports(solver, problem_class):
+                return solver
+
+        return None
+
+
+SOLVER_REGISTRY = SolverRegistry()
@@ -1,4 +1,15 @@
-from tabulate import tabulate
+import copy
+import re
+from functools import lru_cache
+
+import numpy as np
+from hysut.utils.sets import TimeSet
+
+RANGE_CACHE_SIZE = 4096
+
+_RANGE_PATTERN = re.compile(r"^(range|irange)\((.*)\)$")
+_INT_PATTERN = re.compile(r"^[+-]?\d+(_\d+)*$")
+_NAME_PATTERN = re.compile(r"^[A-Za-z_]\w*$")
 
 
 def type_consistency_check(data_list, item=None):
@@ -23,8 +34,103 @@ def type_consistency_check(data_list, item=None):
     return []
 
 
+def _parse_range_argument(argument):
+    """Converts a single argument of a range expression into an int
+
+    Parameters
+    ----------
+    argument : str
+        the argument with no whitespace
+
+    Returns
+    -------
+    int
+
+    Raises
+    ------
+    TypeError
+        if the argument is a valid literal but not an integer
+    ValueError
+        if the argument is not a valid literal
+    """
+    if _INT_PATTERN.match(argument):
+        return int(argument)
+
+    if argument[:1] in ["'", '"'] and argument[-1:] == argument[:1]:
+        raise TypeError("'str' object cannot be interpreted as an integer")
+
+    try:
+        float(argument)
+    except ValueError:
+        if _NAME_PATTERN.match(argument):
+            raise ValueError(f"name '{argument}' is not defined")
+        raise ValueError("invalid syntax")
+
+    raise TypeError("'float' object cannot be interpreted as an integer")
+
+
+@lru_cache(maxsize=RANGE_CACHE_SIZE)
+def parse_range(expression):
+    """Parses a range expression without evaluating it
+
+    Supported expressions are ``range(stop)``, ``range(start, stop[, step])`` with
+    the same semantics as python range and ``irange(...)`` which includes the stop
+    value (e.g. ``irange(2020, 2050, 5)`` ends at 2050). Results are memoized on
+    the normalized expression (whitespace removed).
+
+    Parameters
+    ----------
+    expression : str
+        str resembling the range function
+
+    Returns
+    -------
+    tuple
+        (TimeSet of the values, tuple of error messages)
+    """
+    normalized = "".join(expression.split())
+    if normalized != expression:
+        return parse_range(normalized)
+
+    match = _RANGE_PATTERN.match(normalized)
+    if match is None:
+        return TimeSet(), ("invalid syntax",)
+
+    function, arguments = match.groups()
+    arguments = arguments.split(",") if arguments else []
+    if len(arguments) > 1 and arguments[-1] == "":
+        arguments = arguments[:-1]
+
+    if not arguments:
+        return TimeSet(), (f"{function} expected at least 1 argument, got 0",)
+
+    if len(arguments) > 3:
+        return (
+            TimeSet(),
+            (f"{function} expected at most 3 arguments, got {len(arguments)}",),
+        )
+
+    try:
+        arguments = [_parse_range_argument(argument) for argument in arguments]
+    except (TypeError, ValueError) as error:
+        return TimeSet(), error.args
+
+    if len(arguments) == 1:
+        arguments = [0, *arguments]
+
+    start, stop, step = (*arguments, 1) if len(arguments) == 2 else arguments
+
+    if step == 0:
+        return TimeSet(), (f"{function}() arg 3 must not be zero",)
+
+    if function == "irange":
+        stop += 1 if step > 0 else -1
+
+    return TimeSet([range(start, stop, step)]), ()
+
+
 def read_range_function(range_data, item):
-    """Reads the range function in data and create a list for the given range
+    """Reads the range function in data and create a TimeSet for the given range
 
     Parameters
     ----------
@@ -36,19 +142,112 @@ def read_range_function(range_data, item):
     Returns
     -------
     dict
-        retuning the dat and errors in a dict
+        retuning the data (as a TimeSet) and errors in a dict
     """
-    data = []
-    errors = []
-
-    try:
-        data = list(eval(range_data))
-    except Exception as error:
-        errors = [f"{arg} in 'range' for '{item}'." for arg in error.args]
+    data, errors = parse_range(range_data)
+    errors = [f"{arg} in 'range' for '{item}'." for arg in errors]
 
     return {"data": data, "error": errors}
 
 
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"'{type(self).__name__}' object cannot be modified.")
+
+
+class FrozenDict(dict):
+    """dict that cannot be modified, used to share config sections and
+    validation results without copying (copies are plain dicts)"""
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(item, memo) for key, item in self.items()}
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+class FrozenList(list):
+    """list that cannot be modified (copies are plain lists)"""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(item, memo) for item in self]
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+def freeze(value):
+    """Read-only version of a nested value
+
+    dicts and lists are converted to FrozenDict and FrozenList, arrays to
+    read-only views and objects with a read_only method (e.g. ClusterIndex) to
+    its result. TimeSets are immutable already.
+    """
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if hasattr(value, "read_only"):
+        return value.read_only()
+
+    return value
+
+
+def _copy_containers(value):
+    """Copies nested dicts and lists, sharing every other object (e.g. arrays)"""
+    if isinstance(value, dict):
+        return {key: _copy_containers(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_containers(item) for item in value]
+
+    return value
+
+
+def copy_config(model_config, mutable_sections):
+    """Creates a copy of the model_config in which only the sections that can
+    be modified are copied
+
+    Sections listed in mutable_sections are copied (dicts and lists only, other
+    objects like arrays are shared) while the rest of the sections are shared
+    frozen (see freeze): nested dicts and lists become read-only without
+    copying their items and arrays become read-only views of the given ones.
+
+    Parameters
+    ----------
+    model_config : dict
+        the model_config given by the user
+    mutable_sections : list
+        name of the sections that are modified during validation
+
+    Returns
+    -------
+    dict
+    """
+    config = {}
+    for section, value in model_config.items():
+        if section in mutable_sections:
+            config[section] = _copy_containers(value)
+        else:
+            config[section] = freeze(value)
+
+    return config
+
+
 def print_log(logs, save_file=None):
     """Make a tabular log file to print as a string/ save in a file
 
@@ -65,6 +264,8 @@ def print_log(logs, save_file=None):
         tablulated log
     """
 
+    from tabulate import tabulate
+
     table = [[i + 1, logs[i]] for i in range(len(logs))]
     table = tabulate(table, headers=["Number", "Error/Warning"], tablefmt="pretty")
 
@@ -0,0 +1,73 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pandas as pd
+import pytest
+from hysut.preprocess.aggregation import aggregate_time_slices
+from hysut.utils.enums import KMEANS, KMEDOIDS
+
+
+def make_profiles(n_days=60):
+    """Two kinds of days (sunny and cloudy) with small noise"""
+    rng = np.random.default_rng(1)
+    hours = np.arange(24)
+    sunny = np.clip(np.sin((hours - 6) / 12 * np.pi), 0, None)
+    cloudy = 0.2 * sunny
+    kinds = rng.integers(2, size=n_days)
+    solar = np.where(kinds[:, None] == 0, sunny, cloudy).ravel()
+    demand = 100 + 10 * np.tile(np.cos(hours / 24 * 2 * np.pi), n_days)
+
+    return pd.DataFrame({"solar": solar, "demand": demand}), kinds
+
+
+@pytest.mark.parametrize("method", [KMEANS, KMEDOIDS])
+def test_aggregate_time_slices(method):
+
+    profiles, kinds = make_profiles()
+    output = aggregate_time_slices(profiles, n_representatives=2, method=method)
+
+    assert output["errors"] == []
+    assert output["time_slices"] == list(range(1, 49))
+
+    # every hour is represented once
+    assert output["weights"].sum() == len(profiles)
+    assert output["mapping"].shape == (len(profiles),)
+    assert output["mapping"].min() == 1 and output["mapping"].max() == 48
+
+    # the two kinds of days are recovered exactly
+    assert output["error_report"]["max_error"]["solar"] == pytest.approx(0)
+    assert output["error_report"]["rmse"]["demand"] == pytest.approx(0)
+    assert sorted(output["weights"][::24]) == sorted(np.bincount(kinds))
+
+
+def test_aggregate_time_slices_errors():
+
+    profiles = np.ones(30)
+    assert aggregate_time_slices(profiles, 2)["errors"] == [
+        "number of hours (30) is not a multiple of period_length (24)."
+    ]
+
+    output = aggregate_time_slices(np.ones(48), 2, method="dummy")
+    assert output["errors"] == [
+        f"dummy is not a valid aggregation method. Valid methods are {[KMEANS, KMEDOIDS]}."
+    ]
+
+    # more representatives than days
+    output = aggregate_time_slices(np.arange(48), 5)
+    assert output["warnings"] == [
+        "n_representatives (5) is more than the number of periods (2). 2 representatives are used."
+    ]
+    assert output["error_report"]["rmse"][0] == pytest.approx(0)
+
+    for n_representatives, period_length in [(0, 24), (-1, 24), (1.5, 24), (2, 0)]:
+        output = aggregate_time_slices(np.ones(48), n_representatives, period_length=period_length)
+        assert len(output["errors"]) == 1
+        assert "should be a positive integer" in output["errors"][0]
+
+    assert aggregate_time_slices(np.ones(48), True, period_length=None)["errors"] == [
+        "n_representatives should be a positive integer, True is given.",
+        "period_length should be a positive integer, None is given.",
+    ]
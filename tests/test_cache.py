@@ -0,0 +1,189 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+from hysut.preprocess.cache import (
+    PreprocessCache,
+    SectionCache,
+    config_hash,
+    freeze,
+)
+from hysut.preprocess.database import ModelDataBase
+from hysut.utils.enums import (
+    ALL_PERIOD,
+    CLUSTERS,
+    RUN_PERIOD,
+    SETTINGS,
+    T_SLICE,
+    TIME_HORIZON,
+    TIME_SLICES,
+    YEAR,
+)
+from hysut.utils.sets import TimeSet
+from hysut.utils.tools import FrozenDict
+
+
+def test_config_hash(tmp_path):
+
+    model_config = {TIME_HORIZON: {RUN_PERIOD: [2020]}, "data": np.arange(5)}
+    key = config_hash(model_config)
+
+    # order of keys does not matter but content does
+    assert key == config_hash({"data": np.arange(5), TIME_HORIZON: {RUN_PERIOD: [2020]}})
+    assert key != config_hash({TIME_HORIZON: {RUN_PERIOD: [2020]}, "data": np.arange(6)})
+
+    file = tmp_path / "data.csv"
+    file.write_text("a")
+    key = config_hash(model_config, files=[str(file)])
+    file.write_text("ab")
+    assert key != config_hash(model_config, files=[str(file)])
+
+
+def test_preprocess_cache(tmp_path):
+
+    cache = PreprocessCache(str(tmp_path))
+    assert cache.load("key", "dummy") is None
+
+    cache.save("key", "dummy", {"years": TimeSet([range(2020, 2030)])}, {"a": np.ones(3)})
+    data, arrays = cache.load("key", "dummy")
+
+    assert data["years"] == list(range(2020, 2030))
+    assert isinstance(arrays["a"], np.memmap)
+
+    cache.clear()
+    assert cache.load("key", "dummy") is None
+
+
+def test_database_cache(tmp_path, monkeypatch):
+
+    model_config = {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2025)"]},
+        TIME_SLICES: {T_SLICE: "range(1,25)"},
+        CLUSTERS: {"cls1": [2020, 2021]},
+        SETTINGS: {"log_path": str(tmp_path), "cache_path": str(tmp_path / "cache")},
+    }
+    first = ModelDataBase(model_config)
+    first.validate()
+
+    table = pd.DataFrame({YEAR: range(2020, 2025), "north": np.arange(5.0)})
+    table.to_csv(tmp_path / "cost.csv", index=False)
+    first.read_input_data(str(tmp_path / "cost.csv"))
+
+    # second model is loaded from the cache without running the validation
+    second = ModelDataBase(model_config)
+    monkeypatch.setattr(second.pipeline, "run", None)
+    second.validate()
+    monkeypatch.setattr("hysut.preprocess.database.read_parameter", None)
+    second.read_input_data(str(tmp_path / "cost.csv"))
+
+    assert second.years[ALL_PERIOD] == first.years[ALL_PERIOD]
+    assert second.time_slices == first.time_slices
+    assert second.clusters == first.clusters
+    assert second.cluster_index.cluster_of(2021) == "cls1"
+    assert second.model_config[SETTINGS] == first.model_config[SETTINGS]
+    assert isinstance(second.input_data["cost"]["values"], np.memmap)
+    assert np.array_equal(
+        second.input_data["cost"]["values"], first.input_data["cost"]["values"]
+    )
+
+
+def test_update_after_cache_hit(tmp_path, monkeypatch):
+
+    model_config = {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2025)"]},
+        TIME_SLICES: {T_SLICE: "range(1,25)"},
+        CLUSTERS: {"cls1": [2020, 2021]},
+        SETTINGS: {"log_path": str(tmp_path), "cache_path": str(tmp_path / "cache")},
+    }
+    ModelDataBase(model_config).validate()
+
+    database = ModelDataBase(model_config)
+    database.validate()
+    assert set(database.stage_results) == set(database.pipeline.stages)
+
+    # only the changed section is validated again
+    assert database.update({CLUSTERS: {"cls1": [2024]}}) == [CLUSTERS]
+    assert database.errors == []
+    assert database.cluster_index.cluster_of(2024) == "cls1"
+    assert database.time_slices[T_SLICE] == list(range(1, 25))
+
+
+def test_section_cache():
+
+    cache = SectionCache(maxsize=2)
+    calls = []
+
+    def validate(value):
+        calls.append(value)
+        return {"errors": [], "values": [value], "array": np.arange(3)}
+
+    first = cache.get("section", {"a": [1]}, lambda: validate(1))
+    assert cache.get("section", {"a": [1]}, lambda: validate(1)) is first
+    assert calls == [1]
+    assert cache.info() == (1, 1, 2, 1)
+
+    # the namespace and the dependencies are part of the key
+    cache.get("other", {"a": [1]}, lambda: validate(2))
+    cache.get("other", {"a": [1]}, lambda: validate(3), depends_on=TimeSet([range(2020, 2030)]))
+    assert calls == [1, 2, 3]
+
+    # least recently used entries are dropped
+    assert cache.info().currsize == 2
+    cache.get("section", {"a": [1]}, lambda: validate(4))
+    assert calls == [1, 2, 3, 4]
+
+    # results are read-only, copies are not
+    assert isinstance(first, FrozenDict)
+    with pytest.raises(TypeError):
+        first["errors"].append("error")
+    with pytest.raises(TypeError):
+        first["new"] = 1
+    with pytest.raises(ValueError):
+        first["array"][0] = 1
+
+    mutable = copy.deepcopy(first)
+    mutable["values"].append(2)
+    assert type(mutable) is dict and first["values"] == [1]
+
+    cache.clear()
+    assert cache.info() == (0, 0, 2, 0)
+    assert freeze((1, {"a": 2})) == [1, {"a": 2}]
+
+
+def test_database_section_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ModelDataBase, "section_cache", SectionCache())
+
+    model_config = {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2030)"]},
+        TIME_SLICES: {T_SLICE: ["Day", "Night"]},
+        CLUSTERS: {"cls1": "range(2020,2025)"},
+        SETTINGS: {"log_path": str(tmp_path)},
+    }
+    first = ModelDataBase(model_config)
+    first.validate()
+    assert ModelDataBase.section_cache.info().misses == 3
+
+    second = ModelDataBase(model_config)
+    second.validate()
+    assert ModelDataBase.section_cache.info().hits == 3
+    assert second.years is first.years
+    assert second.cluster_index is first.cluster_index
+    assert second.time_slices[T_SLICE] == ["Day", "Night"]
+
+    # validated again with the same (raw) sections
+    second.validate()
+    assert ModelDataBase.section_cache.info() == (6, 3, SectionCache().maxsize, 3)
+    assert second.model_config[TIME_SLICES] == {T_SLICE: ["Day", "Night"]}
+    assert isinstance(second.model_config[TIME_SLICES], FrozenDict)
+
+    # the given model_config is not modified, and changes are validated again
+    assert TIME_SLICES in model_config and model_config[TIME_SLICES] == {T_SLICE: ["Day", "Night"]}
+    second.update({CLUSTERS: {"cls1": [2029]}})
+    assert second.cluster_index.cluster_of(2029) == "cls1"
+    assert first.cluster_index.cluster_of(2029) is None
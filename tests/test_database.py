@@ -8,7 +8,21 @@ sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
 from hysut.preprocess.database import ModelDataBase
 from hysut.utils.defaults import ModelSettings
-from hysut.utils.enums import SETTINGS
+from hysut.utils.enums import (
+    ALL_PERIOD,
+    CLUSTERS,
+    HIGHS,
+    REGIONS,
+    RUN_PERIOD,
+    SETTINGS,
+    SPARSE,
+    T_SLICE,
+    TIME_HORIZON,
+    TIME_SLICES,
+    WARM_PERIOD,
+    YEAR,
+)
+from hysut.exceptions_logging.exceptions import ConfigValidationError
 
 def test_model_settings():
     settings = ModelSettings()
@@ -19,3 +33,122 @@ def test_model_settings():
 
     for item in settings.KEYS:
         assert test.model_config[SETTINGS][item] == getattr(settings, item)
+
+    # the sparse backend solves with HiGHS
+    test = ModelDataBase({SETTINGS: {"backend": SPARSE}})
+    test._check_model_settings()
+    assert test.model_config[SETTINGS]["solver"] == HIGHS
+    assert test.warnings == []
+
+    test = ModelDataBase({SETTINGS: {"backend": SPARSE, "solver": "SCS"}})
+    test._check_model_settings()
+    assert test.model_config[SETTINGS]["solver"] == HIGHS
+    assert test.warnings == [f"SCS cannot be used by the {SPARSE} backend. {HIGHS} is used."]
+
+
+def test_validate(tmp_path):
+
+    model_config = {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2030)"]},
+        TIME_SLICES: {T_SLICE: "range(1,25)"},
+        CLUSTERS: {"cls1": "range(2020,2025)"},
+        SETTINGS: {"log_path": str(tmp_path)},
+    }
+    test = ModelDataBase(model_config)
+    test.validate()
+
+    assert test.errors == []
+    assert test.years[ALL_PERIOD] == list(range(2020, 2030))
+    assert test.time_slices[T_SLICE] == list(range(1, 25))
+    assert test.cluster_index.cluster_of(2021) == "cls1"
+
+    # sets are interned to integer codes
+    assert test.index_sets[YEAR].code(2025) == 5
+    assert test.index_sets[TIME_SLICES].codes_of([24, 1, 25]).tolist() == [23, 0, -1]
+    assert test.index_sets[CLUSTERS] == ["cls1"]
+    assert len(test.index_sets[REGIONS]) == 1
+
+    # errors in multiple sections are collected and logged
+    model_config[TIME_SLICES] = {T_SLICE: [1, 1]}
+    model_config[CLUSTERS] = {"cls1": [2019]}
+    test = ModelDataBase(model_config)
+
+    with pytest.raises(ConfigValidationError):
+        test.validate(max_workers=2)
+
+    assert test.errors == [
+        "duplicate values are not allowed in 'time_slices'.",
+        "cluster 'cls1' has years (2019) that are not valid years.",
+    ]
+    assert os.path.exists(tmp_path / "error_log.txt")
+    assert test.log_counts["error"] == {TIME_SLICES: 1, CLUSTERS: 1}
+    with open(tmp_path / "log.jsonl") as file:
+        assert len(file.readlines()) == 2
+
+    # cluster years that are not integers are reported, not raised
+    config = {**model_config, CLUSTERS: {"cls1": ["x"]}, TIME_SLICES: {T_SLICE: [1, 2]}}
+    test = ModelDataBase(config)
+
+    with pytest.raises(ConfigValidationError):
+        test.validate()
+
+    assert test.errors == ["cluster 'cls1' can only contain integers as years."]
+
+    # clusters are not validated if the time_horizon has errors
+    model_config[TIME_HORIZON][WARM_PERIOD] = [2025]
+    test = ModelDataBase(model_config)
+
+    with pytest.raises(ConfigValidationError):
+        test.validate(fail_fast=True, max_workers=1)
+
+    assert len(test.errors) == 1
+    assert "have following intersections" in test.errors[0]
+
+
+def test_update(tmp_path):
+
+    model_config = {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2030)"]},
+        TIME_SLICES: {T_SLICE: "range(1,25)"},
+        CLUSTERS: {"cls1": "range(2020,2025)"},
+        SETTINGS: {"log_path": str(tmp_path), "solver": "dummy"},
+    }
+    test = ModelDataBase(model_config)
+    test.validate()
+    settings_warnings = list(test.stage_results[SETTINGS]["warnings"])
+    assert settings_warnings
+
+    # only the changed section is validated, warnings of the others are kept
+    assert test.update({CLUSTERS: {"cls1": [2029]}}) == [CLUSTERS]
+    assert test.cluster_index.cluster_of(2029) == "cls1"
+    assert test.cluster_index.cluster_of(2021) is None
+    assert settings_warnings[0] in test.warnings
+
+    # dependent stages are validated again
+    with pytest.raises(ConfigValidationError):
+        test.update({TIME_HORIZON: {RUN_PERIOD: ["range(2020,2025)"]}})
+    assert test.errors == ["cluster 'cls1' has years (2029) that are not valid years."]
+    assert test.years[ALL_PERIOD] == list(range(2020, 2025))
+
+    assert test.update({CLUSTERS: {"cls1": [2024]}}) == [CLUSTERS]
+    assert test.errors == []
+    assert len(test.index_sets[YEAR]) == 5
+
+
+def test_validate_range_slices_again(tmp_path):
+
+    model_config = {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2025)"]},
+        TIME_SLICES: {T_SLICE: "range(1,5)"},
+        SETTINGS: {"log_path": str(tmp_path)},
+    }
+    test = ModelDataBase(model_config)
+    test.validate()
+    test.validate()
+    assert test.errors == []
+    assert test.time_slices[T_SLICE] == [1, 2, 3, 4]
+
+    # the section after validation is a valid definition as well
+    assert test.update({TIME_SLICES: test.model_config[TIME_SLICES]}) == [TIME_SLICES]
+    assert test.update({TIME_SLICES: {T_SLICE: test.time_slices[T_SLICE]}}) == [TIME_SLICES]
+    assert test.index_sets[TIME_SLICES] == [1, 2, 3, 4]
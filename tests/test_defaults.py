@@ -4,8 +4,11 @@ import pytest
 
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
+import cvxpy
 from cvxpy import installed_solvers
 from hysut.utils.defaults import ModelSettings
+from hysut.utils.enums import LP, MILP, QP
+from hysut.utils.solvers import SOLVER_REGISTRY
 
 
 def test_ModelSettings():
@@ -31,3 +34,49 @@ def test_ModelSettings():
             f"log_path should be str. Default log_path ({settings.log_path}) is used."
         ],
     }
+
+
+def test_solver_registry(monkeypatch):
+
+    calls = []
+    original = cvxpy.installed_solvers
+
+    def counted_installed_solvers():
+        calls.append(1)
+        return original()
+
+    monkeypatch.setattr(cvxpy, "installed_solvers", counted_installed_solvers)
+    SOLVER_REGISTRY.invalidate()
+
+    # solvers are probed only once for all the instances
+    for _ in range(3):
+        settings = ModelSettings()
+        settings.validate_solver(settings.solver)
+    assert len(calls) == 1
+
+    SOLVER_REGISTRY.invalidate()
+    SOLVER_REGISTRY.installed()
+    assert len(calls) == 2
+
+    for name, info in SOLVER_REGISTRY.solvers.items():
+        assert info.name == name
+        assert LP in info.problem_classes
+
+    # default solver is capable of the problem class
+    settings = ModelSettings()
+    for problem_class in [LP, QP]:
+        settings.validate_problem_class(problem_class)
+        assert SOLVER_REGISTRY.supports(settings.solver, problem_class)
+
+
+def test_problem_class():
+
+    settings = ModelSettings()
+    assert settings.validate_problem_class("milp") == {"warning": [], "value": MILP}
+    assert settings.problem_class == MILP
+
+    output = settings.validate_problem_class("dummy")
+    assert output == {
+        "warning": [f"dummy is not a valid problem_class. Default problem_class ({LP}) is used."],
+        "value": LP,
+    }
@@ -0,0 +1,85 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pytest
+from hysut.interface.executor import (
+    TIMEOUT,
+    ScenarioExecutor,
+    SharedArrays,
+    join_model_data,
+    split_model_data,
+)
+from hysut.mathematical_model.cvxpy.scenarios import ScenarioRunner
+from hysut.preprocess.database import ModelDataBase
+from hysut.utils.enums import (
+    COMMODITIES,
+    RUN_PERIOD,
+    SETTINGS,
+    T_SLICE,
+    TECHNOLOGIES,
+    TIME_HORIZON,
+    TIME_SLICES,
+)
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = ModelDataBase(
+        {
+            TIME_HORIZON: {RUN_PERIOD: ["range(2020,2023)"]},
+            TIME_SLICES: {T_SLICE: "range(1,5)"},
+            SETTINGS: {"log_path": str(tmp_path)},
+            COMMODITIES: {"electricity": {"demand": 10}},
+            TECHNOLOGIES: {
+                "wind": {"output": "electricity", "capacity_factor": 0.5, "investment_cost": 1},
+                "gas": {"output": "electricity", "investment_cost": 2, "variable_cost": 0.01},
+            },
+        }
+    )
+    database.validate()
+    return database
+
+
+def test_shared_model_data(database):
+    data = ScenarioExecutor(database).data
+    skeleton, arrays = split_model_data(data)
+
+    # broadcast scalars are sent as single values
+    assert arrays["demand", "electricity"].size == 1
+
+    shared = SharedArrays(arrays)
+    try:
+        views = {key: SharedArrays.view(shared.memory, shared.layout, key) for key in shared.layout}
+        joined = join_model_data(skeleton, views)
+        for key, value in data.coefficients().items():
+            assert np.array_equal(joined.coefficients()[key], value)
+        del views, joined
+    finally:
+        shared.close()
+
+
+def test_scenario_executor(database):
+    scenarios = {
+        "base": {},
+        "cheap_wind": {"investment_cost": {"wind": 0.1}},
+        "high_demand": {"demand": {"electricity": 20}},
+    }
+    # workers are spawned, they map the arrays of the shared memory block
+    executor = ScenarioExecutor(database, max_workers=2, context="spawn")
+    assert ScenarioExecutor(database).context.get_start_method() == "spawn"
+    results = dict(executor.run(scenarios))
+
+    runner = ScenarioRunner(ScenarioExecutor(database).data)
+    for name, changes in scenarios.items():
+        assert results[name]["objective"] == pytest.approx(runner.solve(changes)["objective"], rel=1e-5)
+
+    # invalid changes do not stop the other scenarios
+    results = dict(ScenarioExecutor(database, max_workers=1).run([{"demand": {"heat": 1}}, {}]))
+    assert results[0]["status"] == "error"
+    assert results[1]["status"] == "optimal"
+
+    results = dict(ScenarioExecutor(database, max_workers=1, timeout=1e-4).run([{}, {}]))
+    assert [result["status"] for result in results.values()] == [TIMEOUT, TIMEOUT]
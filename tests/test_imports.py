@@ -0,0 +1,43 @@
+import sys
+import os
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# import time budget (seconds) for the modules used in config validation
+IMPORT_BUDGET = 1.0
+
+# heavy packages that should only be imported when they are used
+LAZY_PACKAGES = ["cvxpy", "pandas", "tabulate"]
+
+
+def import_in_subprocess(module):
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(name for name in {LAZY_PACKAGES} if name in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split("\n")
+
+    return float(output[0]), output[1]
+
+
+def test_lazy_imports():
+
+    for module in [
+        "hysut.preprocess.time",
+        "hysut.preprocess.clusters",
+        "hysut.preprocess.database",
+    ]:
+        elapsed, loaded = import_in_subprocess(module)
+
+        assert loaded == ""
+        assert elapsed < IMPORT_BUDGET
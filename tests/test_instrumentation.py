@@ -0,0 +1,149 @@
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pstats
+import threading
+import tracemalloc
+
+from hysut.mathematical_model.cvxpy.model import CvxpyModel
+from hysut.mathematical_model.utils.data import ModelData
+from hysut.preprocess.database import ModelDataBase
+from hysut.utils.enums import (
+    COMMODITIES,
+    CPROFILE,
+    RUN_PERIOD,
+    SETTINGS,
+    T_SLICE,
+    TECHNOLOGIES,
+    TIME_HORIZON,
+    TIME_SLICES,
+    TIMERS,
+    TRACEMALLOC,
+)
+from hysut.utils.instrumentation import (
+    NULL_SECTION,
+    Profiler,
+    active_profiler,
+    section,
+    timed,
+)
+
+
+def test_profiler():
+
+    @timed("double")
+    def double(value):
+        return 2 * value
+
+    # nothing is recorded without an active profiler
+    assert section("idle") is NULL_SECTION
+    assert double(2) == 4
+
+    profiler = Profiler(TIMERS)
+    with profiler.activate():
+        assert active_profiler() is profiler
+        with section("outer"):
+            with section("inner"):
+                double(1)
+            double(2)
+        profiler.record("solver", 0.5)
+    assert active_profiler() is None
+
+    report = profiler.report()
+    assert report["mode"] == TIMERS
+    assert [item["name"] for item in report["sections"]] == ["double", "inner", "outer", "solver"]
+    sections = {item["name"]: item for item in report["sections"]}
+    assert sections["double"]["calls"] == 2
+    assert sections["outer"]["time"] >= sections["inner"]["time"]
+    assert sections["solver"]["time"] == 0.5
+
+    # disabled profiler
+    with Profiler(None).activate():
+        assert active_profiler() is None
+
+    with pytest.raises(ValueError):
+        Profiler("dummy")
+
+
+def test_concurrent_activations():
+
+    timers = Profiler(TIMERS)
+    disabled = Profiler(None)
+    activated = threading.Barrier(2)
+    deactivated = threading.Barrier(2)
+    active = {}
+
+    def run(profiler, name):
+        with profiler.activate():
+            activated.wait()
+            # the activation of the other thread does not replace this one
+            active[name] = active_profiler()
+            with section(name):
+                pass
+            deactivated.wait()
+        active[name, "after"] = active_profiler()
+
+    threads = [
+        threading.Thread(target=run, args=(timers, "timers")),
+        threading.Thread(target=run, args=(disabled, "disabled")),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert active == {
+        "timers": timers,
+        "disabled": None,
+        ("timers", "after"): None,
+        ("disabled", "after"): None,
+    }
+    assert [item["name"] for item in timers.report()["sections"]] == ["timers"]
+    assert active_profiler() is None
+
+
+def model_config(tmp_path, profiling):
+    return {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2022)"]},
+        TIME_SLICES: {T_SLICE: [1, 2]},
+        SETTINGS: {"log_path": str(tmp_path), "profiling": profiling},
+        COMMODITIES: {"electricity": {"demand": 10}},
+        TECHNOLOGIES: {"gas": {"output": "electricity", "variable_cost": 1}},
+    }
+
+
+def test_database_profiling(tmp_path):
+
+    database = ModelDataBase(model_config(tmp_path, CPROFILE))
+    database.validate(max_workers=2)
+    assert database.profiler.mode == CPROFILE
+
+    # model building and solving are recorded while the profiler is active
+    with database.profiler.activate():
+        model = CvxpyModel(ModelData.from_database(database))
+        model.solve()
+
+    names = [item["name"] for item in database.profiler.report()["sections"]]
+    for name in ["validation", f"validation.{TIME_HORIZON}", "model.data", "model.build", "model.solve"]:
+        assert name in names
+
+    assert os.path.exists(tmp_path / "profile.json")
+    stats = pstats.Stats(str(tmp_path / "profile.prof"))
+    assert any(function[2] == "check_time_horizon" for function in stats.stats)
+
+    # tracemalloc snapshot
+    database = ModelDataBase(model_config(tmp_path, TRACEMALLOC))
+    database.validate()
+    assert not tracemalloc.is_tracing()
+    assert database.profiler.snapshot is not None
+    assert os.path.exists(tmp_path / "memory.snapshot")
+
+    # invalid modes disable profiling
+    database = ModelDataBase(model_config(tmp_path / "disabled", "dummy"))
+    database.validate()
+    assert not database.profiler.enabled
+    assert any("not a valid profiling mode" in warning for warning in database.warnings)
+    assert not os.path.exists(tmp_path / "disabled" / "profile.json")
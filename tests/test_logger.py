@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hysut.exceptions_logging.logger import ERROR, WARNING, LogSink
+from hysut.preprocess.time import check_time_horizon, check_time_slices
+from hysut.utils.enums import RUN_PERIOD, T_SLICE, TIME_HORIZON, TIME_SLICES
+
+
+def test_log_sink(tmp_path):
+
+    path = tmp_path / "log.jsonl"
+    path.write_text(json.dumps({"level": ERROR, "message": "old run"}) + "\n")
+
+    with LogSink(str(path), buffer_size=2) as log:
+        log.extend(ERROR, ["e1", "e2", "e3"], "dummy")
+        log.warning("w1")
+
+        # records are written before the sink is closed
+        lines = path.read_text().splitlines()
+        assert len(lines) == 5
+        assert json.loads(lines[-1])["message"] == "w1"
+
+        # memory buffer is bounded but counts are complete
+        assert len(log.buffer) == 2
+        assert log.counts() == {ERROR: {"dummy": 3}, WARNING: {None: 1}}
+
+        # only the records of this sink are rendered
+        assert [record["message"] for record in log.records(ERROR)] == ["e1", "e2", "e3"]
+        table = log.table(level=ERROR, save_file=str(tmp_path / "error_log.txt"))
+        assert "e3" in table and "old run" not in table
+        assert (tmp_path / "error_log.txt").read_text() == table
+
+    # sinks sharing the same file
+    with LogSink(str(path)) as first, LogSink(str(path)) as second:
+        first.error("a1")
+        second.error("b1")
+        first.error("a2")
+
+        assert [record["message"] for record in first.records()] == ["a1", "a2"]
+        assert "b1" not in first.table()
+        assert [record["message"] for record in second.records()] == ["b1"]
+
+    # memory only sink
+    log = LogSink()
+    log.error("e1")
+    assert [record["message"] for record in log.records()] == ["e1"]
+
+
+def test_check_functions_log():
+
+    log = LogSink()
+    check_time_horizon({RUN_PERIOD: [2020], "dummy": [2021]}, log=log)
+    check_time_slices({T_SLICE: [1, 1]}, log=log)
+
+    assert log.counts() == {
+        ERROR: {TIME_SLICES: 1},
+        WARNING: {TIME_HORIZON: 1},
+    }
@@ -0,0 +1,301 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pandas as pd
+import pytest
+from hysut.mathematical_model.backends import create_model
+from hysut.mathematical_model.cvxpy.model import CvxpyModel, clustering_report
+from hysut.mathematical_model.cvxpy.rolling import RollingHorizon, horizon_windows
+from hysut.mathematical_model.cvxpy.scenarios import ScenarioRunner
+from hysut.mathematical_model.utils.data import ModelData
+from hysut.preprocess.database import ModelDataBase
+from hysut.preprocess.technologies import check_commodities, check_technologies
+from hysut.exceptions_logging.exceptions import InputDataError
+from hysut.utils.enums import (
+    CLUSTERS,
+    COMMODITIES,
+    COOL_PERIOD,
+    CVXPY,
+    NEW_CAPACITY,
+    RUN_PERIOD,
+    SETTINGS,
+    SPARSE,
+    T_SLICE,
+    TECHNOLOGIES,
+    TIME_HORIZON,
+    TIME_SLICES,
+    WARM_PERIOD,
+    YEAR,
+)
+
+
+def small_model_data(**kwargs):
+    commodities = check_commodities({"electricity": {"demand": 10}})["commodities"]
+    technologies = check_technologies(
+        {
+            # available only in the first time slice
+            "solar": {
+                "output": "electricity",
+                "capacity_factor": np.array([[[1.0], [0.0]]]),
+                "investment_cost": 1,
+            },
+            "gas": {"output": "electricity", "investment_cost": 2, "variable_cost": 1},
+        },
+        commodities,
+    )["technologies"]
+
+    return ModelData(
+        [2020, 2021],
+        [1, 2],
+        ["region"],
+        commodities,
+        technologies,
+        slice_hours=[1, 1],
+        **kwargs,
+    )
+
+
+def test_check_technologies():
+    commodities = check_commodities(["electricity", "gas"])
+    assert commodities["errors"] == []
+    assert commodities["commodities"] == {
+        "electricity": {"demand": 0.0},
+        "gas": {"demand": 0.0},
+    }
+
+    technologies = check_technologies(
+        {
+            "plant": {"output": "electricity", "input": "heat", "lifetime": 2.5},
+            "pipe": {"output": "gas", "efficiency": 0, "color": "blue"},
+        },
+        commodities["commodities"],
+    )
+    assert len(technologies["errors"]) == 3
+    assert technologies["warnings"] == [
+        "{'color'} is not a valid argument for technology 'pipe' and is ignored."
+    ]
+    assert technologies["technologies"]["pipe"]["capacity_factor"] == 1.0
+
+
+def test_cvxpy_model():
+    model = CvxpyModel(small_model_data())
+
+    assert model.solve() == pytest.approx(50, abs=1e-4)
+    new_capacity = model.variables[NEW_CAPACITY]
+    assert new_capacity["solar"].value.sum() == pytest.approx(10, abs=1e-4)
+    assert new_capacity["gas"].value.sum() == pytest.approx(10, abs=1e-4)
+
+    # retired solar capacity has to be built again
+    data = small_model_data()
+    data.lifetime["solar"] = 1
+    assert CvxpyModel(data).solve() == pytest.approx(60, abs=1e-4)
+
+
+@pytest.mark.parametrize("backend", [CVXPY, SPARSE])
+def test_unsupplied_demand(backend):
+    data = small_model_data()
+    data.commodities = ["electricity", "heat"]
+    data.demand["heat"] = data._broadcast(0.0, True)
+
+    # commodities without demand do not need a technology
+    create_model(data, backend)
+
+    data.demand["heat"] = data._broadcast(5.0, True)
+    with pytest.raises(InputDataError, match="heat"):
+        create_model(data, backend)
+
+
+def test_scenario_runner():
+    runner = ScenarioRunner(small_model_data())
+    assert runner.model.problem.is_dpp()
+
+    results = dict(
+        runner.run(
+            {
+                "base": {},
+                "free_gas": {"variable_cost": {"gas": 0}},
+                "high_demand": {"demand": {"electricity": 20}},
+            }
+        )
+    )
+    assert results["base"]["objective"] == pytest.approx(50, abs=1e-4)
+    assert results["free_gas"]["objective"] == pytest.approx(20, abs=1e-4)
+    assert results["high_demand"]["objective"] == pytest.approx(100, abs=1e-4)
+    assert results["free_gas"]["variables"][NEW_CAPACITY]["solar"].sum() == pytest.approx(0, abs=1e-4)
+
+    # base data is not changed by the scenarios
+    assert runner.base.demand["electricity"].max() == 10
+
+    with pytest.raises(InputDataError):
+        runner.solve({"variable_cost": {"coal": 1}})
+
+
+def test_model_data_from_database(tmp_path):
+    model_config = {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2022)"]},
+        TIME_SLICES: {T_SLICE: [1, 2]},
+        SETTINGS: {"log_path": str(tmp_path)},
+        COMMODITIES: {"electricity": {"demand": "demand"}},
+        TECHNOLOGIES: {"solar": {"output": "electricity", "capacity_factor": "cf"}},
+    }
+    database = ModelDataBase(model_config)
+    database.validate()
+
+    input_path = tmp_path / "input"
+    input_path.mkdir()
+    pd.DataFrame({YEAR: [2020, 2020, 2021, 2021], "time_slice": [1, 2, 1, 2], "region": [1, 2, 3, 4]}).to_csv(
+        input_path / "demand.csv", index=False
+    )
+    pd.DataFrame({"time_slice": [1, 2], "region": [1.0, 0.5]}).to_csv(
+        input_path / "cf.csv", index=False
+    )
+    database.read_input_data(str(input_path))
+
+    data = ModelData.from_database(database)
+    assert data.shape == (2, 2, 1)
+    assert data.demand["electricity"][:, :, 0].tolist() == [[1, 2], [3, 4]]
+    assert data.parameters["capacity_factor"]["solar"][1, :, 0].tolist() == [1.0, 0.5]
+
+    database.technologies["solar"]["investment_cost"] = "missing"
+    with pytest.raises(InputDataError):
+        ModelData.from_database(database)
+
+
+def test_rolling_horizon(tmp_path):
+    model_config = {
+        TIME_HORIZON: {
+            WARM_PERIOD: [2019],
+            RUN_PERIOD: ["range(2020,2026)"],
+            COOL_PERIOD: [2026, 2027],
+        },
+        CLUSTERS: {"first": "range(2020,2023)", "last": [2026, 2027]},
+        TIME_SLICES: {T_SLICE: [1, 2]},
+        SETTINGS: {"log_path": str(tmp_path)},
+        COMMODITIES: {"electricity": {"demand": 10}},
+        TECHNOLOGIES: {
+            "solar": {
+                "output": "electricity",
+                "capacity_factor": 0.5,
+                "investment_cost": 1,
+                "lifetime": 3,
+            },
+            "gas": {"output": "electricity", "investment_cost": 3, "lifetime": 3},
+        },
+    }
+    database = ModelDataBase(model_config)
+    database.validate()
+
+    windows = horizon_windows(database.years, database.cluster_index, foresight=1)
+    assert [window["decision"].tolist() for window in windows] == [
+        [2019, 2020, 2021, 2022],
+        [2023],
+        [2024],
+        [2025],
+    ]
+    assert [window["look_ahead"].tolist() for window in windows] == [
+        [2023],
+        [2024],
+        [2025],
+        [2026, 2027],
+    ]
+
+    rolling = RollingHorizon.from_database(database, foresight=1, slice_hours=[1, 1])
+    result = rolling.solve()
+    assert set(result["status"]) == {"optimal"}
+
+    # capacity built in the previous windows is not built again
+    new_capacity = result["variables"][NEW_CAPACITY]
+    assert new_capacity["solar"][:7].sum() == pytest.approx(20 * 3, abs=1e-3)
+    assert np.isnan(new_capacity["solar"][7:]).all()
+
+    # same as the perfect foresight solution of the decision years
+    model = CvxpyModel(rolling.data.subset(range(7)))
+    assert result["objective"] == pytest.approx(model.solve(), rel=1e-4)
+
+
+def test_clustered_model(tmp_path):
+    model_config = {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2026)"]},
+        CLUSTERS: {"first": "range(2020,2023)"},
+        TIME_SLICES: {T_SLICE: [1, 2]},
+        SETTINGS: {"log_path": str(tmp_path)},
+        COMMODITIES: {"electricity": {"demand": 10}},
+        TECHNOLOGIES: {
+            "wind": {"output": "electricity", "capacity_factor": 0.5, "investment_cost": 1},
+            "gas": {"output": "electricity", "investment_cost": 2, "variable_cost": 0.1},
+        },
+    }
+    database = ModelDataBase(model_config)
+    database.validate()
+
+    blocks = database.cluster_index.blocks()
+    assert [block.tolist() for block in blocks] == [[2020, 2021, 2022], [2023], [2024], [2025]]
+
+    data = ModelData.from_database(database, slice_hours=[1, 1])
+    clustered = ModelData.from_database(database, slice_hours=[1, 1], clustered=True)
+    assert clustered.years.tolist() == [2020, 2023, 2024, 2025]
+    assert clustered.year_weights.tolist() == [3, 1, 1, 1]
+
+    # costs of all the years are counted once per year
+    assert CvxpyModel(clustered).solve() == pytest.approx(CvxpyModel(data).solve(), rel=1e-5)
+
+    report = clustering_report(data, blocks)
+    assert report == {
+        "years": {"blocks": 6, "variables": 36, "constraints": 36},
+        "clusters": {"blocks": 4, "variables": 24, "constraints": 24},
+    }
+
+    with pytest.raises(InputDataError):
+        data.clustered(blocks[1:])
+
+
+@pytest.mark.parametrize("lifetime", [None, 1])
+def test_sparse_model(lifetime, tmp_path):
+    commodities = check_commodities({"electricity": {"demand": 10}, "fuel": {}})["commodities"]
+    technologies = check_technologies(
+        {
+            "solar": {
+                "output": "electricity",
+                "capacity_factor": np.array([[[1.0], [0.0]]]),
+                "investment_cost": 1,
+                "lifetime": lifetime,
+            },
+            "gas": {
+                "output": "electricity",
+                "input": "fuel",
+                "efficiency": 0.5,
+                "investment_cost": 2,
+                "existing_capacity": 2,
+            },
+            "fuel_supply": {"output": "fuel", "variable_cost": 1},
+        },
+        commodities,
+    )["technologies"]
+    data = ModelData([2020, 2021], [1, 2], ["north", "south"], commodities, technologies)
+
+    cvxpy_model = create_model(data, CVXPY)
+    sparse_model = create_model(data, SPARSE)
+    assert sparse_model.size() == cvxpy_model.size()
+    assert sparse_model.solve() == pytest.approx(cvxpy_model.solve(), rel=1e-6)
+    assert sparse_model.status == "optimal"
+
+    for variable, values in sparse_model.values().items():
+        for technology, value in values.items():
+            assert value.shape == cvxpy_model.variables[variable][technology].shape
+
+    # the exported file is solved to the same optimum
+    highspy = pytest.importorskip("highspy")
+    sparse_model.write_mps(str(tmp_path / "model.mps"))
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.readModel(str(tmp_path / "model.mps"))
+    highs.run()
+    assert highs.getInfo().objective_function_value == pytest.approx(sparse_model.solve(), rel=1e-6)
+
+    # other solvers of the model data are not used
+    data.solver = "CLARABEL"
+    with pytest.warns(UserWarning, match="CLARABEL is ignored"):
+        create_model(data, SPARSE).solve()
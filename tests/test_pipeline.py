@@ -0,0 +1,89 @@
+import sys
+import os
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytest
+from hysut.preprocess.pipeline import ValidationPipeline
+
+
+def test_validation_pipeline():
+
+    order = []
+    lock = threading.Lock()
+
+    def stage(name, errors=()):
+        def function():
+            with lock:
+                order.append(name)
+            return {"errors": list(errors), "warnings": [f"{name} done"]}
+
+        return function
+
+    pipeline = ValidationPipeline()
+    pipeline.register("dependent", stage("dependent"), dependencies=["base"])
+    pipeline.register("base", stage("base"))
+    pipeline.register("independent", stage("independent", ["error"]))
+
+    output = pipeline.run(max_workers=3)
+
+    # dependencies are respected and outputs follow registration order
+    assert order.index("base") < order.index("dependent")
+    assert output["warnings"] == ["dependent done", "base done", "independent done"]
+    assert output["errors"] == ["error"]
+
+    # dependents of failing stages are skipped
+    pipeline.register("base", stage("base", ["base error"]))
+    output = pipeline.run()
+    assert [*output["skipped"]] == ["dependent"]
+    assert output["errors"] == ["base error", "error"]
+
+    # fail_fast stops scheduling new stages
+    pipeline = ValidationPipeline()
+    pipeline.register("first", stage("first", ["error"]))
+    pipeline.register("second", stage("second"), dependencies=["third"])
+    pipeline.register("third", stage("third"))
+    output = pipeline.run(fail_fast=True, max_workers=1)
+    assert output["errors"] == ["error"]
+    assert [*output["skipped"]] == ["second", "third"]
+
+    # wrong dependencies
+    pipeline.register("third", stage("third"), dependencies=["second"])
+    with pytest.raises(ValueError):
+        pipeline.run()
+
+    pipeline.register("third", stage("third"), dependencies=["dummy"])
+    with pytest.raises(ValueError):
+        pipeline.run()
+
+
+def test_partial_run():
+
+    calls = []
+
+    def stage(name):
+        def function():
+            calls.append(name)
+            return {"errors": [], "warnings": [f"{name} done"]}
+
+        return function
+
+    pipeline = ValidationPipeline()
+    pipeline.register("horizon", stage("horizon"))
+    pipeline.register("clusters", stage("clusters"), dependencies=["horizon"])
+    pipeline.register("settings", stage("settings"), sections=["settings", "solver"])
+
+    assert pipeline.invalidated(["horizon"]) == ["horizon", "clusters"]
+    assert pipeline.invalidated(["solver", "dummy"]) == ["settings"]
+
+    previous = pipeline.run()["results"]
+    calls.clear()
+    output = pipeline.run(stages=["clusters"], previous=previous)
+    assert calls == ["clusters"]
+    assert output["warnings"] == ["horizon done", "clusters done", "settings done"]
+
+    # stages without previous results run as well
+    calls.clear()
+    pipeline.run(stages=["clusters"], previous={"horizon": previous["horizon"]})
+    assert sorted(calls) == ["clusters", "settings"]
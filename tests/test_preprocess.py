@@ -23,6 +23,7 @@ from hysut.utils.enums import (
     SLICE_NAME,
 )
 from hysut.utils.defaults import Time
+from hysut.utils.sets import TimeSet
 from hysut.exceptions_logging.exceptions import EssentialSetMissing
 
 
@@ -81,7 +82,7 @@ def test_check_time_period_overlaps():
     # run and warm overlap
     periods = {RUN_PERIOD: [2020, 2022, 2023, 2025], WARM_PERIOD: [2024, 2028]}
 
-    expected_error = f"time_horizon for 'run' and '{WARM_PERIOD}' have following intersections. \n{set([2024,2025])}"
+    expected_error = f"time_horizon for 'run' and '{WARM_PERIOD}' have following intersections. \nrange(2024, 2026)"
     error = check_time_period_overlaps(periods)[0]
 
     assert error == expected_error
@@ -93,7 +94,7 @@ def test_check_time_period_overlaps():
         WARM_PERIOD: [2027, 2028],
     }
 
-    expected_error = f"time_horizon for '{WARM_PERIOD}' and '{COOL_PERIOD}' have following intersections. \n{set([2027])}"
+    expected_error = f"time_horizon for '{WARM_PERIOD}' and '{COOL_PERIOD}' have following intersections. \n2027"
     error = check_time_period_overlaps(periods)[0]
 
     assert error == expected_error
@@ -107,8 +108,8 @@ def test_check_time_period_overlaps():
     }
 
     expected_error = [
-        f"time_horizon for 'run' and '{WARM_PERIOD}' have following intersections. \n{set([2024,2025])}",
-        f"time_horizon for '{WARM_PERIOD}' and '{COOL_PERIOD}' have following intersections. \n{set([2027])}",
+        f"time_horizon for 'run' and '{WARM_PERIOD}' have following intersections. \nrange(2024, 2026)",
+        f"time_horizon for '{WARM_PERIOD}' and '{COOL_PERIOD}' have following intersections. \n2027",
     ]
 
     error = check_time_period_overlaps(periods)
@@ -125,6 +126,14 @@ def test_check_time_period_overlaps():
     error = check_time_period_overlaps(periods)
     assert error == []
 
+    # long horizons are not expanded
+    periods = {
+        RUN_PERIOD: TimeSet([range(0, 10 ** 12)]),
+        WARM_PERIOD: TimeSet([range(-10, 1)]),
+    }
+    expected_error = f"time_horizon for 'run' and '{WARM_PERIOD}' have following intersections. \n0"
+    assert check_time_period_overlaps(periods) == [expected_error]
+
 
 def test_check_time_horizon():
 
@@ -216,6 +225,10 @@ def test_read_time_slice_data():
 
     assert expected_output == output
 
+    # validated slices are read again as they are
+    assert read_time_slice_data(output) == {"time_slices": output, "errors": []}
+    assert read_time_slice_data(range(1, 4))["time_slices"] == [1, 2, 3]
+
 
 def test_check_years_clusters():
 
@@ -242,6 +255,43 @@ def test_check_years_clusters():
         2025,
     ]
 
+    # years out of the horizon
+    clusters = {"cls1": [2019, 2020, 2030, 2031]}
+    output = check_years_clusters(clusters, years)
+    assert output["errors"] == [
+        "cluster 'cls1' has years (2019, range(2030, 2032)) that are not valid years."
+    ]
+    assert output["time_clusters"] == {}
+
+    # a year in more than one cluster
+    clusters = {"cls1": "range(2020,2025)", "cls2": [2023, 2024, 2025]}
+    output = check_years_clusters(clusters, years)
+    assert output["errors"] == [
+        "cluster 'cls2' has years (range(2023, 2025)) that are already in cluster 'cls1'."
+    ]
+    assert [*output["time_clusters"]] == ["cls1"]
+
+    # year to cluster lookups
+    index = output["cluster_index"]
+    assert index.cluster_of(2021) == "cls1"
+    assert index.cluster_of(2025) is None
+    assert index.members("cls1") == list(range(2020, 2025))
+    assert index.missing_years() == list(range(2025, 2030))
+
+    with pytest.raises(KeyError):
+        index.cluster_of(2040)
+
+    # years that are not integers and ranges that cannot be read
+    clusters = {"cls1": ["x"], "cls2": [2020.0], "cls3": "range(a)", "cls4": [2021]}
+    output = check_years_clusters(clusters, years)
+    assert output["errors"][:2] == [
+        "cluster 'cls1' can only contain integers as years.",
+        "cluster 'cls2' can only contain integers as years.",
+    ]
+    assert len(output["errors"]) == 3
+    assert [*output["time_clusters"]] == ["cls4"]
+    assert output["cluster_index"].names == ["cls4"]
+
 
 def test_add_missing_years_to_cluster():
 
@@ -251,3 +301,16 @@ def test_add_missing_years_to_cluster():
     output = add_missing_years_to_cluster(cluster, years)
 
     assert output == expected_output
+
+    # reusing the index of check_years_clusters
+    index = check_years_clusters(cluster, years)["cluster_index"]
+    output = add_missing_years_to_cluster(cluster, years, cluster_index=index)
+
+    assert output == expected_output
+
+    # validated clusters (TimeSet values) without an index
+    cluster = check_years_clusters({"cls1": "range(2020,2025)"}, years)["time_clusters"]
+    assert isinstance(cluster["cls1"], TimeSet)
+    output = add_missing_years_to_cluster(cluster, years)
+
+    assert output == ["cls1", 2025, 2026, 2027, 2028, 2029, 2030]
@@ -0,0 +1,105 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pandas as pd
+import pytest
+from hysut.preprocess.database import ModelDataBase
+from hysut.preprocess.reader import iter_table_chunks, read_parameter
+from hysut.exceptions_logging.exceptions import EssentialSetMissing, InputDataError
+from hysut.utils.enums import (
+    RUN_PERIOD,
+    SETTINGS,
+    SLICE_NAME,
+    T_SLICE,
+    TIME_HORIZON,
+    TIME_SLICES,
+    YEAR,
+)
+from hysut.utils.sets import TimeSet
+
+
+def make_demand(years, hours):
+    index = pd.MultiIndex.from_product([years, hours], names=[YEAR, "hour"])
+    table = pd.DataFrame(index=index).reset_index()
+    table["north"] = table[YEAR] * 1000 + table["hour"]
+    table["south"] = -table["north"]
+    return table
+
+
+def test_read_parameter(tmp_path):
+
+    years = TimeSet([range(2020, 2023)])
+    hours = TimeSet([range(1, 25)])
+    table = make_demand(list(years), list(hours))
+    table.to_csv(tmp_path / "demand.csv", index=False)
+
+    chunks = iter_table_chunks(
+        str(tmp_path / "demand.csv"),
+        index_dtypes={YEAR: "int64", "hour": "int64"},
+        chunk_size=10,
+    )
+    output = read_parameter(chunks, years, hours, "hour", "demand")
+
+    assert output["errors"] == []
+    assert output["index"] == [YEAR, "hour"]
+    assert output["regions"] == ["north", "south"]
+    assert output["values"].shape == (3, 24, 2)
+    assert output["values"][1, 4, 0] == 2021 * 1000 + 5
+
+    # invalid, duplicated and missing rows
+    table = pd.concat([table.iloc[1:], table.iloc[[2]]])
+    table.loc[table.index[0], YEAR] = 2030
+    output = read_parameter([table], years, hours, "hour", "demand")
+
+    assert output["errors"] == [
+        "'demand' has year values ([2030]) that are not defined in the model.",
+        "'demand' has 1 duplicated rows.",
+        "'demand' has 4 missing values.",
+    ]
+
+    # labelled time slices and no year column
+    table = pd.DataFrame({"slice": ["Night", "Day"], "north": [1.0, 2.0]})
+    output = read_parameter([table], years, ["Day", "Night"], "slice", "cost")
+
+    assert output["errors"] == []
+    assert output["values"].tolist() == [[2.0], [1.0]]
+
+
+def test_read_input_data(tmp_path):
+
+    model_config = {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2022)"]},
+        TIME_SLICES: {SLICE_NAME: "hour", T_SLICE: "range(1,25)"},
+        SETTINGS: {"log_path": str(tmp_path)},
+    }
+    database = ModelDataBase(model_config)
+
+    with pytest.raises(EssentialSetMissing):
+        database.read_input_data(str(tmp_path))
+
+    database.validate()
+
+    workbook = tmp_path / "inputs.xlsx"
+    with pd.ExcelWriter(workbook) as writer:
+        make_demand([2020, 2021], range(1, 25)).to_excel(
+            writer, sheet_name="demand", index=False
+        )
+        pd.DataFrame({YEAR: [2020, 2021], "north": [10.0, 12.0]}).to_excel(
+            writer, sheet_name="cost", index=False
+        )
+
+    database.read_input_data(str(workbook), chunk_size=7)
+
+    assert [*database.input_data] == ["demand", "cost"]
+    assert database.input_data["demand"]["values"].shape == (2, 24, 2)
+    assert np.array_equal(database.input_data["cost"]["values"][:, 0], [10.0, 12.0])
+
+    # errors are logged
+    pd.DataFrame({YEAR: [2020], "north": [10.0]}).to_csv(tmp_path / "cost.csv", index=False)
+    with pytest.raises(InputDataError):
+        database.read_input_data(str(tmp_path / "cost.csv"))
+
+    assert os.path.exists(tmp_path / "error_log.txt")
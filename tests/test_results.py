@@ -0,0 +1,94 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import importlib.util
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+from hysut.mathematical_model.cvxpy.model import CvxpyModel
+from hysut.mathematical_model.utils.data import ModelData
+from hysut.postprocess.results import (
+    PARQUET_ENGINES,
+    export_results,
+    result_frames,
+    summary_frames,
+)
+from hysut.preprocess.technologies import check_commodities, check_technologies
+from hysut.utils.enums import NEW_CAPACITY, PRODUCTION, YEAR
+
+
+@pytest.fixture
+def solved():
+    commodities = check_commodities({"electricity": {"demand": np.array([[[5, 10]], [[5, 10]]])}})
+    technologies = check_technologies(
+        {
+            "solar": {"output": "electricity", "investment_cost": 1},
+            "gas": {"output": "electricity", "investment_cost": 2},
+        },
+        commodities["commodities"],
+    )
+    data = ModelData(
+        [2020, 2021],
+        [1, 2, 3],
+        ["north", "south"],
+        commodities["commodities"],
+        technologies["technologies"],
+        slice_hours=[1, 2, 3],
+    )
+    model = CvxpyModel(data)
+    model.solve()
+
+    return data, model.values()
+
+
+def test_result_frames(solved):
+    data, variables = solved
+    frames = result_frames(data, variables)
+
+    production = frames[PRODUCTION]
+    assert production.shape == (2 * 2 * 3, 2)
+    assert production.index.names == ["technology", YEAR, "time_slice"]
+    assert production.loc[("solar", 2021, 3), "south"] == pytest.approx(10, abs=1e-5)
+    assert frames[NEW_CAPACITY].loc[("gas", 2020)].sum() == pytest.approx(0, abs=1e-5)
+
+    summary = summary_frames(data, frames)
+    assert summary[PRODUCTION].loc["solar", 2020] == pytest.approx(6 * 5 + 6 * 10, abs=1e-4)
+    assert summary[NEW_CAPACITY].loc["solar"].sum() == pytest.approx(15, abs=1e-4)
+
+
+def test_export_results(solved, tmp_path):
+    data, variables = solved
+    files = export_results(data, variables, str(tmp_path), summary=True)
+    assert files[PRODUCTION].endswith(".csv")
+
+    production = pd.read_csv(files[PRODUCTION], index_col=[0, 1, 2])
+    assert np.allclose(production.to_numpy(), result_frames(data, variables)[PRODUCTION].to_numpy())
+
+    workbook = load_workbook(files["summary"], read_only=True)
+    assert workbook.sheetnames == [PRODUCTION, NEW_CAPACITY]
+    rows = list(workbook[NEW_CAPACITY].iter_rows(values_only=True))
+    assert rows[0] == ("technology", "2020", "2021")
+    workbook.close()
+
+    with pytest.raises(ValueError):
+        export_results(data, variables, str(tmp_path), file_format="xml")
+
+    # values of an unsolved model
+    with pytest.raises(ValueError, match="should be solved"):
+        result_frames(data, CvxpyModel(data).values())
+
+
+def test_export_parquet(solved, tmp_path):
+    data, variables = solved
+    if not any(importlib.util.find_spec(engine) for engine in PARQUET_ENGINES):
+        with pytest.raises(ImportError, match="parquet"):
+            export_results(data, variables, str(tmp_path), file_format="parquet")
+        return
+
+    files = export_results(data, variables, str(tmp_path), file_format="parquet")
+    production = pd.read_parquet(files[PRODUCTION])
+    assert np.allclose(production.to_numpy(), result_frames(data, variables)[PRODUCTION].to_numpy())
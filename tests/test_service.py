@@ -0,0 +1,185 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+from hysut.exceptions_logging.exceptions import ServiceBusy
+from hysut.interface import service as service_module
+from hysut.interface.service import (
+    BUILD,
+    CANCELLED,
+    DONE,
+    INVALID,
+    QUEUED,
+    LocalClient,
+    ModelService,
+)
+from hysut.mathematical_model.cvxpy.model import CvxpyModel
+from hysut.mathematical_model.utils.data import ModelData
+from hysut.preprocess.database import ModelDataBase
+from hysut.utils.solvers import SOLVER_REGISTRY
+from hysut.utils.enums import (
+    COMMODITIES,
+    RUN_PERIOD,
+    SETTINGS,
+    SPARSE,
+    T_SLICE,
+    TECHNOLOGIES,
+    TIME_HORIZON,
+    TIME_SLICES,
+)
+
+
+def model_config(tmp_path, **settings):
+    return {
+        TIME_HORIZON: {RUN_PERIOD: ["range(2020,2023)"]},
+        TIME_SLICES: {T_SLICE: "range(1,5)"},
+        SETTINGS: {"log_path": str(tmp_path), **settings},
+        COMMODITIES: {"electricity": {"demand": 10}},
+        TECHNOLOGIES: {
+            "wind": {"output": "electricity", "capacity_factor": 0.5, "investment_cost": 1},
+            "gas": {"output": "electricity", "investment_cost": 2, "variable_cost": 0.01},
+        },
+    }
+
+
+def _slow_job(pipe, data, backend):
+    pipe.send((BUILD, None))
+    time.sleep(60)
+
+
+def test_local_client(tmp_path):
+
+    database = ModelDataBase(model_config(tmp_path))
+    database.validate()
+    model = CvxpyModel(ModelData.from_database(database))
+    expected = model.solve()
+
+    with LocalClient(max_workers=2) as client:
+        jobs = [
+            client.submit(model_config(tmp_path)),
+            client.submit(model_config(tmp_path, backend=SPARSE)),
+        ]
+        for job in jobs:
+            assert job["errors"] == []
+            result = client.result(job["job"], timeout=60)
+            assert result["status"] == DONE
+            assert result["progress"] == {"step": DONE, "fraction": 1.0}
+            assert result["result"]["objective"] == pytest.approx(expected, rel=1e-4)
+            assert result["result"]["variables"]["new_capacity"]["wind"].shape == (3, 1)
+
+        # validation errors are returned right away
+        config = model_config(tmp_path)
+        config[TIME_SLICES] = {T_SLICE: [1, 1]}
+        job = client.submit(config)
+        assert job["status"] == INVALID
+        assert job["errors"] == ["duplicate values are not allowed in 'time_slices'."]
+        assert client.cancel(job["job"]) is False
+
+        # essential sets and input data files
+        config = model_config(tmp_path)
+        del config[TIME_HORIZON][RUN_PERIOD]
+        job = client.submit(config)
+        assert job["status"] == INVALID
+        assert job["errors"] == ["A model cannot be created without a run."]
+
+        job = client.submit(model_config(tmp_path), input_data=str(tmp_path / "missing.csv"))
+        assert job["status"] == INVALID
+        assert job["errors"][0].startswith("input data cannot be read:")
+
+        # items of unexpected types
+        config = model_config(tmp_path)
+        config[TIME_SLICES] = {T_SLICE: [[1]]}
+        job = client.submit(config)
+        assert job["status"] == INVALID
+        assert job["errors"][0].startswith("model_config cannot be validated:")
+
+        with pytest.raises(KeyError):
+            client.status("dummy")
+
+
+def test_job_retention(tmp_path, monkeypatch):
+    monkeypatch.setattr(SOLVER_REGISTRY, "best", lambda problem_class: None)
+
+    async def main():
+        service = ModelService(max_finished=2)
+        with pytest.raises(RuntimeError):
+            await service.submit(model_config(tmp_path))
+
+        async with service:
+            names = []
+            for _ in range(4):
+                job = await service.submit(model_config(tmp_path))
+                assert job["status"] == INVALID
+                assert job["errors"][0].startswith("No solver capable of solving")
+                names.append(job["job"])
+
+            # the oldest finished jobs are forgotten
+            assert [*service.jobs] == names[1:]
+            await service.forget(names[-1])
+            assert [*service.jobs] == names[1:3]
+
+            with pytest.raises(KeyError):
+                await service.status(names[0])
+
+    asyncio.run(main())
+
+
+def test_cancel_running_job(tmp_path, monkeypatch):
+    # the target of the job process is pickled by reference, so the spawned
+    # process runs _slow_job of this module
+    monkeypatch.setattr(service_module, "_run_job", _slow_job)
+
+    with LocalClient(context=multiprocessing.get_context("spawn")) as client:
+        name = client.submit(model_config(tmp_path))["job"]
+        deadline = time.monotonic() + 30
+        while client.status(name)["progress"]["step"] != BUILD:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        process = client.service.jobs[name].process
+        assert client.cancel(name) is True
+        assert client.result(name, timeout=5)["status"] == CANCELLED
+        process.join(5)
+        assert not process.is_alive()
+
+
+def test_backpressure(tmp_path, monkeypatch):
+
+    async def blocked(self, job):
+        # running until cancelled
+        await job.finished.wait()
+
+    monkeypatch.setattr(ModelService, "_run", blocked)
+
+    async def main():
+        async with ModelService(max_workers=1, max_queued=1) as service:
+            running = await service.submit(model_config(tmp_path))
+            await asyncio.sleep(0)
+            queued = await service.submit(model_config(tmp_path))
+            assert queued["status"] == QUEUED
+
+            with pytest.raises(ServiceBusy):
+                await service.submit(model_config(tmp_path))
+
+            # waiting submissions are queued when a place is free
+            waiting = asyncio.ensure_future(service.submit(model_config(tmp_path), wait=True))
+            await asyncio.sleep(0.5)
+            assert not waiting.done()
+            # the waiting job is already registered
+            assert len(service.jobs) == 3
+            await service.cancel(queued["job"])
+            await service.cancel(running["job"])
+            assert (await service.status(queued["job"]))["status"] == CANCELLED
+            assert (await waiting)["status"] == QUEUED
+
+            # unfinished jobs are not forgotten
+            with pytest.raises(ValueError):
+                await service.forget((await waiting)["job"])
+
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+import pytest
+from hysut.utils.sets import IndexSet, ProductIndex, TimeSet
+
+
+def test_time_set():
+
+    # consecutive values are stored as a single run
+    time_set = TimeSet.from_iterable([2020, 2021, 2022, 2025])
+    assert time_set.runs == (range(2020, 2023), range(2025, 2026))
+    assert len(time_set) == 4
+    assert time_set == [2020, 2021, 2022, 2025]
+    assert time_set[-1] == 2025
+    assert time_set[2] == 2022
+
+    with pytest.raises(IndexError):
+        time_set[4]
+
+    # membership does not expand the range
+    hours = TimeSet([range(1, 8761)])
+    assert 8760 in hours
+    assert 8761 not in hours
+    assert len(hours) == 8760
+    assert hours.to_array().sum() == sum(range(1, 8761))
+
+    # unsorted with duplicates
+    time_set = TimeSet([range(2025, 2030), range(2020, 2027)])
+    assert not time_set.is_sorted
+    assert not time_set.is_unique()
+    assert time_set.unique() == list(range(2020, 2030))
+    assert 2028 in time_set
+
+    # stepped ranges
+    time_set = TimeSet([range(2020, 2030, 2)])
+    assert time_set.unique() == [2020, 2022, 2024, 2026, 2028]
+    assert time_set.difference([2022, 2023]) == [2020, 2024, 2026, 2028]
+
+
+def test_time_set_operations():
+
+    first = TimeSet([range(2020, 2030)])
+    second = TimeSet([range(2025, 2035), range(2040, 2041)])
+
+    assert first.union(second) == list(range(2020, 2035)) + [2040]
+    assert first.intersection(second) == list(range(2025, 2030))
+    assert first.difference(second) == list(range(2020, 2025))
+    assert second.difference(first) == list(range(2030, 2035)) + [2040]
+    assert first.difference([2021, 2023]) == [2020, 2022] + list(range(2024, 2030))
+    assert not TimeSet()
+
+
+def test_index_set():
+
+    years = IndexSet(TimeSet([range(2020, 2030)]))
+    assert len(years) == 10
+    assert years.code(2023) == 3
+    assert years[3] == 2023
+    assert 2030 not in years
+    assert years.codes_of(np.array([2029, 2019, 2020])).tolist() == [9, -1, 0]
+    assert years[2:4] == [2022, 2023]
+
+    with pytest.raises(KeyError):
+        years.code(2030)
+
+    # str labels keep their order
+    slices = IndexSet(["Night", "Day"])
+    assert slices.codes_of(["Day", "Night", "Noon"]).tolist() == [1, 0, -1]
+    assert slices.take([1, 1, 0]).tolist() == ["Day", "Day", "Night"]
+    assert list(slices) == ["Night", "Day"]
+
+    with pytest.raises(ValueError):
+        IndexSet(["Day", "Day"])
+
+    # mixed labels fall back to the dict lookup
+    mixed = IndexSet([1, "a"])
+    assert mixed.codes_of(np.array(["a", 2], dtype=object)).tolist() == [1, -1]
+    assert IndexSet(["x", 1]).codes_of([1, "y"]).tolist() == [1, -1]
+    assert years.codes_of([2021, "2021"]).tolist() == [1, -1]
+
+
+def test_product_index():
+
+    product = IndexSet([2020, 2021]).product(IndexSet(["Night", "Day"]), IndexSet(["north", "south", "east"]))
+    assert isinstance(product, ProductIndex)
+    assert product.shape == (2, 2, 3)
+    assert len(product) == 12
+
+    assert product.position(2021, "Night", "south") == 7
+    assert product[7] == (2021, "Night", "south")
+    assert product.positions([2021, 2020, 2022], "Day", ["east", "north", "north"]).tolist() == [11, 3, -1]
+
+    years, slices, regions = product[::5]
+    assert years.tolist() == [2020, 2020, 2021]
+    assert slices.tolist() == ["Night", "Day", "Day"]
+    assert regions.tolist() == ["north", "east", "south"]
+
+    # slices are resolved like the slices of an array
+    for positions in [slice(-3, None), slice(None, None, -4), slice(10, 40), slice(5, 2)]:
+        expected = np.unravel_index(np.arange(12)[positions], product.shape)
+        assert all((code == other).all() for code, other in zip(product.codes(positions), expected))
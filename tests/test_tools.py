@@ -3,8 +3,18 @@ import os
 
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
+import copy
+import pickle
+import numpy as np
 import pytest
-from hysut.utils.tools import print_log, read_range_function, type_consistency_check
+from hysut.utils.tools import (
+    FrozenDict,
+    copy_config,
+    parse_range,
+    print_log,
+    read_range_function,
+    type_consistency_check,
+)
 
 
 def test_type_consistency_check():
@@ -30,3 +40,62 @@ def test_read_range_function():
     assert read_range_function("range(2020,2025,2.1)", "dummy")["error"] == [
         "'float' object cannot be interpreted as an integer in 'range' for 'dummy'."
     ]
+
+
+def test_parse_range():
+    # same output as python range
+    for expression in ["range(5)", "range(2020, 2030)", "range(2030,2020,-3)"]:
+        assert parse_range(expression)[0] == list(eval(expression))
+
+    # inclusive range
+    assert parse_range("irange(2020,2050,10)")[0] == [2020, 2030, 2040, 2050]
+    assert parse_range("irange(3,1,-1)")[0] == [3, 2, 1]
+
+    # errors have the same message of python range
+    assert parse_range("range(1,5,0)")[1] == ("range() arg 3 must not be zero",)
+    assert parse_range("range()")[1] == ("range expected at least 1 argument, got 0",)
+    assert parse_range("range(1,'5')")[1] == (
+        "'str' object cannot be interpreted as an integer",
+    )
+    assert parse_range("range(1,dummy)")[1] == ("name 'dummy' is not defined",)
+
+    # nothing is evaluated
+    assert parse_range("__import__('os').getcwd()#range(1)")[1] == ("invalid syntax",)
+
+    # whitespace is normalized before caching
+    parse_range.cache_clear()
+    parse_range("range(1, 8761)")
+    parse_range("range(1,8761)")
+    assert parse_range.cache_info().hits == 1
+
+
+def test_copy_config():
+    array = np.arange(10)
+    model_config = {
+        "settings": {"solver": "dummy", "options": [1, 2]},
+        "data": {"demand": array, "regions": {"reg1": {"share": [0.5, 0.5]}}},
+        "name": "model",
+    }
+    config = copy_config(model_config, ["settings"])
+
+    # mutable sections are copied
+    config["settings"]["solver"] = "changed"
+    config["settings"]["options"].append(3)
+    assert model_config["settings"] == {"solver": "dummy", "options": [1, 2]}
+
+    # other sections are shared and read-only at every level
+    assert np.shares_memory(config["data"]["demand"], array)
+    with pytest.raises(TypeError):
+        config["data"]["demand"] = None
+    with pytest.raises(TypeError):
+        config["data"]["regions"]["reg1"]["share"][0] = 1
+    with pytest.raises(ValueError):
+        config["data"]["demand"][0] = 1
+    assert array.flags.writeable
+
+    assert isinstance(config["data"], FrozenDict)
+    assert pickle.loads(pickle.dumps(config["data"]))["demand"].sum() == 45
+
+    # copies of the shared sections are plain dicts
+    assert type(copy.copy(config["data"])) is dict
+    assert type(copy.deepcopy(config)["data"]) is dict